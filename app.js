@@ -364,6 +364,26 @@ window.DiariasApp = {
             this.updateDataTable();
         });
         
+        // Patches de KPIs enviados pelo servidor local (SSE)
+        window.addEventListener('diarias:live-update', () => {
+            this.updateKPIs();
+            this.updateCreditDisplay();
+            this.createMonthlyChart();
+            this.createStatusChart();
+        });
+        
+        // Estado completo carregado do servidor local: redesenhar tudo
+        window.addEventListener('diarias:state-loaded', () => {
+            this.loadExistingDates();
+            this.renderCalendar();
+            this.updateAllDisplays();
+        });
+        
+        // Alteração recusada pelo servidor local
+        window.addEventListener('diarias:server-error', (e) => {
+            alert(`⚠️ ${e.detail.message}`);
+        });
+        
         console.log('✅ Event listeners configurados!');
     },
     
@@ -1008,39 +1028,61 @@ window.DiariasApp = {
         btn.innerHTML = '⏳ Gerando Excel...';
         btn.disabled = true;
         
-        // Preparar dados para envio
-        const exportData = {
-            workingData: window.DiariasSystem.workingData,
-            creditSystem: window.DiariasSystem.creditSystem,
-            timestamp: new Date().toISOString()
-        };
-        
-        // Simular geração (em produção, seria uma chamada para o backend)
-        setTimeout(() => {
-            // Criar arquivo CSV como fallback
-            const csvContent = this.generateAdvancedCSV();
-            const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-            const link = document.createElement('a');
-            
-            if (link.download !== undefined) {
-                const url = URL.createObjectURL(blob);
-                link.setAttribute('href', url);
-                link.setAttribute('download', `diarias_completo_${new Date().toISOString().split('T')[0]}.csv`);
-                link.style.visibility = 'hidden';
-                document.body.appendChild(link);
-                link.click();
-                document.body.removeChild(link);
-            }
-            
-            // Restaurar botão
+        const restoreButton = () => {
             btn.innerHTML = originalText;
             btn.disabled = false;
-            
-            // Mostrar informações
-            alert(`✅ Arquivo CSV avançado gerado com sucesso!\n\n📋 Conteúdo:\n• Dados detalhados das diárias\n• Sistema de créditos\n• KPIs calculados\n• Resumos mensais\n\n💡 Para Excel completo com gráficos, execute:\npython generate_excel.py`);
-            
-            console.log('✅ CSV avançado gerado com sucesso!');
-        }, 1500);
+        };
+        
+        // Com o servidor local (diarias_server.py), baixar a planilha completa gerada pelo Python
+        if (window.DiariasSystem.serverAvailable) {
+            fetch('/export.xlsx')
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`HTTP ${response.status}`);
+                    }
+                    return response.blob();
+                })
+                .then(blob => {
+                    this.downloadBlob(blob, `Controle_Diarias_${new Date().toISOString().split('T')[0]}.xlsx`);
+                    restoreButton();
+                    console.log('✅ Excel gerado pelo servidor local!');
+                })
+                .catch(e => {
+                    console.warn('⚠️ Falha ao gerar Excel no servidor, gerando CSV:', e);
+                    this.generateCSVFallback();
+                    restoreButton();
+                });
+            return;
+        }
+        
+        // Sem servidor (arquivo aberto direto no navegador): CSV como alternativa
+        this.generateCSVFallback();
+        restoreButton();
+    },
+    
+    generateCSVFallback: function() {
+        const csvContent = this.generateAdvancedCSV();
+        const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
+        this.downloadBlob(blob, `diarias_completo_${new Date().toISOString().split('T')[0]}.csv`);
+        
+        // Mostrar informações
+        alert(`✅ Arquivo CSV avançado gerado com sucesso!\n\n📋 Conteúdo:\n• Dados detalhados das diárias\n• Sistema de créditos\n• KPIs calculados\n• Resumos mensais\n\n💡 Para Excel completo com gráficos, inicie o servidor local:\npython diarias_server.py`);
+        
+        console.log('✅ CSV avançado gerado com sucesso!');
+    },
+    
+    downloadBlob: function(blob, filename) {
+        const link = document.createElement('a');
+        
+        if (link.download !== undefined) {
+            const url = URL.createObjectURL(blob);
+            link.setAttribute('href', url);
+            link.setAttribute('download', filename);
+            link.style.visibility = 'hidden';
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
+        }
     },
     
     generateAdvancedCSV: function() {
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stubs dos módulos externos para execução offline dos benchmarks
+Registra versões mínimas de excel_sync_framework e excel_templates
+somente quando os módulos reais não estão instalados
+"""
+
+import os
+import sys
+import types
+
+# Raiz do repositório no path para importar os módulos do sistema
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class StubSyncManager:
+    """Gerenciador de sincronização que apenas guarda os dados registrados"""
+
+    def __init__(self, excel_file=None, template=None):
+        self.excel_file = excel_file
+        self.template = template
+        self.data = {}
+        self.sync_count = 0
+
+    def register_data(self, name, data):
+        self.data[name] = data
+
+    def sync_to_excel(self):
+        self.sync_count += 1
+
+    def start_auto_sync(self):
+        pass
+
+    def stop_auto_sync(self):
+        pass
+
+
+def install():
+    """Instala os stubs se os módulos reais não puderem ser importados"""
+    try:
+        import excel_sync_framework  # noqa: F401
+    except ImportError:
+        module = types.ModuleType('excel_sync_framework')
+        module.create_sync_manager = lambda excel_file, template=None: StubSyncManager(excel_file, template)
+        module.auto_sync = lambda *args, **kwargs: None
+        module.sync_dataframe = lambda *args, **kwargs: None
+        sys.modules['excel_sync_framework'] = module
+
+    try:
+        import excel_templates  # noqa: F401
+    except ImportError:
+        module = types.ModuleType('excel_templates')
+        module.get_template = lambda name=None: {}
+        sys.modules['excel_templates'] = module
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do fluxo de caixa
+Mede DiariasSystem.get_cash_flow de ponta a ponta (DataFrames de dias e
+depósitos montados a partir do estado + build_cash_flow, cache invalidado
+a cada execução) e compara a montagem vetorizada com as versões anteriores
+(depósitos convertidos linha a linha, fluxo via iterrows), de 1 mil a
+1 milhão de eventos
+
+Uso: python benchmarks/bench_cash_flow.py [--max-legacy 100000]
+"""
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import _stubs
+_stubs.install()
+
+from bench_suite import setup_system
+from diarias_sync_system import build_cash_flow
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def synthetic_frames(events: int, deposit_ratio: float = 0.01, workers: int = 10):
+    """Gera DataFrames de dias e depósitos com o total de eventos pedido (vários trabalhadores por data)"""
+    rng = np.random.default_rng(42)
+    n_deposits = max(1, int(events * deposit_ratio))
+    n_days = events - n_deposits
+
+    start = np.datetime64('1900-01-01', 'ns')
+    days = pd.DataFrame({
+        'Data': start + (np.arange(n_days) // workers).astype('timedelta64[D]'),
+        'Status': pd.Categorical.from_codes(rng.integers(0, 2, n_days), categories=['pending', 'paid']),
+        'Valor': np.full(n_days, 250.0)
+    })
+    deposits = pd.DataFrame({
+        'Data': start + np.sort(rng.integers(0, n_days // workers + 1, n_deposits)).astype('timedelta64[D]'),
+        'Valor': rng.integers(1, 50, n_deposits) * 100.0,
+        'Descricao': [f"Depósito {i}" for i in range(n_deposits)]
+    })
+    return days, deposits
+
+
+def legacy_cash_flow(df_days: pd.DataFrame, df_deposits: pd.DataFrame) -> pd.DataFrame:
+    """Implementação anterior (iterrows), mantida como referência"""
+    cash_flow_data = []
+    for _, deposit in df_deposits.iterrows():
+        cash_flow_data.append({
+            'Data': deposit['Data'], 'Tipo': 'Entrada', 'Valor': deposit['Valor'],
+            'Descricao': f"Depósito: {deposit['Descricao']}", 'Saldo_Impacto': deposit['Valor']
+        })
+    for _, day in df_days.iterrows():
+        cash_flow_data.append({
+            'Data': day['Data'], 'Tipo': 'Saída', 'Valor': -day['Valor'],
+            'Descricao': f"Diária trabalhada ({day['Status']})", 'Saldo_Impacto': -day['Valor']
+        })
+    df_flow = pd.DataFrame(cash_flow_data)
+    df_flow = df_flow.sort_values('Data')
+    df_flow['Saldo_Acumulado'] = df_flow['Saldo_Impacto'].cumsum()
+    return df_flow
+
+
+def legacy_deposits_dataframe(deposits) -> pd.DataFrame:
+    """Montagem anterior dos depósitos (pd.to_datetime por linha), mantida como referência"""
+    data = []
+    for deposit in deposits:
+        data.append({
+            'Data': pd.to_datetime(deposit['date']),
+            'Valor': deposit['amount'],
+            'Descricao': deposit.get('description', ''),
+            'Saldo_Apos': deposit.get('balanceAfter', 0)
+        })
+    df = pd.DataFrame(data)
+    df = df.sort_values('Data')
+    df['Valor_Acumulado'] = df['Valor'].cumsum()
+    return df
+
+
+def best_of(fn, repeat: int, reset=None) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def end_to_end(size: int, deposit_ratio: float, repeat: int, legacy: bool):
+    """
+    get_cash_flow de um DiariasSystem carregado com o total de eventos pedido
+
+    Returns:
+        (dias, depósitos, tempo atual, tempo com a montagem anterior dos depósitos ou None)
+    """
+    n_deposits = max(1, int(size * deposit_ratio))
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        system = setup_system(directory, size - n_deposits, n_deposits)
+        try:
+            current = best_of(system.get_cash_flow, repeat, reset=system._cache.invalidate)
+            previous = None
+            if legacy:
+                previous = best_of(lambda: build_cash_flow(system.get_working_days_dataframe(),
+                                                           legacy_deposits_dataframe(system.deposits)),
+                                   1, reset=system._cache.invalidate)
+            return len(system.working_days), len(system.deposits), current, previous
+        finally:
+            system.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-legacy', type=int, default=100_000,
+                        help='Maior tamanho medido com as versões anteriores')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--deposit-ratio', type=float, default=0.01,
+                        help='Fração dos eventos que são depósitos')
+    args = parser.parse_args()
+
+    print("build_cash_flow (DataFrames prontos)")
+    print(f"{'eventos':>10} {'vetorizado (s)':>15} {'iterrows (s)':>13} {'ganho':>8}")
+    for size in SIZES:
+        days, deposits = synthetic_frames(size, args.deposit_ratio)
+        vectorized = best_of(lambda: build_cash_flow(days, deposits), args.repeat)
+
+        if size <= args.max_legacy:
+            legacy = best_of(lambda: legacy_cash_flow(days, deposits), 1)
+            print(f"{size:>10,} {vectorized:>15.4f} {legacy:>13.4f} {legacy / vectorized:>7.0f}x")
+        else:
+            print(f"{size:>10,} {vectorized:>15.4f} {'-':>13} {'-':>8}")
+
+    # Ponta a ponta: os dias do sistema têm datas únicas (limitadas por bench_suite)
+    print("\nDiariasSystem.get_cash_flow (ponta a ponta)")
+    print(f"{'dias':>10} {'depósitos':>10} {'atual (s)':>10} {'anterior (s)':>13} {'ganho':>8}")
+    for size in SIZES:
+        n_days, n_deposits, current, previous = end_to_end(size, args.deposit_ratio, args.repeat,
+                                                           size <= args.max_legacy)
+        if previous is not None:
+            print(f"{n_days:>10,} {n_deposits:>10,} {current:>10.4f} {previous:>13.4f} {previous / current:>7.1f}x")
+        else:
+            print(f"{n_days:>10,} {n_deposits:>10,} {current:>10.4f} {'-':>13} {'-':>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da geração do workbook com agregações em paralelo
+Mede o tempo de parede de create_daily_allowance_excel com as agregações das
+abas calculadas em sequência e em processos separados (a montagem do xlsx é
+serial nos dois casos), além do tempo só das agregações
+
+Uso: python benchmarks/bench_parallel_workbook.py [--sizes 10000 100000] [--workers 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import _stubs  # noqa: F401 (coloca a raiz do repositório no path)
+
+from bench_table_writer import synthetic_frame
+from create_excel import SHEET_AGGREGATIONS, create_daily_allowance_excel, load_summary_frame
+from diarias_aggregations import compute_aggregates
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def elapsed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--workers', type=int, default=None, help='Processos do pool (padrão: um por agregação)')
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'linhas':>10} {'agreg. seq (s)':>15} {'agreg. par (s)':>15} {'total seq (s)':>14} {'total par (s)':>14} {'ganho':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            csv_file = os.path.join(directory, f"diarias_{size}.csv")
+            frame = synthetic_frame(size)
+            frame['Data'] = frame['Data'].dt.strftime('%Y-%m-%d')
+            frame.to_csv(csv_file, index=False)
+
+            df = load_summary_frame(csv_file)
+            aggregate_seq = elapsed(lambda: compute_aggregates(df, SHEET_AGGREGATIONS, parallel=False))
+            aggregate_par = elapsed(lambda: compute_aggregates(df, SHEET_AGGREGATIONS, parallel=True,
+                                                               max_workers=args.workers))
+
+            output = os.path.join(directory, 'saida.xlsx')
+            total_seq = elapsed(lambda: create_daily_allowance_excel(csv_file, output, parallel=False))
+            total_par = elapsed(lambda: create_daily_allowance_excel(csv_file, output, parallel=True))
+
+            print(f"{size:>10,} {aggregate_seq:>15.3f} {aggregate_par:>15.3f} "
+                  f"{total_seq:>14.3f} {total_par:>14.3f} {total_seq / total_par:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
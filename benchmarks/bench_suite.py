@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suíte de benchmarks do sistema de diárias
+Mede as análises do DiariasSystem e a geração das planilhas com dados
+sintéticos de 1 mil, 100 mil e 1 milhão de dias (mais 10 mil depósitos),
+registrando tempo de parede, pico de RSS e alocações (tracemalloc). Cada
+caso roda em um processo Python próprio para que o pico de RSS de um caso
+não contamine o seguinte; o resultado é um JSON comparável entre commits.
+
+Uso:
+    python benchmarks/bench_suite.py --output resultados.json
+    python benchmarks/bench_suite.py --sizes 1k 100k --cases get_kpis get_cash_flow
+    python benchmarks/bench_suite.py --output novo.json --compare resultados.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import _stubs
+_stubs.install()
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+DEPOSITS = 10_000
+
+# Os dias do DiariasSystem têm datas únicas em datetime64[ns] (1678-2261):
+# acima deste limite o cenário usa o máximo de dias representável
+SYSTEM_START = np.datetime64('1678-01-01', 'D')
+MAX_SYSTEM_DAYS = int((np.datetime64('2262-01-01', 'D') - SYSTEM_START).astype(np.int64))
+
+SYSTEM_CASES = ['get_working_days_dataframe', 'get_kpis', 'get_monthly_analysis', 'get_cash_flow', '_save_data']
+EXCEL_CASES = ['generate_excel', 'create_daily_allowance_excel']
+CASES = SYSTEM_CASES + EXCEL_CASES
+
+
+# === DADOS SINTÉTICOS ===
+
+def synthetic_state(days: int, deposits: int = DEPOSITS, seed: int = 42) -> Dict[str, Any]:
+    """Estado no formato de diarias_data.json com dias em datas consecutivas"""
+    rng = np.random.default_rng(seed)
+    days = min(days, MAX_SYSTEM_DAYS)
+    dates = np.datetime_as_string(SYSTEM_START + np.arange(days)).tolist()
+    status = np.where(rng.random(days) < 0.5, 'paid', 'pending').tolist()
+    amounts = (rng.integers(1, 50, deposits) * 100.0).tolist()
+    deposit_dates = np.datetime_as_string(
+        np.sort(SYSTEM_START + rng.integers(0, max(days, 1), deposits).astype('timedelta64[D]'))
+    ).tolist()
+
+    balance = 0.0
+    deposit_rows = []
+    for i, (date, amount) in enumerate(zip(deposit_dates, amounts)):
+        balance += amount
+        deposit_rows.append({'date': f"{date}T00:00:00", 'amount': amount,
+                             'description': f"Depósito {i}", 'balanceAfter': balance})
+
+    return {
+        'workingDays': {date: {'status': s, 'notes': ''} for date, s in zip(dates, status)},
+        'deposits': deposit_rows,
+        'creditBalance': balance - days * 250.0
+    }
+
+
+def synthetic_csv(path: str, rows: int):
+    """CSV no formato de diarias_data_simplified.csv"""
+    from bench_table_writer import synthetic_frame
+    frame = synthetic_frame(rows)
+    frame['Data'] = frame['Data'].dt.strftime('%Y-%m-%d')
+    frame.to_csv(path, index=False)
+
+
+# === CASOS ===
+
+def setup_system(directory: str, size: int, deposits: int = DEPOSITS):
+    """DiariasSystem carregado de um snapshot sintético, sem web e sem sincronização automática"""
+    from diarias_sync_system import DiariasSystem
+
+    os.chdir(directory)
+    os.makedirs('excel_report', exist_ok=True)
+    with open(os.path.join('excel_report', 'diarias_data.json'), 'w', encoding='utf-8') as f:
+        json.dump(synthetic_state(size, deposits), f)
+
+    # Debounce longo: o worker Excel não dispara durante as medições
+    return DiariasSystem(auto_start_web=False, auto_sync_interval=3600, sync_debounce=3600)
+
+
+def prepare_case(case: str, size: int, directory: str) -> Tuple[Callable[[], Any], Callable[[], None], Dict[str, Any], Callable[[], None]]:
+    """
+    Prepara um caso
+
+    Returns:
+        (função medida, reset antes de cada execução, metadados, encerramento)
+    """
+    if case in SYSTEM_CASES:
+        system = setup_system(directory, size)
+        info = {'days': len(system.working_days), 'deposits': len(system.deposits)}
+        reset = system._cache.invalidate   # análises sempre calculadas do zero
+        return getattr(system, case), reset, info, system.close
+
+    csv_file = os.path.join(directory, 'diarias.csv')
+    output = os.path.join(directory, 'saida.xlsx')
+    synthetic_csv(csv_file, size)
+    info = {'days': size}
+
+    if case == 'generate_excel':
+        from generate_excel import ExcelGenerator
+        return (lambda: ExcelGenerator().generate_excel(output, source=csv_file)), (lambda: None), info, (lambda: None)
+
+    from create_excel import create_daily_allowance_excel
+    return (lambda: create_daily_allowance_excel(csv_file, output)), (lambda: None), info, (lambda: None)
+
+
+def max_rss_mb() -> float:
+    """Pico de RSS do processo (ru_maxrss é KB no Linux e bytes no macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(case: str, size: int, repeat: int, alloc: bool = True) -> Dict[str, Any]:
+    """Executa um caso no processo atual (chamado pelo processo filho)"""
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        fn, reset, info, close = prepare_case(case, size, directory)
+        rss_before = max_rss_mb()
+
+        times = []
+        for _ in range(repeat):
+            reset()
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        rss_peak = max_rss_mb()
+
+        # Alocações em uma execução separada (tracemalloc deixa o código mais lento)
+        alloc_current = alloc_peak = None
+        if alloc:
+            reset()
+            tracemalloc.start()
+            fn()
+            alloc_current, alloc_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        close()
+        os.chdir(os.path.dirname(directory))
+
+    return dict(info, **{
+        'case': case,
+        'size': size,
+        'repeat': repeat,
+        'wall_s': {'min': min(times), 'median': statistics.median(times), 'max': max(times)},
+        'peak_rss_mb': round(rss_peak, 1),
+        'rss_growth_mb': round(max(0.0, rss_peak - rss_before), 1),
+        'alloc_peak_mb': None if alloc_peak is None else round(alloc_peak / 2 ** 20, 2),
+        'alloc_retained_mb': None if alloc_current is None else round(alloc_current / 2 ** 20, 2)
+    })
+
+
+def spawn_case(case: str, size: int, repeat: int, timeout: Optional[float], alloc: bool = True) -> Dict[str, Any]:
+    """Executa um caso em um interpretador novo e devolve o resultado"""
+    command = [sys.executable, os.path.abspath(__file__), '--child', case, str(size), '--repeat', str(repeat)]
+    if not alloc:
+        command.append('--no-alloc')
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'case': case, 'size': size, 'error': f"tempo limite de {timeout}s excedido"}
+
+    if completed.returncode != 0:
+        error = (completed.stderr.strip().splitlines() or ['erro desconhecido'])[-1]
+        return {'case': case, 'size': size, 'error': error}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# === RELATÓRIO ===
+
+def git_revision() -> Optional[str]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    import pandas as pd
+    return {
+        'commit': git_revision(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def result_key(result: Dict[str, Any]) -> Tuple[str, int]:
+    return result['case'], result['size']
+
+
+def print_results(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None):
+    previous = {result_key(r): r for r in (baseline or {}).get('results', []) if 'error' not in r}
+    header = f"{'caso':<30} {'tamanho':>9} {'dias':>9} {'tempo (s)':>10} {'RSS (MB)':>9} {'alloc (MB)':>11}"
+    print(header + (f" {'vs base':>8}" if baseline else ''))
+
+    for result in results:
+        label = f"{result['case']:<30} {result['size']:>9,}"
+        if 'error' in result:
+            print(f"{label} ❌ {result['error']}")
+            continue
+        alloc = '-' if result['alloc_peak_mb'] is None else f"{result['alloc_peak_mb']:.2f}"
+        line = (f"{label} {result['days']:>9,} {result['wall_s']['median']:>10.4f} "
+                f"{result['peak_rss_mb']:>9.1f} {alloc:>11}")
+        before = previous.get(result_key(result))
+        if before:
+            line += f" {before['wall_s']['median'] / result['wall_s']['median']:>7.2f}x"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', default=list(SIZES), choices=list(SIZES))
+    parser.add_argument('--cases', nargs='+', default=CASES, choices=CASES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-alloc', dest='alloc', action='store_false',
+                        help='Pula a execução extra com tracemalloc (mais rápido nos tamanhos grandes)')
+    parser.add_argument('--timeout', type=float, default=None, help='Tempo limite por caso em segundos')
+    parser.add_argument('--output', help='Arquivo JSON de resultados')
+    parser.add_argument('--compare', help='JSON de uma execução anterior (ganho = tempo anterior / atual)')
+    parser.add_argument('--child', nargs=2, metavar=('CASO', 'TAMANHO'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        case, size = args.child
+        print(json.dumps(run_case(case, int(size), args.repeat, args.alloc)))
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    report = {'environment': environment(), 'deposits': DEPOSITS, 'results': []}
+    for label in args.sizes:
+        for case in args.cases:
+            report['results'].append(spawn_case(case, SIZES[label], args.repeat, args.timeout, args.alloc))
+            print(f"⏱️ {case} ({label}) concluído", file=sys.stderr)
+
+    print_results(report['results'], baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"✅ Resultados salvos em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da gravação da aba de dados detalhados
+Compara o escritor em lote (excel_table_writer.write_table) com a gravação
+anterior célula a célula via iterrows, em linhas por segundo
+
+Uso: python benchmarks/bench_table_writer.py [--sizes 10000 100000] [--max-legacy 100000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+import _stubs  # noqa: F401 (coloca a raiz do repositório no path)
+
+from excel_table_writer import Column, write_table
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+DAY_NAMES = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira']
+MONTHS = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+          'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+
+
+def synthetic_frame(rows: int, projects: int = 200) -> pd.DataFrame:
+    """Gera um DataFrame no formato de diarias_data_simplified.csv"""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'Data': np.datetime64('2000-01-01', 'ns') + rng.integers(0, 9000, rows).astype('timedelta64[D]'),
+        'Dia_Semana': np.array(DAY_NAMES)[rng.integers(0, len(DAY_NAMES), rows)],
+        'Mes': np.array(MONTHS)[rng.integers(0, 12, rows)],
+        'Ano': rng.integers(2000, 2026, rows),
+        'Valor_USD': np.full(rows, 250),
+        'Status_Pagamento': np.where(rng.random(rows) < 0.5, 'Pago', 'A Pagar'),
+        'Local_Projeto': [f"Projeto {i}" for i in rng.integers(0, projects, rows)]
+    })
+
+
+def create_formats(workbook):
+    return {
+        'date': workbook.add_format({'num_format': 'dd/mm/yyyy'}),
+        'data': workbook.add_format({'align': 'center'}),
+        'currency': workbook.add_format({'num_format': '$#,##0'}),
+        'status_pago': workbook.add_format({'bg_color': '#C6EFCE'}),
+        'status_a_pagar': workbook.add_format({'bg_color': '#FFC7CE'})
+    }
+
+
+def legacy_writer(worksheet, df, formats):
+    """Gravação anterior (iterrows + write genérico), mantida como referência"""
+    row = 3
+    for _, record in df.iterrows():
+        worksheet.write_datetime(row, 0, record['Data'], formats['date'])
+        worksheet.write(row, 1, record['Dia_Semana'], formats['data'])
+        worksheet.write(row, 2, record['Mes'], formats['data'])
+        worksheet.write(row, 3, record['Ano'], formats['data'])
+        worksheet.write(row, 4, record['Valor_USD'], formats['currency'])
+        status_format = formats['status_pago'] if record['Status_Pagamento'] == 'Pago' else formats['status_a_pagar']
+        worksheet.write(row, 5, record['Status_Pagamento'], status_format)
+        worksheet.write(row, 6, record['Local_Projeto'], formats['data'])
+        row += 1
+
+
+def bulk_writer(worksheet, df, formats):
+    columns = [
+        Column('Data', 'date', formats['date']),
+        Column('Dia_Semana', 'string', formats['data']),
+        Column('Mes', 'string', formats['data']),
+        Column('Ano', 'number', formats['data']),
+        Column('Valor_USD', 'number', formats['currency']),
+        Column('Status_Pagamento', 'string', formats['status_a_pagar'],
+               value_formats={'Pago': formats['status_pago']}),
+        Column('Local_Projeto', 'string', formats['data'])
+    ]
+    write_table(worksheet, 3, df, columns)
+
+
+def time_writer(writer, df, directory: str) -> float:
+    """Tempo de gravação da aba (modo constant_memory, incluindo o fechamento do arquivo)"""
+    path = os.path.join(directory, f"{writer.__name__}.xlsx")
+    started = time.perf_counter()
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    writer(workbook.add_worksheet('Dados Detalhados'), df, create_formats(workbook))
+    workbook.close()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--max-legacy', type=int, default=100_000,
+                        help='Maior tamanho medido com a versão iterrows')
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'lote (linhas/s)':>16} {'iterrows (linhas/s)':>20} {'ganho':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            df = synthetic_frame(size)
+            bulk = time_writer(bulk_writer, df, directory)
+
+            if size <= args.max_legacy:
+                legacy = time_writer(legacy_writer, df, directory)
+                print(f"{size:>10,} {size / bulk:>16,.0f} {size / legacy:>20,.0f} {legacy / bulk:>6.1f}x")
+            else:
+                print(f"{size:>10,} {size / bulk:>16,.0f} {'-':>20} {'-':>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Verificação do modo streaming (constant_memory)
+Gera o mesmo workbook nos modos normal e streaming - create_excel.py e
+ExcelGenerator - e compara célula a célula (valor e formato) todas as abas.
+No modo constant_memory o xlsxwriter descarta em silêncio as células
+gravadas em uma linha anterior à atual, de modo que qualquer aba fora de
+ordem aparece aqui como células ausentes.
+
+Uso: python benchmarks/verify_streaming.py [--rows 5000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+
+import _stubs  # noqa: F401 (coloca a raiz do repositório no path)
+
+from bench_table_writer import synthetic_frame
+from create_excel import create_daily_allowance_excel
+from generate_excel import ExcelGenerator
+
+NS = {'m': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+
+def _sheet_paths(archive):
+    """Nome da aba -> caminho do XML dentro do pacote, na ordem do workbook"""
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in rels}
+    return [(sheet.get('name'), 'xl/' + targets[sheet.get(REL_NS)].lstrip('/').replace('xl/', '', 1))
+            for sheet in workbook.find('m:sheets', NS)]
+
+
+def _shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    root = ET.fromstring(archive.read('xl/sharedStrings.xml'))
+    return [''.join(node.text or '' for node in item.iter(f"{{{NS['m']}}}t")) for item in root]
+
+
+def read_cells(path):
+    """Aba -> {referência: (valor, formato)}; strings compartilhadas e inline viram texto"""
+    with zipfile.ZipFile(path) as archive:
+        strings = _shared_strings(archive)
+        sheets = {}
+        for name, sheet_path in _sheet_paths(archive):
+            cells = {}
+            root = ET.fromstring(archive.read(sheet_path))
+            for cell in root.iter(f"{{{NS['m']}}}c"):
+                kind = cell.get('t')
+                value = cell.find('m:v', NS)
+                formula = cell.find('m:f', NS)
+                if kind == 's':
+                    text = strings[int(value.text)]
+                elif kind == 'inlineStr':
+                    text = ''.join(node.text or '' for node in cell.iter(f"{{{NS['m']}}}t"))
+                elif formula is not None:
+                    text = '=' + (formula.text or '')
+                else:
+                    text = value.text if value is not None else None
+                cells[cell.get('r')] = (text, cell.get('s'))
+            sheets[name] = cells
+        return sheets
+
+
+def _ref_key(ref):
+    column, row = re.match(r'([A-Z]+)(\d+)', ref).groups()
+    return int(row), len(column), column
+
+
+def compare(normal_path, streaming_path, label):
+    """Imprime as diferenças por aba; retorna o número de células divergentes"""
+    normal, streaming = read_cells(normal_path), read_cells(streaming_path)
+    failures = 0
+    for sheet in sorted(set(normal) | set(streaming)):
+        expected, actual = normal.get(sheet, {}), streaming.get(sheet, {})
+        differing = sorted((ref for ref in set(expected) | set(actual)
+                            if expected.get(ref) != actual.get(ref)), key=_ref_key)
+        status = 'ok' if not differing else f"{len(differing)} células divergentes"
+        print(f"  {label:<16} {sheet:<22} {len(expected):>8} células  {status}")
+        for ref in differing[:5]:
+            print(f"      {ref}: normal={expected.get(ref)} streaming={actual.get(ref)}")
+        failures += len(differing)
+    return failures
+
+
+def synthetic_state(frame, deposits: int = 40):
+    """Estado no formato de diarias_data.json (dias do frame + depósitos)"""
+    status = {'Pago': 'paid', 'A Pagar': 'pending'}
+    days = {date: {'status': status[paid], 'notes': '', 'project': project}
+            for date, paid, project in zip(frame['Data'], frame['Status_Pagamento'], frame['Local_Projeto'])}
+    return {
+        'workingDays': days,
+        'deposits': [{'date': f"2020-{month % 12 + 1:02d}-15T10:00:00", 'amount': 1000.0 + month,
+                      'description': f"Depósito {month}"} for month in range(deposits)],
+        'creditBalance': 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        csv_file = os.path.join(directory, 'diarias_data_simplified.csv')
+        frame = synthetic_frame(args.rows, projects=20)
+        frame['Data'] = frame['Data'].dt.strftime('%Y-%m-%d')
+        frame.to_csv(csv_file, index=False)
+
+        paths = {mode: os.path.join(directory, f"create_excel_{mode}.xlsx") for mode in ('normal', 'streaming')}
+        for mode, path in paths.items():
+            create_daily_allowance_excel(csv_file, path, streaming=(mode == 'streaming'), parallel=False)
+        failures += compare(paths['normal'], paths['streaming'], 'create_excel')
+
+        paths = {mode: os.path.join(directory, f"generate_excel_{mode}.xlsx") for mode in ('normal', 'streaming')}
+        for mode, path in paths.items():
+            generator = ExcelGenerator(constant_memory=(mode == 'streaming'), parallel=False)
+            generator.generate_excel(path, source=csv_file)
+        failures += compare(paths['normal'], paths['streaming'], 'generate_excel')
+
+        # Estado do DiariasSystem: inclui a aba de créditos com depósitos
+        state = synthetic_state(frame)
+        paths = {mode: os.path.join(directory, f"generate_excel_state_{mode}.xlsx") for mode in ('normal', 'streaming')}
+        for mode, path in paths.items():
+            generator = ExcelGenerator(constant_memory=(mode == 'streaming'), parallel=False)
+            generator.load_data_from_state(state)
+            generator.write_workbook(path)
+        failures += compare(paths['normal'], paths['streaming'], 'generate (state)')
+
+    print("✅ Modo streaming idêntico ao normal" if not failures
+          else f"❌ {failures} células divergentes no modo streaming")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,166 +1,93 @@
+import numpy as np
 import pandas as pd
 import xlsxwriter
 from datetime import datetime, timedelta
 import os
+import itertools
+from excel_table_writer import Column, write_table
+from diarias_aggregations import compute_aggregates
+from diarias_calendar import CalendarIndex, MONTH_NAMES, WEEKDAY_HEADERS
+from excel_styles import StyleRegistry
 
-def create_daily_allowance_excel():
-    """Criar planilha Excel profissional para controle de diárias (versão simplificada)"""
-    
-    # Carregar dados simplificados
-    df = pd.read_csv('diarias_data_simplified.csv')
-    
-    # Converter coluna de data
-    df['Data'] = pd.to_datetime(df['Data'])
+# Agregações usadas pelas abas (calculadas em paralelo por compute_aggregates)
+SHEET_AGGREGATIONS = ['kpis', 'monthly', 'projects', 'payments']
+
+# Colunas categóricas: repetem poucos valores distintos em milhões de linhas
+CATEGORY_COLUMNS = ['Dia_Semana', 'Mes', 'Status_Pagamento', 'Local_Projeto']
+
+def load_summary_frame(csv_file, streaming=False):
+    """Carregar o CSV para os resumos (compacto no modo streaming)"""
+    if not streaming:
+        df = pd.read_csv(csv_file)
+        df['Data'] = pd.to_datetime(df['Data'])
+        return df
+    
+    # Categorias e tipos numéricos estreitos mantêm milhões de linhas em poucos MB
+    return pd.read_csv(
+        csv_file,
+        dtype={**{col: 'category' for col in CATEGORY_COLUMNS}, 'Ano': 'int16', 'Valor_USD': 'float32'},
+        parse_dates=['Data']
+    )
+
+def iter_csv_chunks(csv_file, chunksize=50000):
+    """Ler o CSV em blocos, na ordem do arquivo"""
+    for chunk in pd.read_csv(csv_file, chunksize=chunksize):
+        chunk['Data'] = pd.to_datetime(chunk['Data'])
+        yield chunk
+
+def create_daily_allowance_excel(csv_file='diarias_data_simplified.csv',
+                                 filename='Controle_Diarias_Alimentacao_v2.xlsx',
+                                 streaming=False, chunksize=50000, parallel=None):
+    """
+    Criar planilha Excel profissional para controle de diárias (versão simplificada)
+    
+    Args:
+        csv_file: CSV de entrada
+        filename: Arquivo Excel de saída
+        streaming: Usa o modo constant_memory do xlsxwriter (cada linha é gravada
+            em disco assim que a próxima começa) e lê a aba de dados em blocos
+        chunksize: Linhas por bloco lido no modo streaming
+        parallel: Calcula as agregações das abas em processos separados
+            (None: automático a partir de PARALLEL_MIN_ROWS linhas)
+    """
+    
+    # Carregar dados simplificados (com a coluna de data já convertida)
+    df = load_summary_frame(csv_file, streaming)
+    
+    # Agregações de todas as abas (independentes entre si) antes da montagem serial
+    aggregates = compute_aggregates(df, SHEET_AGGREGATIONS, parallel=parallel)
     
     # Criar arquivo Excel
-    filename = 'Controle_Diarias_Alimentacao_v2.xlsx'
-    workbook = xlsxwriter.Workbook(filename)
+    workbook = xlsxwriter.Workbook(filename, {'constant_memory': streaming})
     
     # Definir formatos
     formats = create_formats(workbook)
     
-    # Criar worksheets
-    create_dashboard_sheet(workbook, df, formats)
-    create_data_sheet(workbook, df, formats)
-    create_monthly_summary_sheet(workbook, df, formats)
-    create_project_summary_sheet(workbook, df, formats)
-    create_payment_control_sheet(workbook, df, formats)
-    create_calendar_template_sheet(workbook, formats)
+    # Criar worksheets (no modo streaming a aba de dados consome o CSV em blocos)
+    create_dashboard_sheet(workbook, df, formats, aggregates)
+    create_data_sheet(workbook, iter_csv_chunks(csv_file, chunksize) if streaming else df, formats)
+    create_monthly_summary_sheet(workbook, df, formats, aggregates)
+    create_project_summary_sheet(workbook, df, formats, aggregates)
+    create_payment_control_sheet(workbook, df, formats, aggregates)
+    create_calendar_template_sheet(workbook, formats, df=df)
     
     workbook.close()
     print(f"Planilha criada: {filename}")
     return filename
 
+def with_percent_text(monthly):
+    """Acrescenta o % pago formatado como texto ('45.0%')"""
+    return monthly.assign(Percentual_Texto=monthly['Percentual_Pago'].map('{:.1f}%'.format))
+
 def create_formats(workbook):
-    """Criar formatos para a planilha"""
-    formats = {}
-    
-    # Formato do cabeçalho
-    formats['header'] = workbook.add_format({
-        'bold': True,
-        'font_color': '#FFF6F0',
-        'bg_color': '#692927',
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'font_size': 11
-    })
-    
-    # Formato de título
-    formats['title'] = workbook.add_format({
-        'bold': True,
-        'font_size': 16,
-        'font_color': '#411B38',
-        'align': 'center',
-        'valign': 'vcenter'
-    })
-    
-    # Formato de subtítulo
-    formats['subtitle'] = workbook.add_format({
-        'bold': True,
-        'font_size': 12,
-        'font_color': '#411B38',
-        'align': 'left',
-        'valign': 'vcenter'
-    })
-    
-    # Formato de dados
-    formats['data'] = workbook.add_format({
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'font_size': 10
-    })
-    
-    # Formato de moeda
-    formats['currency'] = workbook.add_format({
-        'num_format': '$#,##0',
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'font_size': 10
-    })
-    
-    # Formato de data
-    formats['date'] = workbook.add_format({
-        'num_format': 'dd/mm/yyyy',
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'font_size': 10
-    })
-    
-    # Formato para status pago
-    formats['status_pago'] = workbook.add_format({
-        'bg_color': '#d4edda',
-        'font_color': '#155724',
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'font_size': 10,
-        'bold': True
-    })
-    
-    # Formato para status a pagar
-    formats['status_a_pagar'] = workbook.add_format({
-        'bg_color': '#fff3cd',
-        'font_color': '#856404',
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'font_size': 10,
-        'bold': True
-    })
-    
-    # Formato KPI
-    formats['kpi_value'] = workbook.add_format({
-        'bold': True,
-        'font_size': 18,
-        'font_color': '#692927',
-        'align': 'center',
-        'valign': 'vcenter'
-    })
-    
-    formats['kpi_label'] = workbook.add_format({
-        'bold': True,
-        'font_size': 11,
-        'font_color': '#411B38',
-        'align': 'center',
-        'valign': 'vcenter'
-    })
-    
-    # Formato para calendário
-    formats['calendar_day'] = workbook.add_format({
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'font_size': 10
-    })
-    
-    formats['calendar_worked'] = workbook.add_format({
-        'bg_color': '#fff3cd',
-        'font_color': '#856404',
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'font_size': 10,
-        'bold': True
-    })
-    
-    formats['calendar_paid'] = workbook.add_format({
-        'bg_color': '#d4edda',
-        'font_color': '#155724',
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'font_size': 10,
-        'bold': True
-    })
-    
-    return formats
+    """Criar formatos para a planilha (registro declarativo, ver excel_styles.STYLE_SETS)"""
+    return StyleRegistry(workbook, 'simplificado')
 
-def create_dashboard_sheet(workbook, df, formats):
-    """Criar aba Dashboard"""
+def create_dashboard_sheet(workbook, df, formats, aggregates=None):
+    """Criar aba Dashboard (aggregates: resultados de compute_aggregates, se já calculados)"""
+    if aggregates is None:
+        aggregates = compute_aggregates(df, ['kpis', 'monthly'], parallel=False)
+    
     worksheet = workbook.add_worksheet('Dashboard')
     worksheet.set_column('A:H', 15)
     
@@ -171,32 +98,25 @@ def create_dashboard_sheet(workbook, df, formats):
     # KPIs principais
     row = 4
     
-    # Calcular KPIs
-    total_dias = len(df)
-    total_valor = total_dias * 250
-    dias_pagos = len(df[df['Status_Pagamento'] == 'Pago'])
-    valor_pago = dias_pagos * 250
-    dias_a_pagar = len(df[df['Status_Pagamento'] == 'A Pagar'])
-    valor_a_pagar = dias_a_pagar * 250
-    percentual_pago = (dias_pagos / total_dias * 100) if total_dias > 0 else 0
+    # KPIs calculados
+    k = aggregates['kpis']
     
     # Escrever KPIs
     kpis = [
-        ('Total de Dias', total_dias),
-        ('Valor Total', f'${total_valor:,}'),
-        ('Dias Pagos', dias_pagos),
-        ('Valor Pago', f'${valor_pago:,}'),
-        ('Dias A Pagar', dias_a_pagar),
-        ('Valor A Pagar', f'${valor_a_pagar:,}'),
-        ('% Pago', f'{percentual_pago:.1f}%'),
+        ('Total de Dias', k['total_dias']),
+        ('Valor Total', f"${k['total_valor']:,}"),
+        ('Dias Pagos', k['dias_pagos']),
+        ('Valor Pago', f"${k['valor_pago']:,}"),
+        ('Dias A Pagar', k['dias_a_pagar']),
+        ('Valor A Pagar', f"${k['valor_a_pagar']:,}"),
+        ('% Pago', f"{k['percentual_pago']:.1f}%"),
         ('Valor Diário', '$250')
     ]
     
-    col = 0
-    for label, value in kpis:
-        worksheet.write(row, col, label, formats['kpi_label'])
-        worksheet.write(row + 1, col, value, formats['kpi_value'])
-        col += 1
+    # Linha inteira de rótulos antes da de valores: no modo streaming
+    # (constant_memory) uma linha anterior não aceita mais células
+    worksheet.write_row(row, 0, [label for label, _ in kpis], formats['kpi_label'])
+    worksheet.write_row(row + 1, 0, [value for _, value in kpis], formats['kpi_value'])
     
     # Resumo mensal
     row = 8
@@ -208,30 +128,19 @@ def create_dashboard_sheet(workbook, df, formats):
     for col, header in enumerate(headers):
         worksheet.write(row, col, header, formats['header'])
     
-    # Dados mensais
-    monthly_summary = df.groupby('Mes').agg({
-        'Data': 'count',
-        'Valor_USD': 'sum',
-        'Status_Pagamento': lambda x: (x == 'Pago').sum()
-    }).reset_index()
-    
-    monthly_summary.columns = ['Mes', 'Total_Dias', 'Valor_Total', 'Dias_Pagos']
-    monthly_summary['Valor_Pago'] = monthly_summary['Dias_Pagos'] * 250
-    monthly_summary['Dias_A_Pagar'] = monthly_summary['Total_Dias'] - monthly_summary['Dias_Pagos']
-    monthly_summary['Valor_A_Pagar'] = monthly_summary['Dias_A_Pagar'] * 250
-    monthly_summary['Percentual_Pago'] = (monthly_summary['Dias_Pagos'] / monthly_summary['Total_Dias'] * 100).round(1)
-    
-    row += 1
-    for idx, month_data in monthly_summary.iterrows():
-        worksheet.write(row, 0, month_data['Mes'], formats['data'])
-        worksheet.write(row, 1, month_data['Total_Dias'], formats['data'])
-        worksheet.write(row, 2, month_data['Valor_Total'], formats['currency'])
-        worksheet.write(row, 3, month_data['Dias_Pagos'], formats['data'])
-        worksheet.write(row, 4, month_data['Valor_Pago'], formats['currency'])
-        worksheet.write(row, 5, month_data['Dias_A_Pagar'], formats['data'])
-        worksheet.write(row, 6, month_data['Valor_A_Pagar'], formats['currency'])
-        worksheet.write(row, 7, f"{month_data['Percentual_Pago']:.1f}%", formats['data'])
-        row += 1
+    # Dados mensais (motor mensal compartilhado, em ordem cronológica)
+    monthly_summary = with_percent_text(aggregates['monthly'])
+    columns = [
+        Column('Mes', 'string', formats['data']),
+        Column('Dias', 'number', formats['data']),
+        Column('Valor', 'number', formats['currency']),
+        Column('Dias_Pagos', 'number', formats['data']),
+        Column('Valor_Pago', 'number', formats['currency']),
+        Column('Dias_A_Pagar', 'number', formats['data']),
+        Column('Valor_A_Pagar', 'number', formats['currency']),
+        Column('Percentual_Texto', 'string', formats['data'])
+    ]
+    write_table(worksheet, row + 1, monthly_summary, columns)
     
     # Criar gráfico de barras
     chart = workbook.add_chart({'type': 'column'})
@@ -253,8 +162,13 @@ def create_dashboard_sheet(workbook, df, formats):
     chart.set_size({'width': 600, 'height': 400})
     worksheet.insert_chart('A16', chart)
 
-def create_data_sheet(workbook, df, formats):
-    """Criar aba com dados detalhados"""
+def create_data_sheet(workbook, data, formats):
+    """
+    Criar aba com dados detalhados
+    
+    Args:
+        data: DataFrame ou iterável de DataFrames (blocos gravados em ordem)
+    """
     worksheet = workbook.add_worksheet('Dados Detalhados')
     
     # Configurar larguras das colunas
@@ -275,111 +189,91 @@ def create_data_sheet(workbook, df, formats):
     for col, header in enumerate(headers):
         worksheet.write(2, col, header, formats['header'])
     
-    # Dados
-    for row, (idx, data) in enumerate(df.iterrows(), start=3):
-        worksheet.write_datetime(row, 0, data['Data'], formats['date'])
-        worksheet.write(row, 1, data['Dia_Semana'], formats['data'])
-        worksheet.write(row, 2, data['Mes'], formats['data'])
-        worksheet.write(row, 3, data['Ano'], formats['data'])
-        worksheet.write(row, 4, data['Valor_USD'], formats['currency'])
-        
-        # Status com formatação condicional
-        status_format = formats['status_pago'] if data['Status_Pagamento'] == 'Pago' else formats['status_a_pagar']
-        worksheet.write(row, 5, data['Status_Pagamento'], status_format)
-        
-        worksheet.write(row, 6, data['Local_Projeto'], formats['data'])
+    # Dados: cada bloco é convertido por coluna e gravado com métodos tipados
+    columns = [
+        Column('Data', 'date', formats['date']),
+        Column('Dia_Semana', 'string', formats['data']),
+        Column('Mes', 'string', formats['data']),
+        Column('Ano', 'number', formats['data']),
+        Column('Valor_USD', 'number', formats['currency']),
+        Column('Status_Pagamento', 'string', formats['data']),
+        Column('Local_Projeto', 'string', formats['data'])
+    ]
+    row = 3 + write_table(worksheet, 3, data, columns)
+    
+    # Cores do status por formatação condicional sobre a coluna inteira
+    formats.apply_status_rules(worksheet, 3, 5, row - 1, 5)
     
     # Adicionar filtros
-    worksheet.autofilter(f'A2:G{len(df)+2}')
+    worksheet.autofilter(f'A2:G{row - 1}')
 
-def create_monthly_summary_sheet(workbook, df, formats):
+def create_monthly_summary_sheet(workbook, df, formats, aggregates=None):
     """Criar aba de resumo mensal"""
+    if aggregates is None:
+        aggregates = compute_aggregates(df, ['monthly'], parallel=False)
+    
     worksheet = workbook.add_worksheet('Resumo Mensal')
     worksheet.set_column('A:H', 15)
     
     # Título
     worksheet.merge_range('A1:H1', 'RESUMO MENSAL DETALHADO', formats['title'])
     
-    # Agrupar por mês
-    monthly_data = df.groupby(['Mes', 'Status_Pagamento']).agg({
-        'Data': 'count',
-        'Valor_USD': 'sum'
-    }).reset_index()
-    
-    # Pivot para melhor visualização
-    pivot_data = monthly_data.pivot_table(
-        index='Mes', 
-        columns='Status_Pagamento', 
-        values=['Data', 'Valor_USD'], 
-        fill_value=0
-    )
-    
     # Cabeçalhos
     row = 3
     headers = ['Mês', 'Dias A Pagar', 'Valor A Pagar', 'Dias Pagos', 'Valor Pago', 'Total Dias', 'Total Valor', '% Pago']
     for col, header in enumerate(headers):
         worksheet.write(row, col, header, formats['header'])
     
-    # Dados
-    row += 1
-    for mes in pivot_data.index:
-        dias_a_pagar = pivot_data.loc[mes, ('Data', 'A Pagar')] if ('Data', 'A Pagar') in pivot_data.columns else 0
-        valor_a_pagar = pivot_data.loc[mes, ('Valor_USD', 'A Pagar')] if ('Valor_USD', 'A Pagar') in pivot_data.columns else 0
-        dias_pagos = pivot_data.loc[mes, ('Data', 'Pago')] if ('Data', 'Pago') in pivot_data.columns else 0
-        valor_pago = pivot_data.loc[mes, ('Valor_USD', 'Pago')] if ('Valor_USD', 'Pago') in pivot_data.columns else 0
-        
-        total_dias = dias_a_pagar + dias_pagos
-        total_valor = valor_a_pagar + valor_pago
-        percentual = (dias_pagos / total_dias * 100) if total_dias > 0 else 0
-        
-        worksheet.write(row, 0, mes, formats['data'])
-        worksheet.write(row, 1, dias_a_pagar, formats['data'])
-        worksheet.write(row, 2, valor_a_pagar, formats['currency'])
-        worksheet.write(row, 3, dias_pagos, formats['data'])
-        worksheet.write(row, 4, valor_pago, formats['currency'])
-        worksheet.write(row, 5, total_dias, formats['data'])
-        worksheet.write(row, 6, total_valor, formats['currency'])
-        worksheet.write(row, 7, f'{percentual:.1f}%', formats['data'])
-        row += 1
+    # Dados (motor mensal compartilhado com o dashboard)
+    columns = [
+        Column('Mes', 'string', formats['data']),
+        Column('Dias_A_Pagar', 'number', formats['data']),
+        Column('Valor_A_Pagar', 'number', formats['currency']),
+        Column('Dias_Pagos', 'number', formats['data']),
+        Column('Valor_Pago', 'number', formats['currency']),
+        Column('Dias', 'number', formats['data']),
+        Column('Valor', 'number', formats['currency']),
+        Column('Percentual_Texto', 'string', formats['data'])
+    ]
+    write_table(worksheet, row + 1, with_percent_text(aggregates['monthly']), columns)
 
-def create_project_summary_sheet(workbook, df, formats):
+def create_project_summary_sheet(workbook, df, formats, aggregates=None):
     """Criar aba de resumo por projeto"""
+    if aggregates is None:
+        aggregates = compute_aggregates(df, ['projects'], parallel=False)
+    
     worksheet = workbook.add_worksheet('Resumo por Projeto')
-    worksheet.set_column('A:G', 18)
+    worksheet.set_column('A:I', 18)
     
     # Título
-    worksheet.merge_range('A1:G1', 'RESUMO POR PROJETO', formats['title'])
+    worksheet.merge_range('A1:I1', 'RESUMO POR PROJETO', formats['title'])
     
     # Cabeçalhos
     row = 3
-    headers = ['Projeto', 'Dias Trabalhados', 'Valor Total', 'Dias Pagos', 'Valor Pago', 'Dias A Pagar', 'Valor A Pagar']
+    headers = ['Projeto', 'Dias Trabalhados', 'Valor Total', 'Dias Pagos', 'Valor Pago', 'Dias A Pagar', 'Valor A Pagar',
+               'Primeiro Dia', 'Último Dia']
     for col, header in enumerate(headers):
         worksheet.write(row, col, header, formats['header'])
     
-    # Processar dados por projeto
-    projects = df['Local_Projeto'].unique()
-    row += 1
-    
-    for project in sorted(projects):
-        project_data = df[df['Local_Projeto'] == project]
-        total_dias = len(project_data)
-        total_valor = total_dias * 250
-        dias_pagos = len(project_data[project_data['Status_Pagamento'] == 'Pago'])
-        valor_pago = dias_pagos * 250
-        dias_a_pagar = total_dias - dias_pagos
-        valor_a_pagar = dias_a_pagar * 250
-        
-        worksheet.write(row, 0, project, formats['data'])
-        worksheet.write(row, 1, total_dias, formats['data'])
-        worksheet.write(row, 2, total_valor, formats['currency'])
-        worksheet.write(row, 3, dias_pagos, formats['data'])
-        worksheet.write(row, 4, valor_pago, formats['currency'])
-        worksheet.write(row, 5, dias_a_pagar, formats['data'])
-        worksheet.write(row, 6, valor_a_pagar, formats['currency'])
-        row += 1
+    # Dados por projeto (agregação única compartilhada: ver project_summary)
+    columns = [
+        Column('Projeto', 'string', formats['data']),
+        Column('Dias', 'number', formats['data']),
+        Column('Valor', 'number', formats['currency']),
+        Column('Dias_Pagos', 'number', formats['data']),
+        Column('Valor_Pago', 'number', formats['currency']),
+        Column('Dias_A_Pagar', 'number', formats['data']),
+        Column('Valor_A_Pagar', 'number', formats['currency']),
+        Column('Primeiro_Dia', 'date', formats['date']),
+        Column('Ultimo_Dia', 'date', formats['date'])
+    ]
+    write_table(worksheet, row + 1, aggregates['projects'], columns)
 
-def create_payment_control_sheet(workbook, df, formats):
+def create_payment_control_sheet(workbook, df, formats, aggregates=None):
     """Criar aba de controle de pagamentos"""
+    if aggregates is None:
+        aggregates = compute_aggregates(df, ['payments'], parallel=False)
+    
     worksheet = workbook.add_worksheet('Controle de Pagamentos')
     worksheet.set_column('A:D', 18)
     
@@ -395,14 +289,14 @@ def create_payment_control_sheet(workbook, df, formats):
         worksheet.write(4, col, header, formats['header'])
     
     # Dados A Pagar
-    pending_data = df[df['Status_Pagamento'] == 'A Pagar'].sort_values('Data')
-    row = 5
-    for idx, data in pending_data.iterrows():
-        worksheet.write_datetime(row, 0, data['Data'], formats['date'])
-        worksheet.write(row, 1, data['Local_Projeto'], formats['data'])
-        worksheet.write(row, 2, data['Valor_USD'], formats['currency'])
-        worksheet.write(row, 3, data['Dia_Semana'], formats['data'])
-        row += 1
+    pending_data = df.take(aggregates['payments']['pending'])
+    pending_columns = [
+        Column('Data', 'date', formats['date']),
+        Column('Local_Projeto', 'string', formats['data']),
+        Column('Valor_USD', 'number', formats['currency']),
+        Column('Dia_Semana', 'string', formats['data'])
+    ]
+    row = 5 + write_table(worksheet, 5, pending_data, pending_columns)
     
     # Seção Pagos
     row += 2
@@ -414,22 +308,43 @@ def create_payment_control_sheet(workbook, df, formats):
         worksheet.write(row, col, header, formats['header'])
     
     # Dados Pagos
-    paid_data = df[df['Status_Pagamento'] == 'Pago'].sort_values('Data', ascending=False)
+    paid_data = df.take(aggregates['payments']['paid'])
+    paid_columns = [
+        Column('Data', 'date', formats['date']),
+        Column('Local_Projeto', 'string', formats['status_pago']),
+        Column('Valor_USD', 'number', formats['currency']),
+        Column('Dia_Semana', 'string', formats['data'])
+    ]
     row += 1
-    for idx, data in paid_data.iterrows():
-        worksheet.write_datetime(row, 0, data['Data'], formats['date'])
-        worksheet.write(row, 1, data['Local_Projeto'], formats['status_pago'])
-        worksheet.write(row, 2, data['Valor_USD'], formats['currency'])
-        worksheet.write(row, 3, data['Dia_Semana'], formats['data'])
-        row += 1
+    write_table(worksheet, row, paid_data, paid_columns)
 
-def create_calendar_template_sheet(workbook, formats):
-    """Criar aba com template de calendário para 2025"""
-    worksheet = workbook.add_worksheet('Calendário 2025')
+def create_calendar_template_sheet(workbook, formats, years=None, df=None):
+    """
+    Criar aba com template de calendário
+    
+    Args:
+        years: (primeiro ano, último ano); padrão: anos cobertos por df, ou 2025
+        df: Diárias já registradas - os dias trabalhados saem marcados com a cor do status
+    """
+    if years is None:
+        years = (int(df['Data'].min().year), int(df['Data'].max().year)) if df is not None and len(df) else (2025, 2025)
+    start_year, end_year = years
+    label = str(start_year) if start_year == end_year else f'{start_year}-{end_year}'
+    
+    calendar_index = CalendarIndex(start_year, end_year)
+    
+    # Marcas por dia: 0 = livre, 1 = a pagar, 2 = pago (o pago prevalece no mesmo dia)
+    if df is not None and len(df):
+        marks = calendar_index.day_marks(df['Data'].to_numpy(), np.where(df['Status_Pagamento'] == 'Pago', 2, 1))
+    else:
+        marks = np.zeros(len(calendar_index), dtype=np.int8)
+    day_formats = [formats['calendar_day'], formats['status_a_pagar'], formats['status_pago']]
+    
+    worksheet = workbook.add_worksheet(f'Calendário {label}')
     worksheet.set_column('A:G', 12)
     
     # Título
-    worksheet.merge_range('A1:G1', 'CALENDÁRIO 2025 - TEMPLATE PARA DIAS TRABALHADOS', formats['title'])
+    worksheet.merge_range('A1:G1', f'CALENDÁRIO {label} - TEMPLATE PARA DIAS TRABALHADOS', formats['title'])
     
     # Instruções
     worksheet.merge_range('A3:G3', 'Instruções: Marque os dias trabalhados alterando a cor da célula', formats['subtitle'])
@@ -437,32 +352,33 @@ def create_calendar_template_sheet(workbook, formats):
     worksheet.write(4, 1, 'A Pagar', formats['status_a_pagar'])
     worksheet.write(4, 2, 'Pago', formats['status_pago'])
     
-    # Criar calendário para cada mês
-    months = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
-              'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+    # Criar calendário para cada mês do intervalo (grades pré-calculadas pelo índice)
+    day_numbers = calendar_index.day.tolist()
+    mark_codes = marks.tolist()
+    blank_format = formats['calendar_day']
     
     row_start = 6
-    for month_idx, month_name in enumerate(months):
-        row = row_start + (month_idx * 10)
+    for month_offset in range((end_year - start_year + 1) * 12):
+        year, month = start_year + month_offset // 12, month_offset % 12 + 1
+        row = row_start + (month_offset * 10)
         
         # Nome do mês
-        worksheet.merge_range(f'A{row+1}:G{row+1}', month_name, formats['header'])
+        month_name = MONTH_NAMES[month - 1] if start_year == end_year else f'{MONTH_NAMES[month - 1]}/{year}'
+        worksheet.merge_range(row, 0, row, 6, month_name, formats['header'])
         
         # Dias da semana
-        weekdays = ['Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb']
-        for col, day in enumerate(weekdays):
-            worksheet.write(row + 1, col, day, formats['header'])
-        
-        # Calcular dias do mês
-        import calendar
-        cal = calendar.monthcalendar(2025, month_idx + 1)
+        worksheet.write_row(row + 1, 0, WEEKDAY_HEADERS, formats['header'])
         
-        for week_idx, week in enumerate(cal):
-            for day_idx, day in enumerate(week):
-                if day == 0:
-                    worksheet.write(row + 2 + week_idx, day_idx, '', formats['calendar_day'])
-                else:
-                    worksheet.write(row + 2 + week_idx, day_idx, day, formats['calendar_day'])
+        # Uma chamada write_row por sequência de células com o mesmo formato
+        # (semana sem marcas = uma chamada; None grava célula em branco)
+        for week_idx, week in enumerate(calendar_index.month_grid(year, month).tolist()):
+            cells = [(None, blank_format) if position < 0 else
+                     (day_numbers[position], day_formats[mark_codes[position]]) for position in week]
+            col = 0
+            for cell_format, run in itertools.groupby(cells, key=lambda cell: cell[1]):
+                values = [value for value, _ in run]
+                worksheet.write_row(row + 2 + week_idx, col, values, cell_format)
+                col += len(values)
 
 if __name__ == "__main__":
     # Mudar para o diretório correto
@@ -59,26 +59,31 @@ window.DiariasSystem = {
         console.log('🚀 Inicializando Sistema de Diárias...');
         this.loadFromStorage();
         this.recalculateBalance();
+        this.detectServer();
         console.log('✅ Sistema inicializado com sucesso!');
     },
     
     // === GERENCIAMENTO DE DIAS TRABALHADOS ===
     
-    addWorkDay: function(date, project = 'Novo Projeto') {
+    createEntry: function(date, project, status = "A Pagar") {
         const dateObj = new Date(date);
         const dayNames = ['Domingo', 'Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado'];
         const monthNames = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 
                            'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'];
         
-        const newEntry = {
+        return {
             data: date,
             diaSemana: dayNames[dateObj.getDay()],
             mes: monthNames[dateObj.getMonth()],
             ano: dateObj.getFullYear(),
             valorUSD: 250,
-            statusPagamento: "A Pagar",
+            statusPagamento: status,
             localProjeto: project
         };
+    },
+    
+    addWorkDay: function(date, project = 'Novo Projeto') {
+        const newEntry = this.createEntry(date, project);
         
         this.workingData.push(newEntry);
         this.sortData();
@@ -86,6 +91,11 @@ window.DiariasSystem = {
         // Descontar automaticamente do crédito
         this.deductFromCredit(250);
         this.saveToStorage();
+        this.pushToServer('POST', '/api/days', {
+            date: date,
+            status: this.serverStatus[newEntry.statusPagamento],
+            project: project
+        });
         
         console.log(`✅ Dia adicionado: ${date} - ${project}`);
         return newEntry;
@@ -99,6 +109,7 @@ window.DiariasSystem = {
             // Devolver crédito
             this.addToCredit(250);
             this.saveToStorage();
+            this.pushToServer('DELETE', `/api/days/${date}`);
             
             console.log(`✅ Dia removido: ${date}`);
             return true;
@@ -111,6 +122,7 @@ window.DiariasSystem = {
         if (item) {
             item.statusPagamento = status;
             this.saveToStorage();
+            this.pushToServer('PATCH', `/api/days/${date}`, { status: this.serverStatus[status] });
             console.log(`✅ Status atualizado: ${date} -> ${status}`);
             return true;
         }
@@ -141,11 +153,17 @@ window.DiariasSystem = {
         this.creditSystem.currentBalance += deposit.amount;
         
         this.saveToStorage();
+        this.pushToServer('POST', '/api/deposits', { amount: deposit.amount, description: description });
         console.log(`💰 Depósito adicionado: $${amount} - ${description}`);
         return deposit;
     },
     
     removeDeposit: function(depositId) {
+        if (this.serverAvailable) {
+            // O sistema Python não remove depósitos: manter a página igual ao servidor
+            this.notifyServerError('A remoção de depósitos não é suportada pelo servidor local');
+            return false;
+        }
         const index = this.creditSystem.deposits.findIndex(d => d.id === depositId);
         if (index !== -1) {
             const deposit = this.creditSystem.deposits[index];
@@ -173,6 +191,20 @@ window.DiariasSystem = {
     },
     
     getCreditInfo: function() {
+        // Com o servidor conectado, saldo e totais vêm do sistema Python (atualizados por SSE)
+        const k = this.serverKPIs;
+        if (k) {
+            return {
+                currentBalance: k.saldo_atual,
+                totalDeposited: k.total_depositado,
+                totalUsed: k.total_ganho,
+                deposits: [...this.creditSystem.deposits],
+                isNegative: k.saldo_atual < 0,
+                daysRemaining: Math.floor(k.saldo_atual / k.valor_diaria),
+                nextPaymentNeeded: k.saldo_atual < 0 ? Math.abs(k.saldo_atual) : 0
+            };
+        }
+        
         return {
             currentBalance: this.creditSystem.currentBalance,
             totalDeposited: this.creditSystem.totalDeposited,
@@ -195,6 +227,20 @@ window.DiariasSystem = {
     // === ANÁLISE DE DADOS ===
     
     getKPIs: function() {
+        // KPIs mantidos pelo servidor: nenhum recálculo sobre os dados locais
+        const k = this.serverKPIs;
+        if (k) {
+            return {
+                totalDias: k.total_dias_trabalhados,
+                totalValor: k.total_ganho,
+                diasPagos: k.dias_pagos,
+                valorPago: k.dias_pagos * k.valor_diaria,
+                diasAPagar: k.dias_pendentes,
+                valorAPagar: k.dias_pendentes * k.valor_diaria,
+                percentualPago: k.taxa_pagamento.toFixed(1)
+            };
+        }
+        
         const totalDias = this.workingData.length;
         const totalValor = totalDias * 250;
         const diasPagos = this.workingData.filter(item => item.statusPagamento === "Pago").length;
@@ -214,6 +260,10 @@ window.DiariasSystem = {
     },
     
     getMonthlyData: function() {
+        if (this.serverMonths) {
+            return this.getServerMonthlyData();
+        }
+        
         const monthlyData = {};
         
         this.workingData.forEach(item => {
@@ -244,6 +294,38 @@ window.DiariasSystem = {
         return monthlyData;
     },
     
+    getServerMonthlyData: function() {
+        // Totais mensais do servidor ({'AAAA-MM': [dias, pagos]}) no formato de getMonthlyData
+        const monthNames = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+                           'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'];
+        const rate = this.serverKPIs.valor_diaria;
+        const monthlyData = {};
+        
+        Object.keys(this.serverMonths).sort().forEach(key => {
+            const [dias, pagos] = this.serverMonths[key];
+            const month = monthNames[parseInt(key.slice(5, 7), 10) - 1];
+            if (!monthlyData[month]) {
+                monthlyData[month] = {
+                    totalDias: 0,
+                    totalValor: 0,
+                    diasPagos: 0,
+                    valorPago: 0,
+                    diasAPagar: 0,
+                    valorAPagar: 0
+                };
+            }
+            
+            monthlyData[month].totalDias += dias;
+            monthlyData[month].totalValor += dias * rate;
+            monthlyData[month].diasPagos += pagos;
+            monthlyData[month].valorPago += pagos * rate;
+            monthlyData[month].diasAPagar += dias - pagos;
+            monthlyData[month].valorAPagar += (dias - pagos) * rate;
+        });
+        
+        return monthlyData;
+    },
+    
     getProjectData: function() {
         const projectData = {};
         
@@ -319,6 +401,195 @@ window.DiariasSystem = {
         return csvContent;
     },
     
+    // === SERVIDOR LOCAL (diarias_server.py) ===
+    
+    // Disponível quando a página é servida pelo servidor local (não em file://)
+    serverAvailable: false,
+    
+    // Status da interface -> status do sistema Python
+    serverStatus: {
+        'Pago': 'paid',
+        'A Pagar': 'pending'
+    },
+    
+    // Mutações enviadas ainda sem resposta
+    pendingRequests: 0,
+    
+    detectServer: function() {
+        if (!window.location.protocol.startsWith('http')) {
+            return Promise.resolve(false);
+        }
+        return fetch('/api/health')
+            .then(response => response.ok)
+            .catch(() => false)
+            .then(available => {
+                this.serverAvailable = available;
+                if (!available) {
+                    return false;
+                }
+                console.log('🔌 Servidor local conectado - alterações enviadas ao Python');
+                return this.loadServerState().then(() => {
+                    this.connectLiveUpdates();
+                    return true;
+                });
+            });
+    },
+    
+    loadServerState: function() {
+        // Com o servidor, calendário, tabela, gráficos e CSV usam o mesmo estado dos KPIs
+        return fetch('/api/state')
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(state => {
+                this.applyServerState(state);
+                window.dispatchEvent(new CustomEvent('diarias:state-loaded'));
+                console.log(`📂 Estado carregado do servidor: ${this.workingData.length} dias`);
+                return true;
+            })
+            .catch(e => {
+                console.warn('⚠️ Erro ao carregar o estado do servidor:', e);
+                return false;
+            });
+    },
+    
+    applyServerState: function(state) {
+        // Estado no formato de diarias_data.json -> workingData / creditSystem
+        this.workingData = Object.entries(state.workingDays || {}).map(([date, day]) =>
+            this.createEntry(date, day.project || 'Sem projeto', day.status === 'paid' ? 'Pago' : 'A Pagar'));
+        this.sortData();
+        
+        const deposits = (state.deposits || []).map((deposit, index) => ({
+            id: deposit.id !== undefined ? deposit.id : index + 1,
+            date: String(deposit.date || '').split('T')[0],
+            amount: deposit.amount,
+            description: deposit.description || '',
+            timestamp: Date.parse(deposit.date) || Date.now()
+        }));
+        const totalDeposited = deposits.reduce((total, deposit) => total + deposit.amount, 0);
+        
+        this.creditSystem = {
+            deposits: deposits,
+            totalDeposited: totalDeposited,
+            totalUsed: this.workingData.length * 250,
+            currentBalance: totalDeposited - this.workingData.length * 250
+        };
+        this.saveToStorage();
+    },
+    
+    isInSyncWithServer: function() {
+        // Compara os KPIs do servidor com os dados exibidos pela página
+        const k = this.serverKPIs;
+        if (!k) {
+            return true;
+        }
+        const diasPagos = this.workingData.filter(item => item.statusPagamento === "Pago").length;
+        return k.total_dias_trabalhados === this.workingData.length &&
+            k.dias_pagos === diasPagos &&
+            Math.abs(k.total_depositado - this.creditSystem.totalDeposited) < 0.005;
+    },
+    
+    pushToServer: function(method, path, body) {
+        // Envia a mutação ao DiariasSystem (sem servidor, apenas o localStorage é usado)
+        if (!this.serverAvailable) {
+            return Promise.resolve(null);
+        }
+        this.pendingRequests++;
+        return fetch(path, {
+            method: method,
+            headers: { 'Content-Type': 'application/json' },
+            body: body ? JSON.stringify(body) : undefined
+        })
+            .then(response => response.json().catch(() => ({})).then(result => {
+                if (!response.ok) {
+                    throw new Error(result.error || `HTTP ${response.status}`);
+                }
+                return result;
+            }))
+            .catch(e => {
+                // Alteração recusada: avisar e desfazer a mudança local com o estado do servidor
+                this.notifyServerError(`O servidor recusou a alteração: ${e.message}`);
+                this.loadServerState();
+                return null;
+            })
+            .finally(() => {
+                this.pendingRequests--;
+            });
+    },
+    
+    notifyServerError: function(message) {
+        console.warn(`⚠️ ${message}`);
+        window.dispatchEvent(new CustomEvent('diarias:server-error', { detail: { message: message } }));
+    },
+    
+    // === ATUALIZAÇÕES EM TEMPO REAL (SSE) ===
+    
+    // Visão do painel mantida pelo servidor: KPIs, totais mensais e versão aplicada
+    serverKPIs: null,
+    serverMonths: null,
+    serverVersion: null,
+    liveSource: null,
+    
+    connectLiveUpdates: function() {
+        if (!window.EventSource || this.liveSource) {
+            return;
+        }
+        
+        // O navegador reconecta sozinho e envia Last-Event-ID: o servidor
+        // responde com os patches perdidos ou com um snapshot novo
+        const source = new EventSource('/api/events');
+        this.liveSource = source;
+        
+        source.addEventListener('snapshot', (e) => {
+            const snapshot = JSON.parse(e.data);
+            this.serverKPIs = snapshot.kpis;
+            this.serverMonths = snapshot.months;
+            this.serverVersion = snapshot.v;
+            this.notifyLiveUpdate();
+            this.refreshIfStale();
+        });
+        
+        source.addEventListener('delta', (e) => {
+            const delta = JSON.parse(e.data);
+            if (this.serverKPIs === null || delta.base !== this.serverVersion) {
+                // Patch fora de sequência: nova conexão sem Last-Event-ID recebe um snapshot
+                source.close();
+                this.liveSource = null;
+                this.connectLiveUpdates();
+                return;
+            }
+            this.applyDelta(delta);
+            this.notifyLiveUpdate();
+            this.refreshIfStale();
+        });
+    },
+    
+    refreshIfStale: function() {
+        // Alterações feitas por outra página (ou pelo Python): recarregar o estado completo
+        if (this.pendingRequests === 0 && !this.isInSyncWithServer()) {
+            this.loadServerState();
+        }
+    },
+    
+    applyDelta: function(delta) {
+        Object.assign(this.serverKPIs, delta.kpis || {});
+        Object.entries(delta.months || {}).forEach(([month, value]) => {
+            if (value === null) {
+                delete this.serverMonths[month];
+            } else {
+                this.serverMonths[month] = value;
+            }
+        });
+        this.serverVersion = delta.v;
+    },
+    
+    notifyLiveUpdate: function() {
+        window.dispatchEvent(new CustomEvent('diarias:live-update', { detail: { version: this.serverVersion } }));
+    },
+    
     // === PERSISTÊNCIA ===
     
     saveToStorage: function() {
@@ -351,6 +622,10 @@ window.DiariasSystem = {
     },
     
     clearAllData: function() {
+        if (this.serverAvailable) {
+            this.notifyServerError('Com o servidor local conectado, os dados são mantidos pelo sistema Python');
+            return false;
+        }
         if (confirm('⚠️ Tem certeza que deseja limpar TODOS os dados? Esta ação não pode ser desfeita.')) {
             this.workingData = [];
             this.creditSystem = {
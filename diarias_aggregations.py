@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agregações por Aba das Planilhas de Diárias
+Funções puras que calculam os resumos de cada aba (KPIs, resumos mensais,
+projetos, divisão pendentes/pagos) a partir do DataFrame de diárias, e um
+pipeline que as executa em paralelo em processos separados; apenas a
+montagem do xlsx continua serial
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from diarias_constants import CSV_COLUMNS, MONTH_NAMES
+
+DAILY_RATE = 250
+
+# Colunas do motor mensal (índice: Periodo)
+MONTHLY_COLUMNS = ['Mes', 'Dias', 'Valor', 'Dias_Pagos', 'Valor_Pago', 'Dias_A_Pagar', 'Valor_A_Pagar',
+                   'Percentual_Pago']
+
+# Colunas do resumo por projeto
+PROJECT_SUMMARY_COLUMNS = ['Projeto', 'Dias', 'Valor', 'Dias_Pagos', 'Valor_Pago',
+                           'Dias_A_Pagar', 'Valor_A_Pagar', 'Primeiro_Dia', 'Ultimo_Dia']
+
+# Abaixo deste tamanho o custo de criar processos supera o ganho
+PARALLEL_MIN_ROWS = 50000
+
+
+# === AGREGAÇÕES (DataFrame com as colunas dos CSVs) ===
+
+def status_kpis(df: pd.DataFrame) -> Dict[str, Any]:
+    """KPIs principais: dias e valores pagos / a pagar"""
+    total_dias = len(df)
+    dias_pagos = int((df['Status_Pagamento'] == 'Pago').sum())
+    dias_a_pagar = int((df['Status_Pagamento'] == 'A Pagar').sum())
+    return {
+        'total_dias': total_dias,
+        'total_valor': total_dias * DAILY_RATE,
+        'dias_pagos': dias_pagos,
+        'valor_pago': dias_pagos * DAILY_RATE,
+        'dias_a_pagar': dias_a_pagar,
+        'valor_a_pagar': dias_a_pagar * DAILY_RATE,
+        'percentual_pago': (dias_pagos / total_dias * 100) if total_dias > 0 else 0
+    }
+
+
+def month_label(period: pd.Period) -> str:
+    """Rótulo do mês com o ano, ex.: 'Janeiro/2025'"""
+    return f"{MONTH_NAMES[period.month - 1]}/{period.year}"
+
+
+def monthly_metrics(dates, paid, pending, values) -> pd.DataFrame:
+    """
+    Motor de agregação mensal: todas as métricas em uma passada vetorizada
+
+    Os meses são períodos reais de ano-mês (ordem cronológica, sem colisão
+    entre anos); meses sem um dos status recebem zero.
+
+    Args:
+        dates: Datas (datetime64 ou equivalente)
+        paid: Máscara booleana das diárias pagas
+        pending: Máscara booleana das diárias a pagar
+        values: Valor de cada diária
+
+    Returns:
+        DataFrame indexado por Periodo (PeriodIndex mensal) com as colunas MONTHLY_COLUMNS
+    """
+    months = np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[M]')
+    periods, codes = np.unique(months, return_inverse=True)
+    n = len(periods)
+
+    paid = np.asarray(paid, dtype=bool)
+    pending = np.asarray(pending, dtype=bool)
+    values = np.asarray(values, dtype=float)
+
+    dias = np.bincount(codes, minlength=n)
+    dias_pagos = np.bincount(codes, weights=paid, minlength=n).astype(np.int64)
+    dias_a_pagar = np.bincount(codes, weights=pending, minlength=n).astype(np.int64)
+
+    index = pd.DatetimeIndex(periods.astype('datetime64[ns]')).to_period('M')
+    index.name = 'Periodo'
+    monthly = pd.DataFrame({
+        'Mes': [month_label(period) for period in index],
+        'Dias': dias,
+        'Valor': np.bincount(codes, weights=values, minlength=n),
+        'Dias_Pagos': dias_pagos,
+        'Valor_Pago': np.bincount(codes, weights=values * paid, minlength=n),
+        'Dias_A_Pagar': dias_a_pagar,
+        'Valor_A_Pagar': np.bincount(codes, weights=values * pending, minlength=n),
+        'Percentual_Pago': np.divide(dias_pagos * 100.0, dias, out=np.zeros(n), where=dias > 0)
+    }, index=index)
+    return monthly
+
+
+def monthly_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """Métricas mensais do DataFrame de diárias (dashboard e aba Resumo Mensal)"""
+    status = df['Status_Pagamento']
+    return monthly_metrics(df['Data'], status == 'Pago', status == 'A Pagar', df['Valor_USD'])
+
+
+def project_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Resumo por projeto em uma única agregação (groupby)
+
+    Colunas: Projeto, Dias, Valor, Dias_Pagos, Valor_Pago, Dias_A_Pagar,
+    Valor_A_Pagar, Primeiro_Dia, Ultimo_Dia (ordenado pelo nome do projeto)
+    """
+    grouped = df.assign(_pago=df['Status_Pagamento'] == 'Pago').groupby(
+        'Local_Projeto', observed=True, sort=False
+    ).agg(
+        Dias=('Data', 'size'),
+        Dias_Pagos=('_pago', 'sum'),
+        Primeiro_Dia=('Data', 'min'),
+        Ultimo_Dia=('Data', 'max')
+    )
+
+    grouped.index = grouped.index.astype(str)
+    summary = grouped.sort_index().rename_axis('Projeto').reset_index()
+    summary['Dias_Pagos'] = summary['Dias_Pagos'].astype('int64')
+    summary['Dias_A_Pagar'] = summary['Dias'] - summary['Dias_Pagos']
+    summary['Valor'] = summary['Dias'] * DAILY_RATE
+    summary['Valor_Pago'] = summary['Dias_Pagos'] * DAILY_RATE
+    summary['Valor_A_Pagar'] = summary['Dias_A_Pagar'] * DAILY_RATE
+    return summary[PROJECT_SUMMARY_COLUMNS]
+
+
+def payment_split(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Posições das linhas pendentes (data crescente) e pagas (data decrescente)
+
+    Retorna posições em vez de DataFrames para que o resultado volte do
+    processo trabalhador sem serializar as linhas.
+    """
+    status = df['Status_Pagamento'].to_numpy()
+    dates = df['Data'].to_numpy()
+    split = {}
+    for key, value, ascending in (('pending', 'A Pagar', True), ('paid', 'Pago', False)):
+        positions = np.flatnonzero(status == value)
+        order = pd.Series(dates[positions]).sort_values(ascending=ascending).index.to_numpy()
+        split[key] = positions[order]
+    return split
+
+
+def monthly_totals(df: pd.DataFrame) -> List[tuple]:
+    """(mês, dias, valor) em ordem cronológica"""
+    monthly = monthly_summary(df)
+    return list(zip(monthly['Mes'], monthly['Dias'].tolist(), monthly['Valor'].tolist()))
+
+
+def status_totals(df: pd.DataFrame) -> List[tuple]:
+    """(status, valor) na ordem de primeira ocorrência"""
+    grouped = df.groupby('Status_Pagamento', sort=False, observed=True)['Valor_USD'].sum()
+    return list(zip(grouped.index, grouped.tolist()))
+
+
+AGGREGATIONS: Dict[str, Callable[[pd.DataFrame], Any]] = {
+    'kpis': status_kpis,
+    'monthly': monthly_summary,
+    'projects': project_summary,
+    'payments': payment_split,
+    'monthly_totals': monthly_totals,
+    'status_totals': status_totals
+}
+
+
+def frame_from_records(records: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    """DataFrame com as colunas dos CSVs a partir de registros do ExcelGenerator"""
+    df = pd.DataFrame.from_records(list(records), columns=list(CSV_COLUMNS.values()))
+    return df.rename(columns={field: column for column, field in CSV_COLUMNS.items()})
+
+
+# === PIPELINE PARALELO ===
+
+_FRAME = None
+
+
+def _init_worker(frame: pd.DataFrame):
+    # Com fork o DataFrame é herdado sem serialização
+    global _FRAME
+    _FRAME = frame
+
+
+def _run_aggregation(name: str) -> Any:
+    return AGGREGATIONS[name](_FRAME)
+
+
+def _pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('fork' if 'fork' in methods else None)
+
+
+def compute_aggregates(df: pd.DataFrame, names: Iterable[str], parallel: Optional[bool] = None,
+                       max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Calcula as agregações pedidas
+
+    Args:
+        df: DataFrame de diárias (colunas dos CSVs)
+        names: Nomes em AGGREGATIONS
+        parallel: True/False força o modo; None usa processos a partir de PARALLEL_MIN_ROWS linhas
+        max_workers: Limite de processos (padrão: uma por agregação, até o número de CPUs)
+
+    Returns:
+        Dicionário nome -> resultado
+    """
+    names = list(dict.fromkeys(names))
+    if parallel is None:
+        parallel = len(df) >= PARALLEL_MIN_ROWS and (os.cpu_count() or 1) > 1
+
+    if not parallel or len(names) < 2:
+        return {name: AGGREGATIONS[name](df) for name in names}
+
+    workers = max_workers or min(len(names), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                             initializer=_init_worker, initargs=(df,)) as pool:
+        futures = {name: pool.submit(_run_aggregation, name) for name in names}
+        return {name: future.result() for name, future in futures.items()}
+
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de Análises do Sistema de Diárias
+Memoriza DataFrames derivados e KPIs por versão dos dados de origem
+"""
+
+import threading
+from typing import Callable, Dict, Hashable, Optional, Any
+
+from diarias_metrics import METRICS
+
+
+class AnalyticsCache:
+    """Cache versionado: cada entrada é válida enquanto sua chave não mudar"""
+
+    def __init__(self):
+        self._entries = {}    # nome -> (chave, valor)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor memorizado para (nome, chave) ou o calcula
+
+        Args:
+            name: Nome do dataset derivado
+            key: Versões das fontes de que o dataset depende
+            compute: Função que calcula o valor em caso de falta
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                METRICS.inc('cache_hits_total')
+                return entry[1]
+            self.misses += 1
+        METRICS.inc('cache_misses_total')
+
+        value = compute()
+
+        with self._lock:
+            self._entries[name] = (key, value)
+        return value
+
+    def invalidate(self, name: Optional[str] = None):
+        """Descarta uma entrada (ou todas)"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de acertos e faltas"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total * 100) if total else 0.0,
+                'entries': sorted(self._entries)
+            }
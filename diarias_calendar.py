@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de Calendário Pré-calculado
+Dia da semana, semana ISO, mês e flag de dia útil para um intervalo de anos
+em arrays numpy compactos, com somas prefixadas para consultas de intervalo
+em O(1) (ex.: dias úteis no mês M) e grades mensais para o template de
+calendário das planilhas
+"""
+
+import numpy as np
+from typing import Iterable, Optional, Tuple
+
+from diarias_constants import MONTH_NAMES
+
+# Cabeçalho das grades mensais (semana começando no domingo)
+WEEKDAY_HEADERS = ['Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb']
+
+
+class CalendarIndex:
+    """Calendário de start_year a end_year (inclusive) em arrays por dia"""
+
+    def __init__(self, start_year: int, end_year: Optional[int] = None,
+                 holidays: Optional[Iterable] = None):
+        """
+        Args:
+            start_year: Primeiro ano do índice
+            end_year: Último ano (padrão: start_year)
+            holidays: Datas que não contam como dia útil
+        """
+        end_year = start_year if end_year is None else end_year
+        if end_year < start_year:
+            raise ValueError(f"Intervalo de anos inválido: {start_year}-{end_year}")
+
+        self.start_year = start_year
+        self.end_year = end_year
+        self.start = np.datetime64(f'{start_year:04d}-01-01', 'D')
+        self.end = np.datetime64(f'{end_year + 1:04d}-01-01', 'D')   # exclusivo
+
+        self.dates = np.arange(self.start, self.end, dtype='datetime64[D]')
+        ordinals = self.dates.astype(np.int64)
+        months = self.dates.astype('datetime64[M]')
+
+        # 1970-01-01 foi uma quinta-feira: segunda = 0 ... domingo = 6
+        self.weekday = ((ordinals + 3) % 7).astype(np.int8)
+        self.month = (months.astype(np.int64) % 12 + 1).astype(np.int8)
+        self.year = (months.astype('datetime64[Y]').astype(np.int64) + 1970).astype(np.int16)
+        self.day = (self.dates - months.astype('datetime64[D]')).astype(np.int64).astype(np.int8) + 1
+
+        # Semana ISO: a semana pertence ao ano da sua quinta-feira
+        thursday = self.dates - self.weekday.astype('timedelta64[D]') + np.timedelta64(3, 'D')
+        iso_year_start = thursday.astype('datetime64[Y]').astype('datetime64[D]')
+        self.iso_week = ((thursday - iso_year_start).astype(np.int64) // 7 + 1).astype(np.int8)
+
+        self.business = self.weekday < 5
+        if holidays is not None:
+            positions = self._positions(holidays, clip=True)
+            self.business[positions[positions >= 0]] = False
+
+        # Somas prefixadas: dias úteis em [0, i) = _business_prefix[i]
+        self._business_prefix = np.concatenate(([0], np.cumsum(self.business, dtype=np.int32)))
+
+        # Posição do primeiro dia de cada mês (mais o fim do índice)
+        n_months = (end_year - start_year + 1) * 12
+        month_starts = np.arange(self.start.astype('datetime64[M]'), n_months + self.start.astype('datetime64[M]'))
+        self._month_starts = np.append((month_starts.astype('datetime64[D]') - self.start).astype(np.int64),
+                                       len(self.dates))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __contains__(self, date) -> bool:
+        value = np.datetime64(date, 'D')
+        return self.start <= value < self.end
+
+    # === POSIÇÕES ===
+
+    def position(self, date) -> int:
+        """Posição de uma data no índice (ValueError se fora do intervalo)"""
+        value = np.datetime64(date, 'D')
+        if not (self.start <= value < self.end):
+            raise ValueError(f"Data fora do calendário {self.start_year}-{self.end_year}: {date}")
+        return int((value - self.start).astype(np.int64))
+
+    def _positions(self, dates, clip: bool = False) -> np.ndarray:
+        """Posições vetorizadas (-1 para datas fora do intervalo se clip=True)"""
+        values = np.asarray(dates, dtype='datetime64[D]')
+        positions = (values - self.start).astype(np.int64)
+        outside = (positions < 0) | (positions >= len(self.dates))
+        if outside.any():
+            if not clip:
+                raise ValueError(f"Datas fora do calendário {self.start_year}-{self.end_year}")
+            positions = np.where(outside, -1, positions)
+        return positions
+
+    def _month_bounds(self, year: int, month: int) -> Tuple[int, int]:
+        index = (year - self.start_year) * 12 + (month - 1)
+        if not (0 <= index < len(self._month_starts) - 1):
+            raise ValueError(f"Mês fora do calendário: {year}-{month:02d}")
+        return int(self._month_starts[index]), int(self._month_starts[index + 1])
+
+    # === CONSULTAS O(1) ===
+
+    def business_days_between(self, start, end) -> int:
+        """Dias úteis entre start e end (inclusive)"""
+        first, last = self.position(start), self.position(end)
+        if last < first:
+            return 0
+        return int(self._business_prefix[last + 1] - self._business_prefix[first])
+
+    def business_days_in_month(self, year: int, month: int) -> int:
+        """Dias úteis no mês"""
+        first, end = self._month_bounds(year, month)
+        return int(self._business_prefix[end] - self._business_prefix[first])
+
+    def days_in_month(self, year: int, month: int) -> int:
+        first, end = self._month_bounds(year, month)
+        return end - first
+
+    def is_business_day(self, date) -> bool:
+        return bool(self.business[self.position(date)])
+
+    # === SELEÇÕES ===
+
+    def business_dates(self, start, end) -> np.ndarray:
+        """Datas úteis entre start e end (inclusive), como datetime64[D]"""
+        first, last = self.position(start), self.position(end)
+        window = slice(first, last + 1)
+        return self.dates[window][self.business[window]]
+
+    def day_marks(self, dates, codes) -> np.ndarray:
+        """
+        Array por dia do índice com o maior código informado para cada data
+
+        Datas fora do intervalo são ignoradas; dias sem data recebem 0.
+        """
+        marks = np.zeros(len(self.dates), dtype=np.int8)
+        positions = self._positions(dates, clip=True)
+        inside = positions >= 0
+        np.maximum.at(marks, positions[inside], np.asarray(codes, dtype=np.int8)[inside])
+        return marks
+
+    def month_grid(self, year: int, month: int) -> np.ndarray:
+        """
+        Grade do mês (semanas x 7, domingo primeiro) com posições no índice
+
+        Células fora do mês valem -1.
+        """
+        first, end = self._month_bounds(year, month)
+        offset = (int(self.weekday[first]) + 1) % 7       # domingo = 0
+        weeks = -(-(offset + end - first) // 7)
+        grid = np.full(weeks * 7, -1, dtype=np.int64)
+        grid[offset:offset + end - first] = np.arange(first, end)
+        return grid.reshape(weeks, 7)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Constantes Compartilhadas do Sistema de Diárias
+Valor da diária, nomes de meses e dias da semana, status de pagamento e
+colunas dos CSVs, usados pelos carregadores, agregações, calendário e
+pelo DiariasSystem
+"""
+
+DAILY_RATE = 250.0
+
+# Nomes usados pelo data.js (getDay(): domingo = 0; date.weekday(): segunda = 0)
+DAY_NAMES = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo']
+MONTH_NAMES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+               'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+
+# Status dos dias no DiariasSystem / data.js e rótulos correspondentes nas planilhas
+DEFAULT_STATUSES = ('pending', 'paid')
+STATUS_VALUES = ('Pago', 'A Pagar')
+STATUS_FROM_SYSTEM = {'paid': 'Pago', 'pending': 'A Pagar'}
+
+DEFAULT_PROJECT = 'Não informado'
+
+# Colunas dos CSVs -> campos do registro
+CSV_COLUMNS = {
+    'Data': 'data',
+    'Dia_Semana': 'diaSemana',
+    'Mes': 'mes',
+    'Ano': 'ano',
+    'Valor_USD': 'valorUSD',
+    'Status_Pagamento': 'statusPagamento',
+    'Local_Projeto': 'localProjeto'
+}
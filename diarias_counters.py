@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contadores Incrementais do Sistema de Diárias
+Contadores mantidos a cada mutação em O(1): total de dias, dias por status,
+dias por mês, total depositado e saldo
+"""
+
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Optional, Any, Iterable, Mapping
+
+from diarias_constants import DAILY_RATE
+
+
+def month_of(date_str: str) -> str:
+    """Mês ('AAAA-MM') de uma data 'AAAA-MM-DD'"""
+    return str(np.datetime64(date_str, 'M'))
+
+
+class DiariasAggregates:
+    """Estado agregado atualizado incrementalmente pelas mutações"""
+
+    def __init__(self, daily_rate: float = DAILY_RATE):
+        self.daily_rate = daily_rate
+        self.total_days = 0
+        self.days_by_status = Counter()
+        self.days_by_month = Counter()
+        self.total_deposited = 0.0
+        self.deposit_count = 0
+
+    @classmethod
+    def from_state(cls, working_days: Mapping[str, Dict[str, Any]], deposits: Iterable[Dict[str, Any]],
+                   daily_rate: float = DAILY_RATE) -> 'DiariasAggregates':
+        """Recalcula os agregados a partir do estado completo"""
+        aggregates = cls(daily_rate)
+        for date_str, day in working_days.items():
+            aggregates.day_added(date_str, day.get('status', 'pending'))
+        for deposit in deposits:
+            aggregates.deposit_added(deposit.get('amount', 0))
+        return aggregates
+
+    # === ATUALIZAÇÕES O(1) ===
+
+    def day_added(self, date_str: str, status: str, previous_status: Optional[str] = None):
+        """Dia adicionado (ou substituído, se previous_status for informado)"""
+        if previous_status is not None:
+            self.status_changed(previous_status, status)
+            return
+        self.total_days += 1
+        self.days_by_status[status] += 1
+        self.days_by_month[month_of(date_str)] += 1
+
+    def day_removed(self, date_str: str, status: str):
+        """Dia removido"""
+        self.total_days -= 1
+        self._decrement(self.days_by_status, status)
+        self._decrement(self.days_by_month, month_of(date_str))
+
+    def status_changed(self, old_status: str, new_status: str):
+        """Status de pagamento alterado"""
+        if old_status == new_status:
+            return
+        self._decrement(self.days_by_status, old_status)
+        self.days_by_status[new_status] += 1
+
+    def deposit_added(self, amount: float):
+        """Depósito adicionado"""
+        self.total_deposited += amount
+        self.deposit_count += 1
+
+    def deposit_removed(self, amount: float):
+        """Depósito removido"""
+        self.total_deposited -= amount
+        self.deposit_count -= 1
+
+    # === LEITURAS O(1) ===
+
+    @property
+    def total_earned(self) -> float:
+        return self.total_days * self.daily_rate
+
+    @property
+    def balance(self) -> float:
+        """Saldo de créditos: total depositado - total ganho"""
+        return self.total_deposited - self.total_earned
+
+    def days_in_month(self, month: str) -> int:
+        return self.days_by_month.get(month, 0)
+
+    def average_days_per_month(self) -> float:
+        return self.total_days / max(1, len(self.days_by_month)) if self.total_days else 0
+
+    # === CONFERÊNCIA ===
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Valores atuais (para comparação)"""
+        return {
+            'total_days': self.total_days,
+            'days_by_status': dict(self.days_by_status),
+            'days_by_month': dict(self.days_by_month),
+            'total_deposited': round(self.total_deposited, 6),
+            'deposit_count': self.deposit_count
+        }
+
+    def verify(self, working_days: Mapping[str, Dict[str, Any]], deposits: Iterable[Dict[str, Any]],
+               reconcile: bool = True) -> List[str]:
+        """
+        Confere os agregados contra um recálculo completo
+
+        Args:
+            working_days: Dias trabalhados atuais
+            deposits: Depósitos atuais
+            reconcile: Se True, adota os valores recalculados em caso de divergência
+
+        Returns:
+            Lista de divergências encontradas (vazia se tudo confere)
+        """
+        expected = DiariasAggregates.from_state(working_days, deposits, self.daily_rate)
+        current, reference = self.snapshot(), expected.snapshot()
+
+        mismatches = [
+            f"{key}: incremental={current[key]!r} recalculado={reference[key]!r}"
+            for key in reference if current[key] != reference[key]
+        ]
+
+        if mismatches and reconcile:
+            self.__dict__.update(expected.__dict__)
+
+        return mismatches
+
+    @staticmethod
+    def _decrement(counter: Counter, key: str):
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
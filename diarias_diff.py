@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de Diferenças do Sistema de Diárias
+Compara o estado em memória com um documento recebido (ex.: da interface
+web) e produz apenas o delta: dias e depósitos adicionados, removidos e
+modificados
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Tuple, Any
+
+
+class DataDelta:
+    """Delta entre dois estados de dias trabalhados e depósitos"""
+
+    def __init__(self):
+        self.days_added = {}       # data -> dados do dia
+        self.days_removed = []     # datas
+        self.days_modified = {}    # data -> novos dados do dia
+        self.deposits_added = []
+        self.deposits_removed = []
+        self.deposits_modified = []  # (antigo, novo)
+        self.balance_changed = False
+
+    def is_empty(self) -> bool:
+        """Indica se não há nenhuma mudança"""
+        return not (self.days_added or self.days_removed or self.days_modified or
+                    self.deposits_added or self.deposits_removed or
+                    self.deposits_modified or self.balance_changed)
+
+    def sources(self) -> List[str]:
+        """Fontes de dados afetadas ('days', 'deposits')"""
+        sources = []
+        if self.days_added or self.days_removed or self.days_modified:
+            sources.append('days')
+        if self.deposits_added or self.deposits_removed or self.deposits_modified:
+            sources.append('deposits')
+        if self.balance_changed and not sources:
+            # O saldo aparece nas abas que dependem das duas fontes
+            sources.append('deposits')
+        return sources
+
+    def discard_removals(self) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Retira do delta os dias e depósitos removidos e os retorna
+
+        Usado com documentos de base desconhecida, em que a ausência de um
+        item não distingue uma remoção externa de um item criado depois.
+        """
+        removed = (self.days_removed, self.deposits_removed)
+        self.days_removed, self.deposits_removed = [], []
+        return removed
+
+    def summary(self) -> str:
+        """Resumo textual do delta"""
+        return (f"dias +{len(self.days_added)} -{len(self.days_removed)} ~{len(self.days_modified)}, "
+                f"depósitos +{len(self.deposits_added)} -{len(self.deposits_removed)} "
+                f"~{len(self.deposits_modified)}")
+
+
+def _deposit_key(deposit: Dict[str, Any]):
+    """Identidade de um depósito: id (web) ou data/hora de criação"""
+    if 'id' in deposit:
+        return ('id', deposit['id'])
+    return ('date', deposit.get('date'))
+
+
+def _index_deposits(deposits: List[Dict[str, Any]]) -> Dict[Tuple, Dict[str, Any]]:
+    # Chaves repetidas recebem um contador de ocorrência
+    index = {}
+    occurrences = defaultdict(int)
+    for deposit in deposits:
+        key = _deposit_key(deposit)
+        index[(key, occurrences[key])] = deposit
+        occurrences[key] += 1
+    return index
+
+
+def diff_days(current: Dict[str, Dict], incoming: Dict[str, Dict], delta: DataDelta):
+    """Preenche o delta de dias trabalhados"""
+    if current == incoming:
+        return
+
+    for date_str, day in incoming.items():
+        old = current.get(date_str)
+        if old is None:
+            delta.days_added[date_str] = day
+        elif old != day:
+            delta.days_modified[date_str] = day
+
+    delta.days_removed = [date_str for date_str in current if date_str not in incoming]
+
+
+def diff_deposits(current: List[Dict], incoming: List[Dict], delta: DataDelta):
+    """Preenche o delta de depósitos"""
+    if current == incoming:
+        return
+
+    # Caso comum: somente novos depósitos no final da lista
+    if len(incoming) > len(current) and incoming[:len(current)] == current:
+        delta.deposits_added = incoming[len(current):]
+        return
+
+    old_index = _index_deposits(current)
+    new_index = _index_deposits(incoming)
+
+    for key, deposit in new_index.items():
+        old = old_index.get(key)
+        if old is None:
+            delta.deposits_added.append(deposit)
+        elif old != deposit:
+            delta.deposits_modified.append((old, deposit))
+
+    delta.deposits_removed = [deposit for key, deposit in old_index.items() if key not in new_index]
+
+
+def compute_delta(current_days: Dict[str, Dict], current_deposits: List[Dict],
+                  incoming_days: Dict[str, Dict], incoming_deposits: List[Dict],
+                  current_balance: float = None, incoming_balance: float = None) -> DataDelta:
+    """
+    Calcula o delta entre o estado atual e o documento recebido
+
+    A comparação começa pela igualdade das coleções inteiras (feita em C),
+    de modo que coleções inalteradas não são percorridas em Python.
+    """
+    delta = DataDelta()
+    diff_days(current_days, incoming_days, delta)
+    diff_deposits(current_deposits, incoming_deposits, delta)
+    if incoming_balance is not None and incoming_balance != current_balance:
+        delta.balance_changed = True
+    return delta
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sincronização Incremental por Dataset
+Envolve o gerenciador criado por create_sync_manager e mantém um hash de
+conteúdo e uma versão por dataset registrado, repassando apenas os
+datasets que realmente mudaram. O gerenciador envolvido continua
+regravando o workbook inteiro a cada sincronização: o ganho está em
+pular as sincronizações sem nenhuma mudança e em não recalcular nem
+reenviar os datasets inalterados.
+"""
+
+import json
+import hashlib
+import pandas as pd
+from typing import Dict, List, Optional, Any, Iterable
+
+# Fontes de dados de que cada dataset sincronizado (uma aba do workbook) depende
+SHEET_DEPENDENCIES = {
+    'dias_trabalhados': ('days',),
+    'depositos': ('deposits',),
+    'analise_mensal': ('days',),
+    'fluxo_caixa': ('days', 'deposits'),
+    'kpis_diarias': ('days', 'deposits'),
+    'configuracao': ('days', 'deposits'),
+}
+
+# Chaves que mudam a cada sincronização e não representam mudança de dados
+VOLATILE_KEYS = ('ultima_atualizacao', 'ultima_sincronizacao')
+
+
+def sheets_for_sources(sources: Iterable[str]) -> List[str]:
+    """Retorna os datasets afetados pela mudança nas fontes informadas"""
+    sources = set(sources)
+    return [sheet for sheet, deps in SHEET_DEPENDENCIES.items() if sources.intersection(deps)]
+
+
+def content_hash(data: Any, volatile_keys: Iterable[str] = VOLATILE_KEYS) -> str:
+    """Calcula um hash estável do conteúdo de um DataFrame ou dicionário"""
+    digest = hashlib.blake2b(digest_size=16)
+
+    if isinstance(data, pd.DataFrame):
+        digest.update(json.dumps([str(c) for c in data.columns]).encode('utf-8'))
+        digest.update(json.dumps([str(t) for t in data.dtypes]).encode('utf-8'))
+        if not data.empty:
+            digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    elif isinstance(data, dict):
+        stable = {k: v for k, v in data.items() if k not in volatile_keys}
+        digest.update(json.dumps(stable, sort_keys=True, default=str).encode('utf-8'))
+    else:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+class IncrementalSyncManager:
+    """Gerenciador de sincronização que só repassa datasets alterados"""
+
+    def __init__(self, manager, volatile_keys: Iterable[str] = VOLATILE_KEYS):
+        """
+        Args:
+            manager: Gerenciador retornado por create_sync_manager
+            volatile_keys: Chaves de dicionário ignoradas no hash
+        """
+        self.manager = manager
+        self.volatile_keys = tuple(volatile_keys)
+        self.hashes = {}       # Hash atual por dataset
+        self.versions = {}     # Versão (número de alterações) por dataset
+        self.changed_datasets = []   # Datasets alterados repassados na última sincronização
+        self.skipped_syncs = 0
+        self._changed = []
+
+    def register_data(self, name: str, data: Any) -> bool:
+        """
+        Registra um dataset se o conteúdo mudou
+
+        Returns:
+            True se o dataset foi repassado ao gerenciador
+        """
+        digest = content_hash(data, self.volatile_keys)
+        if self.hashes.get(name) == digest:
+            return False
+
+        self.hashes[name] = digest
+        self.versions[name] = self.versions.get(name, 0) + 1
+        self.manager.register_data(name, data)
+        if name not in self._changed:
+            self._changed.append(name)
+        return True
+
+    def sync_to_excel(self, force: bool = False) -> List[str]:
+        """
+        Sincroniza com o Excel somente se algum dataset mudou
+
+        O gerenciador envolvido regrava o workbook inteiro; o retorno
+        indica quais datasets motivaram a sincronização, não quais abas
+        foram gravadas.
+
+        Returns:
+            Lista dos datasets alterados desde a sincronização anterior
+        """
+        if not self._changed and not force:
+            self.skipped_syncs += 1
+            self.changed_datasets = []
+            return []
+
+        self.manager.sync_to_excel()
+        self.changed_datasets, self._changed = self._changed, []
+        return list(self.changed_datasets)
+
+    def pending_datasets(self) -> List[str]:
+        """Datasets alterados registrados desde a última sincronização"""
+        return list(self._changed)
+
+    def __getattr__(self, attr):
+        # Demais operações (start_auto_sync, stop_auto_sync, ...) vão direto ao gerenciador
+        if attr == 'manager':
+            raise AttributeError(attr)
+        return getattr(self.manager, attr)
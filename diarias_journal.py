@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Journal de Eventos do Sistema de Diárias
+Registra mutações em um arquivo append-only (JSON Lines) e compacta
+periodicamente o histórico em um snapshot no formato de diarias_data.json
+"""
+
+import json
+import logging
+import os
+import hashlib
+import time
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Tipos de evento registrados no journal
+DAY_ADDED = 'day_added'
+DAY_REMOVED = 'day_removed'
+DAY_STATUS_CHANGED = 'day_status_changed'
+DEPOSIT_ADDED = 'deposit_added'
+DEPOSIT_UPDATED = 'deposit_updated'     # {'index': posição na lista, 'deposit': novo depósito}
+DEPOSIT_REMOVED = 'deposit_removed'     # {'index': posição na lista}
+
+
+def snapshot_digest(content: bytes) -> str:
+    """Hash do conteúdo de um snapshot (identifica gravações próprias)"""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def empty_state() -> Dict[str, Any]:
+    """Retorna o estado vazio no formato do snapshot"""
+    return {
+        'workingDays': {},
+        'deposits': [],
+        'creditBalance': 0.0
+    }
+
+
+def apply_event(state: Dict[str, Any], event: Dict[str, Any]) -> None:
+    """Aplica um evento do journal sobre o estado (usado no replay)"""
+    event_type = event.get('type')
+    days = state.setdefault('workingDays', {})
+
+    if event_type == DAY_ADDED:
+        days[event['date']] = event['day']
+    elif event_type == DAY_REMOVED:
+        days.pop(event['date'], None)
+    elif event_type == DAY_STATUS_CHANGED:
+        if event['date'] in days:
+            days[event['date']]['status'] = event['status']
+    elif event_type == DEPOSIT_ADDED:
+        state.setdefault('deposits', []).append(event['deposit'])
+    elif event_type == DEPOSIT_UPDATED:
+        state['deposits'][event['index']] = event['deposit']
+    elif event_type == DEPOSIT_REMOVED:
+        del state['deposits'][event['index']]
+    else:
+        raise ValueError(f"Tipo de evento desconhecido: {event_type}")
+
+    # Cada evento carrega o saldo após a mutação
+    if 'creditBalance' in event:
+        state['creditBalance'] = event['creditBalance']
+
+
+class EventJournal:
+    """Journal append-only de mutações com compactação periódica em snapshot"""
+
+    def __init__(self, snapshot_file, journal_file=None, fsync_batch: int = 50,
+                 fsync_interval: float = 1.0, compact_every: int = 500):
+        """
+        Inicializa o journal
+
+        Args:
+            snapshot_file: Arquivo de snapshot (formato diarias_data.json)
+            journal_file: Arquivo de eventos (padrão: <snapshot>.journal)
+            fsync_batch: Número de eventos acumulados antes de um fsync
+            fsync_interval: Tempo máximo em segundos entre fsyncs
+            compact_every: Número de eventos no journal que dispara a compactação
+        """
+        self.snapshot_file = Path(snapshot_file)
+        self.journal_file = Path(journal_file) if journal_file else self.snapshot_file.with_suffix('.journal')
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        self.seq = 0                # Último número de sequência emitido
+        self.snapshot_seq = 0       # Último evento incluído no snapshot
+        self.pending_events = 0     # Eventos no journal desde a última compactação
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._snapshot_hash = None
+        self._handle = None
+        self._fsync_timer = None     # fsync adiado do último evento de uma rajada
+        self._lock = threading.RLock()
+
+    # === LEITURA ===
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Carrega o snapshot e reaplica os eventos do journal
+
+        Returns:
+            Estado reconstruído ou None se não houver dados persistidos
+        """
+        with self._lock:
+            state = None
+
+            if self.snapshot_file.exists():
+                content = self.snapshot_file.read_bytes()
+                state = json.loads(content.decode('utf-8'))
+                self.snapshot_seq = state.pop('journalSeq', 0)
+                self._snapshot_hash = snapshot_digest(content)
+
+            self.seq = self.snapshot_seq
+            self.pending_events = 0
+            external = False
+
+            for event in self._read_events():
+                if 'snapshot' in event:
+                    # Cabeçalho gravado na compactação: outro hash indica que a
+                    # interface web regravou o documento, que já contém os
+                    # eventos de origem 'web' (mesma regra do rebase do sistema)
+                    external = state is not None and event['snapshot'] != self._snapshot_hash
+                    continue
+                if event.get('seq', 0) <= self.snapshot_seq:
+                    continue  # Já incluído no snapshot
+                if external and event.get('origin') == 'web':
+                    self.seq = event['seq']
+                    self.pending_events += 1
+                    continue
+                if state is None:
+                    state = empty_state()
+                apply_event(state, event)
+                self.seq = event['seq']
+                self.pending_events += 1
+
+            return state
+
+    def track_snapshot(self):
+        """Registra o hash do snapshot em disco sem interpretá-lo (reconhece gravações próprias)"""
+        with self._lock:
+            if self.snapshot_file.exists():
+                self._snapshot_hash = snapshot_digest(self.snapshot_file.read_bytes())
+
+    def events_since(self, seq: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Eventos posteriores a seq (para reaplicar sobre um documento gravado
+        naquela sequência) ou None se já foram absorvidos por uma compactação
+        """
+        with self._lock:
+            if seq >= self.seq:
+                return []
+            if seq < self.snapshot_seq:
+                return None
+            return [event for event in self._read_events() if event.get('seq', 0) > seq]
+
+    def _read_events(self):
+        """Lê os eventos do journal ignorando uma linha final truncada"""
+        if not self.journal_file.exists():
+            return
+
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Escrita interrompida no final do arquivo
+                    logger.warning("⚠️ Evento truncado ignorado no journal: %s", self.journal_file)
+                    return
+
+    # === ESCRITA ===
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """Acrescenta um evento ao journal (I/O de tamanho constante)"""
+        with self._lock:
+            self.seq += 1
+            record = dict(event, seq=self.seq)
+
+            handle = self._open()
+            handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+            handle.flush()
+
+            self.pending_events += 1
+            self._unsynced += 1
+
+            if (self._unsynced >= self.fsync_batch or
+                    time.monotonic() - self._last_fsync >= self.fsync_interval):
+                self._fsync()
+            else:
+                self._schedule_fsync()
+
+            return self.seq
+
+    def append_many(self, events: List[Dict[str, Any]]) -> int:
+        """Acrescenta vários eventos com uma única escrita e um único fsync"""
+        with self._lock:
+            if not events:
+                return self.seq
+
+            lines = []
+            for event in events:
+                self.seq += 1
+                lines.append(json.dumps(dict(event, seq=self.seq), ensure_ascii=False))
+
+            handle = self._open()
+            handle.write('\n'.join(lines) + '\n')
+            handle.flush()
+
+            self.pending_events += len(events)
+            self._unsynced += len(events)
+            self._fsync()
+
+            return self.seq
+
+    def flush(self):
+        """Força o fsync dos eventos pendentes"""
+        with self._lock:
+            if self._handle is not None and self._unsynced:
+                self._handle.flush()
+                self._fsync()
+
+    def needs_compaction(self) -> bool:
+        """Indica se o journal atingiu o limite para compactação"""
+        return self.pending_events >= self.compact_every
+
+    def compact(self, state: Dict[str, Any]):
+        """
+        Grava o estado completo como snapshot e trunca o journal
+
+        O snapshot é gravado de forma atômica e registra o último evento
+        incluído, de modo que uma falha entre as duas etapas não duplica
+        eventos no replay.
+        """
+        with self._lock:
+            self.flush()
+
+            data = dict(state)
+            data['journalSeq'] = self.seq
+            data['lastUpdate'] = datetime.now().isoformat()
+
+            content = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+            # Registrar o hash antes da troca: o monitor pode disparar logo após
+            self._snapshot_hash = snapshot_digest(content)
+
+            self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.snapshot_file.with_name(self.snapshot_file.name + '.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.snapshot_file)
+
+            self.snapshot_seq = self.seq
+
+            # Truncar o journal, deixando só o cabeçalho com o hash do snapshot
+            self._close_handle()
+            with open(self.journal_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'snapshot': self._snapshot_hash}) + '\n')
+            self.pending_events = 0
+
+    def replace(self, state: Dict[str, Any]):
+        """Substitui todo o estado persistido (no journal JSON, o mesmo que compact)"""
+        self.compact(state)
+
+    def is_own_snapshot(self, content: bytes) -> bool:
+        """Indica se o conteúdo é o último snapshot gravado/lido por este journal"""
+        return self._snapshot_hash is not None and snapshot_digest(content) == self._snapshot_hash
+
+    def close(self):
+        """Faz o fsync final e fecha o arquivo do journal"""
+        with self._lock:
+            if self._fsync_timer is not None:
+                self._fsync_timer.cancel()
+                self._fsync_timer = None
+            self.flush()
+            self._close_handle()
+
+    # === AUXILIARES ===
+
+    def _open(self):
+        if self._handle is None:
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.journal_file, 'a', encoding='utf-8')
+        return self._handle
+
+    def _schedule_fsync(self):
+        """Agenda o fsync para no máximo fsync_interval após o anterior (sem novos eventos)"""
+        if self._fsync_timer is None:
+            delay = max(0.0, self.fsync_interval - (time.monotonic() - self._last_fsync))
+            self._fsync_timer = threading.Timer(delay, self._timed_fsync)
+            self._fsync_timer.daemon = True
+            self._fsync_timer.start()
+
+    def _timed_fsync(self):
+        with self._lock:
+            self._fsync_timer = None
+            self.flush()
+
+    def _fsync(self):
+        if self._handle is not None:
+            os.fsync(self._handle.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    def _close_handle(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Atualizações em Tempo Real do Sistema de Diárias
+Publica a visão do painel (KPIs, saldo e totais mensais) como patches
+versionados. A cada alteração do DiariasSystem a visão é recalculada uma
+única vez, comparada com a anterior, e somente os campos alterados são
+entregues a todos os painéis conectados (Server-Sent Events em
+diarias_server.py).
+
+Mensagens:
+    snapshot: {"v": 7, "kpis": {...}, "months": {"2025-01": [dias, pagos], ...}}
+    delta:    {"v": 8, "base": 7, "kpis": {"dias_pagos": 4}, "months": {"2025-02": [1, 0]}}
+
+Um delta só se aplica sobre a versão "base"; meses removidos aparecem com
+valor null. O id de cada evento ("<fluxo>-<versão>") permite retomar a
+conexão a partir do último evento recebido (cabeçalho Last-Event-ID).
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from diarias_metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+VIEW_SECTIONS = ('kpis', 'months')
+
+_MISSING = object()
+
+
+def diff_view(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Campos de new que diferem de old, por seção (chaves removidas valem None)"""
+    delta = {}
+    for section in VIEW_SECTIONS:
+        before, after = old.get(section, {}), new.get(section, {})
+        changed = {key: value for key, value in after.items() if before.get(key, _MISSING) != value}
+        changed.update((key, None) for key in before if key not in after)
+        if changed:
+            delta[section] = changed
+    return delta
+
+
+class _Subscription:
+    """Fila de mensagens de um painel; se transbordar, o painel recebe um snapshot novo"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.closed = False
+        self.resync = False
+        self._messages = deque()
+        self._event = asyncio.Event()
+
+    def push(self, message: Tuple[int, Dict[str, Any]]):
+        if len(self._messages) >= self.limit:
+            self._messages.clear()
+            self.resync = True
+        else:
+            self._messages.append(message)
+        self._event.set()
+
+    def close(self):
+        self.closed = True
+        self._event.set()
+
+    async def wait(self, timeout: float) -> List[Tuple[int, Dict[str, Any]]]:
+        """Mensagens pendentes ([] se nada chegou dentro de timeout)"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._event.clear()
+        messages = list(self._messages)
+        self._messages.clear()
+        return messages
+
+
+class LiveUpdates:
+    """
+    Difusor da visão do painel para vários clientes
+
+    Rodando no laço de eventos do servidor: as notificações do sistema
+    (de qualquer thread) são agrupadas por `coalesce` segundos e cada
+    recálculo roda uma vez no executor, independentemente do número de
+    painéis conectados.
+    """
+
+    def __init__(self, system, coalesce: float = 0.05, history: int = 256, queue_limit: int = 64):
+        """
+        Args:
+            system: DiariasSystem observado
+            coalesce: Janela em segundos que agrupa rajadas de alterações
+            history: Deltas mantidos para retomar conexões (Last-Event-ID)
+            queue_limit: Mensagens pendentes por painel antes de reenviar um snapshot
+        """
+        self.system = system
+        self.coalesce = coalesce
+        self.queue_limit = queue_limit
+        self.stream_id = format(int(time.time() * 1000), 'x')   # distingue reinícios do servidor
+        self.version = 0
+
+        self._view = None
+        self._stale = False
+        self._history = deque(maxlen=history)
+        self._subscribers: Set[_Subscription] = set()
+        self._loop = None
+        self._refresh_lock = None
+        self._refresh_task = None
+
+    # === CICLO DE VIDA ===
+
+    async def start(self):
+        """Calcula a visão inicial e passa a observar o sistema"""
+        self._loop = asyncio.get_running_loop()
+        self._refresh_lock = asyncio.Lock()
+        self._view = await self._loop.run_in_executor(None, self.system.get_dashboard_view)
+        self.system.add_change_listener(self._on_change)
+
+    def close(self):
+        """Deixa de observar o sistema e encerra os fluxos abertos"""
+        self.system.remove_change_listener(self._on_change)
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        for subscription in list(self._subscribers):
+            subscription.close()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def event_id(self, version: int) -> str:
+        return f"{self.stream_id}-{version}"
+
+    # === ALTERAÇÕES ===
+
+    def _on_change(self, sources: Set[str]):
+        """Ouvinte do DiariasSystem (thread da mutação): apenas agenda o recálculo"""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._schedule)
+
+    def _schedule(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = self._loop.create_task(self._delayed_refresh())
+
+    async def _delayed_refresh(self):
+        await asyncio.sleep(self.coalesce)
+        self._refresh_task = None
+        if not self._subscribers:
+            self._stale = True     # ninguém conectado: recalcula no próximo painel
+            return
+        await self.refresh()
+
+    async def refresh(self) -> Optional[Dict[str, Any]]:
+        """Recalcula a visão e publica o delta (None se nada mudou)"""
+        async with self._refresh_lock:
+            self._stale = False
+            with METRICS.timer('live_refresh_seconds'):
+                view = await self._loop.run_in_executor(None, self.system.get_dashboard_view)
+            return self.publish(view)
+
+    def publish(self, view: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Registra uma nova visão e envia o delta aos painéis"""
+        delta = diff_view(self._view, view)
+        self._view = view
+        if not delta:
+            return None
+
+        self.version += 1
+        message = dict(delta, v=self.version, base=self.version - 1)
+        self._history.append((self.version, message))
+        for subscription in self._subscribers:
+            subscription.push((self.version, message))
+        METRICS.inc('live_deltas_total')
+        return message
+
+    # === FLUXO POR PAINEL ===
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self._view, v=self.version)
+
+    def _backlog(self, last_event_id: Optional[str]) -> Optional[List[Tuple[int, Dict[str, Any]]]]:
+        """Deltas posteriores a last_event_id, ou None se é preciso um snapshot"""
+        if not last_event_id:
+            return None
+        stream_id, _, version = last_event_id.rpartition('-')
+        if stream_id != self.stream_id or not version.isdigit() or int(version) > self.version:
+            return None
+        version = int(version)
+        if version == self.version:
+            return []
+        if not self._history or self._history[0][0] > version + 1:
+            return None
+        return [(v, message) for v, message in self._history if v > version]
+
+    async def stream(self, last_event_id: Optional[str] = None,
+                     heartbeat: float = 15.0) -> AsyncIterator[Optional[Tuple[str, str, Dict[str, Any]]]]:
+        """
+        Eventos (tipo, id, mensagem) para um painel; None a cada `heartbeat`
+        segundos sem alterações (mantém a conexão viva)
+        """
+        if self._stale:
+            await self.refresh()
+
+        subscription = _Subscription(self.queue_limit)
+        self._subscribers.add(subscription)
+        try:
+            backlog = self._backlog(last_event_id)
+            if backlog is None:
+                yield 'snapshot', self.event_id(self.version), self.snapshot()
+            else:
+                for version, message in backlog:
+                    yield 'delta', self.event_id(version), message
+
+            while not subscription.closed:
+                messages = await subscription.wait(heartbeat)
+                if subscription.closed:
+                    break
+                if subscription.resync:
+                    subscription.resync = False
+                    yield 'snapshot', self.event_id(self.version), self.snapshot()
+                    continue
+                if not messages:
+                    yield None
+                for version, message in messages:
+                    yield 'delta', self.event_id(version), message
+        finally:
+            self._subscribers.discard(subscription)
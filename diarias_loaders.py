@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Carregadores de Dados de Diárias
+Leitura em streaming, com validação de esquema, dos formatos produzidos pelo
+sistema: diarias_data.json (DiariasSystem), diarias_data.csv,
+diarias_data_simplified.csv e a exportação do localStorage do data.js
+(diarias_working_data / diarias_credit_system)
+
+Todos os carregadores produzem registros no formato usado pelo ExcelGenerator:
+{data, diaSemana, mes, ano, valorUSD, statusPagamento, localProjeto}
+"""
+
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from diarias_constants import (
+    CSV_COLUMNS, DAILY_RATE, DAY_NAMES, DEFAULT_PROJECT, MONTH_NAMES, STATUS_FROM_SYSTEM, STATUS_VALUES
+)
+
+# Arquivos procurados (em ordem) quando nenhuma fonte é informada
+DEFAULT_SOURCES = ['diarias_data.json', 'diarias_data.csv', 'diarias_data_simplified.csv']
+
+
+class SchemaError(ValueError):
+    """Registro fora do esquema esperado"""
+
+
+# === VALIDAÇÃO ===
+
+def make_record(date_str: str, status: str, project: Optional[str] = None,
+                value: float = DAILY_RATE) -> Dict[str, Any]:
+    """Monta um registro completo a partir da data (dia da semana, mês e ano derivados)"""
+    day = date.fromisoformat(date_str)
+    return {
+        'data': date_str,
+        'diaSemana': DAY_NAMES[day.weekday()],
+        'mes': MONTH_NAMES[day.month - 1],
+        'ano': day.year,
+        'valorUSD': value,
+        'statusPagamento': status,
+        'localProjeto': project or DEFAULT_PROJECT
+    }
+
+
+def validate_record(record: Any, source: str, position: int) -> Dict[str, Any]:
+    """
+    Valida e normaliza um registro no formato do ExcelGenerator
+
+    Campos derivados da data (diaSemana, mes, ano) são preenchidos se ausentes.
+
+    Raises:
+        SchemaError: Se o registro não tiver data válida, valor numérico ou status conhecido
+    """
+    where = f"{source}: registro {position}"
+    if not isinstance(record, dict):
+        raise SchemaError(f"{where}: esperado objeto, recebido {type(record).__name__}")
+
+    date_str = record.get('data')
+    try:
+        day = date.fromisoformat(date_str)
+    except (TypeError, ValueError):
+        raise SchemaError(f"{where}: data inválida {date_str!r}")
+
+    value = record.get('valorUSD', DAILY_RATE)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise SchemaError(f"{where}: valorUSD não numérico {value!r}")
+
+    status = record.get('statusPagamento')
+    if status not in STATUS_VALUES:
+        raise SchemaError(f"{where}: statusPagamento desconhecido {status!r}")
+
+    return {
+        'data': date_str,
+        'diaSemana': record.get('diaSemana') or DAY_NAMES[day.weekday()],
+        'mes': record.get('mes') or MONTH_NAMES[day.month - 1],
+        'ano': record.get('ano') or day.year,
+        'valorUSD': value,
+        'statusPagamento': status,
+        'localProjeto': record.get('localProjeto') or DEFAULT_PROJECT
+    }
+
+
+def validate_deposit(deposit: Any, source: str, position: int) -> Dict[str, Any]:
+    """
+    Valida e normaliza um depósito para a aba de créditos
+
+    A data é reduzida a 'AAAA-MM-DD' (o data.js grava ISO com horário).
+
+    Raises:
+        SchemaError: Se o depósito não tiver valor numérico ou data válida
+    """
+    where = f"{source}: depósito {position}"
+    if not isinstance(deposit, dict):
+        raise SchemaError(f"{where}: esperado objeto, recebido {type(deposit).__name__}")
+
+    amount = deposit.get('amount')
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+        raise SchemaError(f"{where}: sem valor numérico")
+
+    date_str = str(deposit.get('date', ''))[:10]
+    try:
+        datetime.strptime(date_str, '%Y-%m-%d')
+    except ValueError:
+        raise SchemaError(f"{where}: data inválida {deposit.get('date')!r}")
+
+    return {
+        'id': deposit.get('id', position),
+        'date': date_str,
+        'amount': amount,
+        'description': deposit.get('description', '')
+    }
+
+
+def build_credit_data(deposits: List[Dict[str, Any]], total_used: float,
+                      current_balance: Optional[float] = None) -> Dict[str, Any]:
+    """Monta o resumo de créditos no formato do ExcelGenerator"""
+    total_deposited = sum(deposit['amount'] for deposit in deposits)
+    if current_balance is None:
+        current_balance = total_deposited - total_used
+    return {
+        'deposits': deposits,
+        'totalDeposited': total_deposited,
+        'totalUsed': total_used,
+        'currentBalance': current_balance
+    }
+
+
+# === LEITOR JSON INCREMENTAL ===
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class JsonStream:
+    """
+    Leitor JSON incremental sobre um arquivo
+
+    Percorre objetos e arrays grandes elemento a elemento; cada elemento é
+    decodificado com json.JSONDecoder.raw_decode a partir de um buffer de
+    tamanho limitado, sem carregar o documento inteiro.
+    """
+
+    def __init__(self, fh, chunk_size: int = 1 << 20):
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        """Lê mais dados para o buffer (False no fim do arquivo)"""
+        data = self._fh.read(size or self._chunk_size)
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Próximo caractere significativo ('' no fim do arquivo)"""
+        while True:
+            buf = self._buf
+            pos = self._pos = _WHITESPACE.match(buf, self._pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise SchemaError(f"JSON: esperado {char!r}, encontrado {found or 'fim do arquivo'!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decodifica o próximo valor completo"""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+                # Um número no fim do buffer pode continuar no próximo bloco
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return obj
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise SchemaError(f"JSON inválido: {e}")
+            # Valor incompleto: aumentar a leitura para não redecodificar demais
+            self._fill(max(self._chunk_size, len(self._buf) - self._pos))
+
+    def iter_array(self) -> Iterator[Any]:
+        """Itera os elementos de um array"""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise SchemaError(f"JSON: separador inesperado {separator!r} em array")
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Itera as chaves de um objeto
+
+        O chamador deve consumir o valor de cada chave (value(), iter_array()
+        ou iter_object()) antes de pedir a próxima.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise SchemaError(f"JSON: chave inválida {key!r}")
+            self.expect(':')
+            yield key
+            separator = self.peek()
+            self._pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise SchemaError(f"JSON: separador inesperado {separator!r} em objeto")
+
+
+# === CARREGADORES ===
+
+class DiariasLoader(ABC):
+    """
+    Carregador base
+
+    iter_records() produz os registros validados sob demanda; ao final da
+    iteração credit_data contém o resumo de créditos da fonte.
+    """
+
+    name = ''
+    extensions: Tuple[str, ...] = ()
+
+    def __init__(self, daily_rate: float = DAILY_RATE):
+        self.daily_rate = daily_rate
+        self.credit_data = build_credit_data([], 0)
+
+    def detect(self, path: str, head: str) -> bool:
+        """Indica se o arquivo está neste formato (head: início do conteúdo)"""
+        return os.path.splitext(path)[1].lower() in self.extensions
+
+    @abstractmethod
+    def iter_records(self, path: str) -> Iterator[Dict[str, Any]]:
+        """Registros validados do arquivo, sob demanda"""
+
+
+class SystemJsonLoader(DiariasLoader):
+    """diarias_data.json do DiariasSystem: {workingDays: {data: {...}}, deposits: [...], creditBalance}"""
+
+    name = 'json'
+    extensions = ('.json',)
+
+    def detect(self, path: str, head: str) -> bool:
+        return super().detect(path, head) and '"workingDays"' in head
+
+    def iter_records(self, path: str) -> Iterator[Dict[str, Any]]:
+        deposits = []
+        balance = None
+        count = 0
+        total_used = 0.0
+
+        with open(path, 'r', encoding='utf-8') as fh:
+            stream = JsonStream(fh)
+            for key in stream.iter_object():
+                if key == 'workingDays':
+                    for date_str in stream.iter_object():
+                        day = stream.value()
+                        count += 1
+                        record = self._day_record(date_str, day, path, count)
+                        total_used += record['valorUSD']
+                        yield record
+                elif key == 'deposits':
+                    for position, deposit in enumerate(stream.iter_array(), start=1):
+                        deposits.append(validate_deposit(deposit, path, position))
+                elif key == 'creditBalance':
+                    balance = stream.value()
+                else:
+                    stream.value()
+
+        self.credit_data = build_credit_data(deposits, total_used, balance)
+
+    def _day_record(self, date_str: str, day: Any, source: str, position: int) -> Dict[str, Any]:
+        if not isinstance(day, dict):
+            raise SchemaError(f"{source}: workingDays[{date_str!r}] deve ser um objeto")
+        status = STATUS_FROM_SYSTEM.get(day.get('status', 'pending'))
+        if status is None:
+            raise SchemaError(f"{source}: workingDays[{date_str!r}]: status desconhecido {day.get('status')!r}")
+        try:
+            return make_record(date_str, status, day.get('project'), self.daily_rate)
+        except (TypeError, ValueError):
+            raise SchemaError(f"{source}: registro {position}: data inválida {date_str!r}")
+
+
+class LocalStorageLoader(DiariasLoader):
+    """Exportação do localStorage do data.js: {diarias_working_data: [...], diarias_credit_system: {...}}"""
+
+    name = 'localstorage'
+    extensions = ('.json',)
+
+    WORKING_KEY = 'diarias_working_data'
+    CREDIT_KEY = 'diarias_credit_system'
+
+    def detect(self, path: str, head: str) -> bool:
+        return super().detect(path, head) and f'"{self.WORKING_KEY}"' in head
+
+    def iter_records(self, path: str) -> Iterator[Dict[str, Any]]:
+        credit = None
+        total_used = 0.0
+
+        with open(path, 'r', encoding='utf-8') as fh:
+            stream = JsonStream(fh)
+            for key in stream.iter_object():
+                if key == self.WORKING_KEY:
+                    for position, record in enumerate(self._items(stream), start=1):
+                        record = validate_record(record, path, position)
+                        total_used += record['valorUSD']
+                        yield record
+                elif key == self.CREDIT_KEY:
+                    credit = stream.value()
+                    # localStorage guarda o valor como texto JSON
+                    if isinstance(credit, str):
+                        credit = json.loads(credit)
+                else:
+                    stream.value()
+
+        if credit:
+            self.credit_data = {
+                'deposits': [validate_deposit(deposit, path, position)
+                             for position, deposit in enumerate(credit.get('deposits', []), start=1)],
+                'totalDeposited': credit.get('totalDeposited', 0),
+                'totalUsed': credit.get('totalUsed', total_used),
+                'currentBalance': credit.get('currentBalance', 0)
+            }
+        else:
+            self.credit_data = build_credit_data([], total_used)
+
+    @staticmethod
+    def _items(stream: JsonStream) -> Iterator[Any]:
+        # Array exportado diretamente ou texto JSON copiado do localStorage
+        if stream.peek() == '[':
+            return stream.iter_array()
+        value = stream.value()
+        return iter(json.loads(value) if isinstance(value, str) else value)
+
+
+class CsvLoader(DiariasLoader):
+    """diarias_data.csv e diarias_data_simplified.csv (lidos e validados em blocos)"""
+
+    name = 'csv'
+    extensions = ('.csv',)
+
+    def __init__(self, daily_rate: float = DAILY_RATE, chunksize: int = 100000):
+        super().__init__(daily_rate)
+        self.chunksize = chunksize
+
+    def iter_records(self, path: str) -> Iterator[Dict[str, Any]]:
+        total_used = 0.0
+        first_row = 2    # linha 1 é o cabeçalho
+
+        reader = pd.read_csv(path, usecols=list(CSV_COLUMNS), dtype={'Data': str},
+                             chunksize=self.chunksize)
+        for chunk in reader:
+            self._validate_chunk(chunk, path, first_row)
+            first_row += len(chunk)
+
+            chunk['Local_Projeto'] = chunk['Local_Projeto'].fillna(DEFAULT_PROJECT)
+            total_used += float(chunk['Valor_USD'].sum())
+
+            # Registros montados a partir das colunas (mais rápido que to_dict por linha)
+            keys = [CSV_COLUMNS[column] for column in chunk.columns]
+            columns = [chunk[column].tolist() for column in chunk.columns]
+            for values in zip(*columns):
+                yield dict(zip(keys, values))
+
+        self.credit_data = build_credit_data([], total_used)
+
+    @staticmethod
+    def _validate_chunk(chunk: pd.DataFrame, source: str, first_row: int):
+        """Validação vetorizada de um bloco"""
+        checks = [
+            ('data inválida', pd.to_datetime(chunk['Data'], format='%Y-%m-%d', errors='coerce').isna(), 'Data'),
+            ('Valor_USD não numérico', pd.to_numeric(chunk['Valor_USD'], errors='coerce').isna(), 'Valor_USD'),
+            ('Status_Pagamento desconhecido', ~chunk['Status_Pagamento'].isin(STATUS_VALUES), 'Status_Pagamento')
+        ]
+        for message, invalid, column in checks:
+            if invalid.any():
+                position = int(invalid.to_numpy().argmax())
+                value = chunk[column].iloc[position]
+                raise SchemaError(f"{source}: linha {first_row + position}: {message} {value!r}")
+
+
+# Registro de carregadores (ordem de detecção)
+LOADERS = {
+    SystemJsonLoader.name: SystemJsonLoader,
+    LocalStorageLoader.name: LocalStorageLoader,
+    CsvLoader.name: CsvLoader
+}
+
+
+def register_loader(loader_class):
+    """Registra um carregador adicional (pode ser usado como decorador)"""
+    LOADERS[loader_class.name] = loader_class
+    return loader_class
+
+
+def get_loader(path: str, fmt: Optional[str] = None, daily_rate: float = DAILY_RATE) -> DiariasLoader:
+    """
+    Escolhe o carregador pelo nome do formato ou por detecção automática
+
+    Raises:
+        SchemaError: Se nenhum carregador reconhecer o arquivo
+    """
+    if fmt is not None:
+        if fmt not in LOADERS:
+            raise SchemaError(f"Formato desconhecido: {fmt}")
+        return LOADERS[fmt](daily_rate)
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as fh:
+        head = fh.read(65536)
+
+    for loader_class in LOADERS.values():
+        loader = loader_class(daily_rate)
+        if loader.detect(path, head):
+            return loader
+    raise SchemaError(f"Formato não reconhecido: {path}")
+
+
+def find_default_source(directory: str = '.') -> Optional[str]:
+    """Primeira fonte padrão existente no diretório"""
+    for name in DEFAULT_SOURCES:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_diarias(path: str, fmt: Optional[str] = None,
+                 daily_rate: float = DAILY_RATE) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Carrega registros e créditos de uma fonte
+
+    Returns:
+        Tupla (registros, credit_data)
+    """
+    loader = get_loader(path, fmt, daily_rate)
+    records = list(loader.iter_records(path))
+    return records, loader.credit_data
+
+
+def records_from_state(state: Dict[str, Any],
+                       daily_rate: float = DAILY_RATE) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Converte um estado em memória no formato de diarias_data.json (ex.:
+    DiariasSystem.get_state()) com a mesma validação do SystemJsonLoader
+
+    Returns:
+        Tupla (registros, credit_data)
+    """
+    loader = SystemJsonLoader(daily_rate)
+    records = [loader._day_record(date_str, day, 'estado', position)
+               for position, (date_str, day) in enumerate(state.get('workingDays', {}).items(), start=1)]
+    deposits = [validate_deposit(deposit, 'estado', position)
+                for position, deposit in enumerate(state.get('deposits', []), start=1)]
+    total_used = sum(record['valorUSD'] for record in records)
+    return records, build_credit_data(deposits, total_used, state.get('creditBalance'))
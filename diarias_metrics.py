@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas e Perfilamento do Sistema de Diárias
+Temporizadores, contadores e histogramas em memória, exportados em JSON ou
+no formato texto do Prometheus (com endpoint HTTP local opcional), mais a
+captura opcional de cProfile/tracemalloc em torno de uma operação.
+
+Desativadas (padrão), as medições custam uma verificação de atributo por
+chamada. Para ativar: DIARIAS_METRICS=1 no ambiente ou METRICS.enable().
+"""
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Limites dos histogramas de latência (segundos)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_CONTEXT = nullcontext()
+
+
+class Histogram:
+    """Distribuição de observações em faixas cumulativas (estilo Prometheus)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)    # última faixa: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def cumulative(self) -> Iterator[tuple]:
+        """(limite, contagem acumulada) incluindo +Inf"""
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'min': self.min,
+            'max': self.max,
+            'buckets': {('+Inf' if bound == float('inf') else str(bound)): total
+                        for bound, total in self.cumulative()}
+        }
+
+
+class _Timer:
+    """Context manager que registra a duração do bloco em um histograma"""
+
+    __slots__ = ('_metrics', '_name', '_started')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe(self._name, time.perf_counter() - self._started)
+        return False
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics (texto Prometheus) e GET /metrics.json"""
+
+    metrics = None
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            body = self.metrics.to_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif self.path == '/metrics.json':
+            body = json.dumps(self.metrics.snapshot(), ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics %s - %s", self.address_string(), format % args)
+
+
+class Metrics:
+    """Registro de contadores e histogramas do processo"""
+
+    def __init__(self, enabled: bool = False, namespace: str = 'diarias'):
+        self.enabled = enabled
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._server = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    # === REGISTRO ===
+
+    def inc(self, name: str, value: float = 1):
+        """Soma value ao contador"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None):
+        """Registra uma observação no histograma (criado no primeiro uso)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(buckets or DEFAULT_BUCKETS)
+            histogram.observe(value)
+
+    def timer(self, name: str):
+        """
+        Context manager que mede o bloco em segundos
+
+        Exemplo:
+            with METRICS.timer('save_seconds'):
+                ...
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Timer(self, name)
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """Decorador equivalente a timer() em torno da função inteira"""
+        def decorate(fn):
+            metric = name or f"{fn.__qualname__.replace('.', '_')}_seconds"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(metric, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    # === EXPORTAÇÃO ===
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado atual de todas as métricas"""
+        with self._lock:
+            return {
+                'timestamp': datetime.now().isoformat(),
+                'counters': dict(self._counters),
+                'histograms': {name: h.to_dict() for name, h in self._histograms.items()}
+            }
+
+    def write_json(self, path, extra: Optional[Dict[str, Any]] = None) -> Path:
+        """Grava snapshot() (mais os campos de extra) em um arquivo JSON, com substituição atômica"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        content = dict(self.snapshot(), **(extra or {}))
+        tmp.write_text(json.dumps(content, indent=2, ensure_ascii=False, default=str), encoding='utf-8')
+        os.replace(tmp, path)
+        return path
+
+    def _metric_name(self, name: str) -> str:
+        return re.sub(r'[^a-zA-Z0-9_]', '_', f"{self.namespace}_{name}")
+
+    def to_prometheus(self) -> str:
+        """Métricas no formato de exposição texto do Prometheus"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self._counters.items()):
+                metric = self._metric_name(name)
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            for name, histogram in sorted(self._histograms.items()):
+                metric = self._metric_name(name)
+                lines.append(f"# TYPE {metric} histogram")
+                for bound, total in histogram.cumulative():
+                    label = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{metric}_bucket{{le="{label}"}} {total}')
+                lines.append(f"{metric}_sum {histogram.sum}")
+                lines.append(f"{metric}_count {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int = 9108, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Inicia o endpoint local /metrics em uma thread (ativa as métricas)"""
+        if self._server is not None:
+            return self._server
+        self.enable()
+        handler = type('MetricsHandler', (_MetricsHandler,), {'metrics': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True).start()
+        logger.info("📈 Métricas em http://%s:%d/metrics", host, self._server.server_port)
+        return self._server
+
+    def stop_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # === PERFILAMENTO ===
+
+    @contextmanager
+    def profile(self, name: str, output_dir, enabled: bool = True, top: int = 30):
+        """
+        Captura cProfile e tracemalloc do bloco (opt-in)
+
+        Grava <nome>_<data>.prof (abrir com pstats/snakeviz) e um resumo
+        <nome>_<data>.txt com as funções mais caras e as maiores alocações.
+        Produz um dicionário preenchido com os caminhos ao final do bloco.
+        """
+        result = {}
+        if not enabled:
+            yield result
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield result
+        finally:
+            profiler.disable()
+            memory = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            stem = f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            profile_file = output_dir / f"{stem}.prof"
+            summary_file = output_dir / f"{stem}.txt"
+            profiler.dump_stats(profile_file)
+
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(top)
+            summary.write(f"\nMemória: atual {current / 2 ** 20:.2f} MB, pico {peak / 2 ** 20:.2f} MB\n")
+            for stat in memory.statistics('lineno')[:top]:
+                summary.write(f"{stat}\n")
+            summary_file.write_text(summary.getvalue(), encoding='utf-8')
+
+            result.update(profile=str(profile_file), summary=str(summary_file), peak_bytes=peak)
+            logger.info("🔬 Perfil de %s gravado em %s", name, profile_file)
+
+
+# Registro global do processo
+METRICS = Metrics(enabled=os.environ.get('DIARIAS_METRICS', '') not in ('', '0'))
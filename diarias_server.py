@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor HTTP Local do Sistema de Diárias
+Servidor asyncio em torno do DiariasSystem que substitui o
+`python -m http.server` e o polling de diarias_data.json:
+
+- arquivos da interface (index.html, app.js, data.js, styles.css) com
+  ETag e Cache-Control (revalidação responde 304 sem corpo);
+- endpoints JSON para KPIs, consultas e mutações (cada mutação chega ao
+  Python em uma requisição e a resposta já traz os KPIs atualizados);
+- /export.xlsx com a planilha completa do ExcelGenerator, gerada em memória,
+  enviada em blocos e mantida em cache até a próxima alteração dos dados;
+- /api/events: Server-Sent Events com os patches versionados de KPIs,
+  saldo e totais mensais (diarias_live), calculados uma vez por alteração
+  para todos os painéis abertos.
+
+Se a porta estiver ocupada as seguintes são tentadas; SIGINT/SIGTERM
+encerram o servidor aguardando as requisições em andamento.
+
+Uso:
+    python diarias_server.py --port 8080
+    python diarias_server.py --port 8080 --storage sqlite
+"""
+
+import argparse
+import asyncio
+import errno
+import hashlib
+import json
+import logging
+import mimetypes
+import signal
+from datetime import datetime
+from email.utils import formatdate
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from diarias_live import LiveUpdates
+from diarias_metrics import METRICS
+from diarias_constants import DEFAULT_STATUSES
+from diarias_sync_system import DiariasSystem, configurar_log
+from generate_excel import ExcelGenerator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8080
+
+# Arquivos estáticos servidos (o restante do diretório - .py, .db, journal - não é exposto)
+STATIC_EXTENSIONS = {'.html', '.js', '.css', '.png', '.jpg', '.jpeg', '.svg', '.ico', '.woff', '.woff2'}
+
+XLSX_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+MAX_HEADER_LINES = 100
+MAX_BODY_BYTES = 1 << 20
+CHUNK_SIZE = 64 * 1024
+
+# Server-Sent Events: comentário de keep-alive e espera do navegador antes de reconectar
+SSE_HEARTBEAT = 15.0
+SSE_RETRY_MS = 3000
+
+
+class HttpError(Exception):
+    """Erro com status HTTP, devolvido ao cliente como {"error": mensagem}"""
+
+    def __init__(self, status: int, message: str = ''):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+
+
+class Request:
+    """Requisição HTTP já lida (linha inicial, cabeçalhos e corpo)"""
+
+    __slots__ = ('method', 'path', 'query', 'version', 'headers', 'body')
+
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str], body: bytes):
+        url = urlsplit(target)
+        self.method = method
+        self.path = unquote(url.path)
+        self.query = dict(parse_qsl(url.query))
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    def json(self) -> Dict[str, Any]:
+        """Corpo JSON (objeto) da requisição"""
+        try:
+            data = json.loads(self.body.decode('utf-8') or '{}')
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HttpError(400, f"JSON inválido: {e}")
+        if not isinstance(data, dict):
+            raise HttpError(400, "O corpo deve ser um objeto JSON")
+        return data
+
+
+def _validate_status(status: Any) -> str:
+    """Status de pagamento de um dia (400 se ausente ou desconhecido)"""
+    if status not in DEFAULT_STATUSES:
+        raise HttpError(400, f"Campo 'status' deve ser um de: {', '.join(DEFAULT_STATUSES)}")
+    return status
+
+
+def _json_default(value: Any) -> Any:
+    """Converte escalares numpy/pandas e datas para JSON"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+class StaticFiles:
+    """Arquivos da interface em memória, revalidados pelo mtime/tamanho a cada requisição"""
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self._files = {}    # caminho -> (mtime_ns, tamanho, conteúdo, etag)
+
+    def get(self, url_path: str) -> Optional[Tuple[bytes, str, str]]:
+        """(conteúdo, etag, content-type) ou None se o arquivo não existe/não é servido"""
+        relative = url_path.lstrip('/') or 'index.html'
+        path = (self.root / relative).resolve()
+        if path.suffix.lower() not in STATIC_EXTENSIONS or not path.is_relative_to(self.root):
+            return None
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        cached = self._files.get(path)
+        if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+            content = path.read_bytes()
+            etag = f'"{hashlib.sha1(content).hexdigest()[:20]}"'
+            cached = self._files[path] = (stat.st_mtime_ns, stat.st_size, content, etag)
+
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        return cached[2], cached[3], content_type
+
+
+class DiariasServer:
+    """
+    Servidor HTTP/1.1 (keep-alive) sobre asyncio.start_server
+
+    As chamadas ao DiariasSystem rodam no executor padrão: o sistema já é
+    protegido por lock e o laço de eventos continua atendendo outras
+    conexões durante gravações e geração de planilhas.
+    """
+
+    def __init__(self, system: DiariasSystem, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                 static_dir=None, port_attempts: int = 10, shutdown_timeout: float = 10.0,
+                 owns_system: bool = False):
+        """
+        Args:
+            system: Sistema de diárias atendido pelos endpoints
+            host: Interface de escuta (padrão: somente local)
+            port: Porta preferida (0: escolhida pelo sistema operacional)
+            static_dir: Diretório da interface web (padrão: diretório deste módulo)
+            port_attempts: Portas tentadas em sequência se a preferida estiver ocupada
+            shutdown_timeout: Espera máxima pelas requisições em andamento no encerramento
+            owns_system: Fecha o sistema ao encerrar o servidor
+        """
+        self.system = system
+        self.host = host
+        self.port = port
+        self.port_attempts = max(1, port_attempts)
+        self.shutdown_timeout = shutdown_timeout
+        self.owns_system = owns_system
+        self.static = StaticFiles(static_dir or Path(__file__).parent)
+        self.live = LiveUpdates(system)
+
+        self._server = None
+        self._stopping = None
+        self._connections = set()   # tarefas das conexões abertas
+        self._idle = set()          # writers aguardando a próxima requisição
+
+        # Última planilha exportada ((versão dos dados, diária), bytes) e gerações em andamento
+        self._export_cache = None
+        self._export_tasks = {}
+
+        self._routes = {
+            ('GET', '/api/health'): self._health,
+            ('GET', '/api/kpis'): self._kpis,
+            ('GET', '/api/state'): self._state,
+            ('GET', '/api/monthly'): self._monthly,
+            ('GET', '/api/days'): self._list_days,
+            ('POST', '/api/days'): self._add_day,
+            ('POST', '/api/deposits'): self._add_deposit,
+        }
+
+    # === CICLO DE VIDA ===
+
+    async def start(self) -> int:
+        """Abre o socket de escuta e devolve a porta efetivamente usada"""
+        self._stopping = asyncio.Event()
+        await self.live.start()
+        last_error = None
+        ports = [self.port] if self.port == 0 else range(self.port, self.port + self.port_attempts)
+        for port in ports:
+            try:
+                # reuse_address: reinícios não esperam o TIME_WAIT da execução anterior
+                self._server = await asyncio.start_server(self._handle_connection, self.host, port,
+                                                          reuse_address=True)
+                break
+            except OSError as e:
+                if e.errno != errno.EADDRINUSE:
+                    raise
+                last_error = e
+                logger.warning("⚠️ Porta %d em uso, tentando a próxima", port)
+        else:
+            raise OSError(errno.EADDRINUSE, f"Nenhuma porta livre entre {self.port} e "
+                                            f"{self.port + self.port_attempts - 1}") from last_error
+
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("🌐 Servidor em http://%s:%d/", self.host, self.port)
+        return self.port
+
+    async def serve_forever(self):
+        """Atende até stop() ou SIGINT/SIGTERM e então encerra de forma ordenada"""
+        if self._server is None:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        installed = []
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+                installed.append(sig)
+            except (NotImplementedError, RuntimeError):
+                pass   # Windows / fora da thread principal: apenas stop()
+
+        try:
+            await self._stopping.wait()
+        finally:
+            for sig in installed:
+                loop.remove_signal_handler(sig)
+            await self.shutdown()
+
+    def stop(self):
+        """Solicita o encerramento (seguro a partir do laço de eventos)"""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def shutdown(self):
+        """Para de aceitar conexões, conclui as requisições em andamento e fecha o sistema"""
+        if self._server is None:
+            return
+        logger.info("🛑 Encerrando servidor...")
+        self._server.close()
+        self.live.close()    # encerra os fluxos de eventos
+
+        # Conexões ociosas (keep-alive) são fechadas; as ativas terminam a resposta atual
+        for writer in list(self._idle):
+            writer.close()
+        if self._connections:
+            done, pending = await asyncio.wait(set(self._connections), timeout=self.shutdown_timeout)
+            for task in pending:
+                task.cancel()
+        await self._server.wait_closed()
+        self._server = None
+
+        if self.owns_system:
+            await asyncio.get_running_loop().run_in_executor(None, self.system.close)
+        logger.info("✅ Servidor encerrado")
+
+    # === CONEXÕES ===
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while not self._stopping.is_set():
+                self._idle.add(writer)
+                try:
+                    request = await self._read_request(reader)
+                finally:
+                    self._idle.discard(writer)
+                if request is None:
+                    break
+
+                if request.method == 'GET' and request.path == '/api/events':
+                    # Fluxo de eventos: a conexão fica dedicada ao painel até ele sair
+                    await self._events(request, writer)
+                    break
+
+                keep_alive = request.keep_alive and not self._stopping.is_set()
+                await self._dispatch(request, writer, keep_alive)
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            await self._send_json(writer, e.status, {'error': str(e)}, keep_alive=False)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        """Lê uma requisição (None se o cliente fechou a conexão)"""
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HttpError(400, "Linha de requisição inválida")
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HttpError(431, "Cabeçalhos demais")
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HttpError(400, "Content-Length inválido")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Corpo da requisição muito grande")
+        body = await reader.readexactly(length) if length else b''
+        return Request(method.upper(), target, version, headers, body)
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter, keep_alive: bool):
+        METRICS.inc('http_requests_total')
+        with METRICS.timer('http_request_seconds'):
+            try:
+                if request.path == '/export.xlsx':
+                    if request.method not in ('GET', 'HEAD'):
+                        raise HttpError(405)
+                    await self._export_xlsx(request, writer, keep_alive)
+                    return
+
+                handler, args = self._route(request)
+                if handler is not None:
+                    status, payload = await handler(request, *args)
+                    await self._send_json(writer, status, payload, keep_alive)
+                elif request.method in ('GET', 'HEAD'):
+                    await self._send_static(request, writer, keep_alive)
+                else:
+                    raise HttpError(405)
+            except HttpError as e:
+                await self._send_json(writer, e.status, {'error': str(e)}, keep_alive)
+            except (ConnectionError, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                METRICS.inc('http_errors_total')
+                logger.exception("❌ Erro em %s %s", request.method, request.path)
+                await self._send_json(writer, 500, {'error': str(e)}, keep_alive)
+
+    def _route(self, request: Request) -> Tuple[Optional[Callable], tuple]:
+        handler = self._routes.get((request.method, request.path))
+        if handler is not None:
+            return handler, ()
+
+        # /api/days/<data>
+        prefix, _, date_str = request.path.rpartition('/')
+        if prefix == '/api/days' and date_str:
+            handler = {'PATCH': self._update_day, 'DELETE': self._remove_day}.get(request.method)
+            if handler is None:
+                raise HttpError(405)
+            return handler, (date_str,)
+
+        if request.path.startswith('/api/'):
+            if any(path == request.path for _, path in self._routes):
+                raise HttpError(405)
+            raise HttpError(404, f"Endpoint desconhecido: {request.path}")
+        return None, ()
+
+    # === RESPOSTAS ===
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, headers: Dict[str, str],
+                    body: Optional[bytes] = b'', keep_alive: bool = True):
+        """Envia status, cabeçalhos e corpo (body=None: corpo enviado depois, sem Content-Length)"""
+        head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        headers = dict(headers, **{
+            'Date': formatdate(usegmt=True),
+            'Server': 'diarias',
+            'Connection': 'keep-alive' if keep_alive else 'close'
+        })
+        if body is not None:
+            headers.setdefault('Content-Length', str(len(body)))
+        head.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + (body or b''))
+        await writer.drain()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool = True):
+        await self._send(writer, status, {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Cache-Control': 'no-store'
+        }, _dumps(payload), keep_alive)
+
+    async def _send_static(self, request: Request, writer: asyncio.StreamWriter, keep_alive: bool):
+        found = self.static.get(request.path)
+        if found is None:
+            raise HttpError(404, f"Arquivo não encontrado: {request.path}")
+        content, etag, content_type = found
+
+        # no-cache: o navegador guarda o arquivo mas revalida (304) a cada uso
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in request.headers.get('if-none-match', ''):
+            METRICS.inc('http_not_modified_total')
+            await self._send(writer, 304, dict(headers, **{'Content-Length': '0'}), keep_alive=keep_alive)
+            return
+
+        headers['Content-Type'] = content_type
+        if request.method == 'HEAD':
+            await self._send(writer, 200, dict(headers, **{'Content-Length': str(len(content))}),
+                             keep_alive=keep_alive)
+        else:
+            await self._send(writer, 200, headers, content, keep_alive)
+
+    async def _export_xlsx(self, request: Request, writer: asyncio.StreamWriter, keep_alive: bool):
+        """Planilha completa do estado atual, servida da memória em blocos"""
+        content, etag = await self._workbook()
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in request.headers.get('if-none-match', ''):
+            await self._send(writer, 304, dict(headers, **{'Content-Length': '0'}), keep_alive=keep_alive)
+            return
+
+        # O tamanho é conhecido (o xlsx só existe completo após workbook.close()):
+        # Content-Length em vez de Transfer-Encoding: chunked permite ao navegador mostrar o progresso
+        filename = f"Controle_Diarias_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        await self._send(writer, 200, dict(headers, **{
+            'Content-Type': XLSX_TYPE,
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Content-Length': str(len(content))
+        }), body=None, keep_alive=keep_alive)
+        if request.method == 'HEAD':
+            return
+
+        view = memoryview(content)
+        for start in range(0, len(view), CHUNK_SIZE):
+            writer.write(view[start:start + CHUNK_SIZE])
+            await writer.drain()
+
+    async def _workbook(self) -> Tuple[bytes, str]:
+        """
+        (conteúdo, etag) da planilha para a versão atual dos dados
+
+        A última planilha fica em cache até a próxima alteração; pedidos
+        simultâneos da mesma versão compartilham uma única geração.
+        """
+        # Versão lida antes do estado: nunca associa dados antigos a uma versão nova
+        key = (self.system.data_version, self.system.daily_rate)
+        etag = f'"xlsx-{self.live.stream_id}-{key[0]}"'
+        cached = self._export_cache
+        if cached is not None and cached[0] == key:
+            METRICS.inc('export_cache_hits_total')
+            return cached[1], etag
+
+        task = self._export_tasks.get(key)
+        if task is None:
+            METRICS.inc('export_cache_misses_total')
+            task = self._export_tasks[key] = asyncio.ensure_future(self._call(self._build_workbook))
+            task.add_done_callback(lambda _: self._export_tasks.pop(key, None))
+        content = await asyncio.shield(task)
+
+        if self._export_cache is None or self._export_cache[0] <= key:
+            self._export_cache = (key, content)
+        return content, etag
+
+    async def _events(self, request: Request, writer: asyncio.StreamWriter):
+        """Fluxo SSE de patches do painel (a conexão fica dedicada até o cliente sair)"""
+        await self._send(writer, 200, {
+            'Content-Type': 'text/event-stream; charset=utf-8',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        }, body=None, keep_alive=False)
+        writer.write(f"retry: {SSE_RETRY_MS}\n\n".encode('utf-8'))
+
+        METRICS.inc('sse_connections_total')
+        events = self.live.stream(request.headers.get('last-event-id'), heartbeat=SSE_HEARTBEAT)
+        try:
+            async for item in events:
+                if item is None:
+                    writer.write(b': ping\n\n')
+                else:
+                    event, event_id, message = item
+                    data = json.dumps(message, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+                    writer.write(f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode('utf-8'))
+                await writer.drain()
+        finally:
+            await events.aclose()
+
+    def _build_workbook(self) -> bytes:
+        """Gera a planilha do ExcelGenerator em memória, sem arquivo temporário (executor)"""
+        with METRICS.timer('http_export_seconds'):
+            # Agregações no próprio processo: um ProcessPool criado por fork a partir
+            # deste processo multithread (laço, executor, worker, monitor) pode travar
+            generator = ExcelGenerator(parallel=False)
+            generator.load_data_from_state(self.system.get_state())
+            content = generator.workbook_bytes()
+            if content is None:
+                raise HttpError(500, "Falha ao gerar a planilha")
+            return content
+
+    # === ENDPOINTS ===
+
+    async def _call(self, fn: Callable, *args, **kwargs):
+        """Executa uma chamada bloqueante do sistema no executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: fn(*args, **kwargs))
+
+    async def _health(self, request: Request):
+        return 200, {'status': 'ok', 'storage': self.system.storage}
+
+    async def _kpis(self, request: Request):
+        return 200, await self._call(self.system.get_kpis)
+
+    async def _state(self, request: Request):
+        return 200, await self._call(self.system.get_state)
+
+    async def _monthly(self, request: Request):
+        monthly = await self._call(self.system.get_monthly_analysis)
+        return 200, monthly.reset_index().to_dict('records')
+
+    async def _list_days(self, request: Request):
+        try:
+            days = await self._call(self.system.get_days, request.query.get('status'),
+                                    request.query.get('start'), request.query.get('end'))
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        return 200, {'days': days}
+
+    async def _add_day(self, request: Request):
+        data = request.json()
+        date_str = data.get('date')
+        if not isinstance(date_str, str):
+            raise HttpError(400, "Campo 'date' (AAAA-MM-DD) obrigatório")
+        status = _validate_status(data.get('status', 'pending'))
+        added = await self._call(self.system.add_working_day, date_str, status,
+                                 data.get('notes', ''), data.get('project'))
+        if not added:
+            raise HttpError(400, f"Não foi possível adicionar o dia {date_str}")
+        return 201, {'ok': True, 'kpis': await self._call(self.system.get_kpis)}
+
+    async def _update_day(self, request: Request, date_str: str):
+        status = _validate_status(request.json().get('status'))
+        if not await self._call(self.system.update_day_status, date_str, status):
+            raise HttpError(404, f"Dia não encontrado: {date_str}")
+        return 200, {'ok': True, 'kpis': await self._call(self.system.get_kpis)}
+
+    async def _remove_day(self, request: Request, date_str: str):
+        if not await self._call(self.system.remove_working_day, date_str):
+            raise HttpError(404, f"Dia não encontrado: {date_str}")
+        return 200, {'ok': True, 'kpis': await self._call(self.system.get_kpis)}
+
+    async def _add_deposit(self, request: Request):
+        data = request.json()
+        amount = data.get('amount')
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)) or amount <= 0:
+            raise HttpError(400, "Campo 'amount' deve ser um número positivo")
+        if not await self._call(self.system.add_deposit, float(amount), data.get('description', '')):
+            raise HttpError(400, "Não foi possível adicionar o depósito")
+        return 201, {'ok': True, 'kpis': await self._call(self.system.get_kpis)}
+
+
+def main(argv=None):
+    """Inicia o sistema de diárias e o servidor HTTP local"""
+    parser = argparse.ArgumentParser(description='Servidor HTTP local do sistema de diárias')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface de escuta (padrão: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Porta preferida (padrão: {DEFAULT_PORT})')
+    parser.add_argument('--storage', choices=['json', 'sqlite'], default='json', help='Armazenamento dos dados')
+    parser.add_argument('--static-dir', help='Diretório da interface web (padrão: diretório do servidor)')
+    args = parser.parse_args(argv)
+
+    configurar_log()
+    system = DiariasSystem(auto_start_web=False, storage=args.storage)
+    server = DiariasServer(system, args.host, args.port, args.static_dir, owns_system=True)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
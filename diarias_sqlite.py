@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazenamento SQLite do Sistema de Diárias
+Backend opcional ao journal JSON: dias e depósitos em tabelas indexadas
+(data, status, projeto) em modo WAL, com cada mutação gravada como um
+upsert de uma linha. A inicialização não lê os dias: agregados, filtros
+e consultas pontuais vão ao banco e o armazenamento colunar só é montado
+quando algo exige o conjunto completo (ver SqliteWorkingDays). Leitores concorrentes (sincronização web,
+relatórios) usam conexões próprias sem bloquear o escritor. O snapshot
+diarias_data.json continua sendo exportado para a interface web.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from diarias_journal import (
+    EventJournal, DAY_ADDED, DAY_REMOVED, DAY_STATUS_CHANGED, DEPOSIT_ADDED, DEPOSIT_UPDATED, DEPOSIT_REMOVED
+)
+from diarias_counters import DiariasAggregates
+from diarias_store import WorkingDaysStore
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS working_days (
+    date TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    notes TEXT NOT NULL DEFAULT '',
+    project TEXT,
+    added_at TEXT,
+    extra TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_days_status ON working_days (status, date);
+CREATE INDEX IF NOT EXISTS idx_days_project ON working_days (project, date);
+
+CREATE TABLE IF NOT EXISTS deposits (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    amount REAL NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    balance_after REAL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_deposits_date ON deposits (date);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Campos dos dias e depósitos que têm coluna própria (o restante vai em 'extra')
+_DAY_FIELDS = ('status', 'notes', 'added_at', 'project')
+_DEPOSIT_FIELDS = ('date', 'amount', 'description', 'balanceAfter')
+
+_UPSERT_DAY = """
+INSERT INTO working_days (date, status, notes, project, added_at, extra) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (date) DO UPDATE SET
+    status = excluded.status, notes = excluded.notes, project = excluded.project,
+    added_at = excluded.added_at, extra = excluded.extra
+"""
+_INSERT_DEPOSIT = """
+INSERT INTO deposits (date, amount, description, balance_after, extra) VALUES (?, ?, ?, ?, ?)
+"""
+# Depósitos dos eventos são identificados pela posição na lista (ordem de id)
+_DEPOSIT_AT = "(SELECT id FROM deposits ORDER BY id LIMIT 1 OFFSET ?)"
+_UPDATE_DEPOSIT = f"""
+UPDATE deposits SET date = ?, amount = ?, description = ?, balance_after = ?, extra = ?
+WHERE id = {_DEPOSIT_AT}
+"""
+_DELETE_DEPOSIT = f"DELETE FROM deposits WHERE id = {_DEPOSIT_AT}"
+
+
+def _extra(record: Dict[str, Any], fields: Tuple[str, ...]) -> Optional[str]:
+    extra = {k: v for k, v in record.items() if k not in fields}
+    return json.dumps(extra, ensure_ascii=False) if extra else None
+
+
+def _day_row(date_str: str, day: Dict[str, Any]) -> tuple:
+    return (date_str, day.get('status', 'pending'), day.get('notes', '') or '',
+            day.get('project'), day.get('added_at'), _extra(day, _DAY_FIELDS))
+
+
+def _deposit_row(deposit: Dict[str, Any]) -> tuple:
+    return (deposit.get('date', ''), deposit.get('amount', 0), deposit.get('description', '') or '',
+            deposit.get('balanceAfter'), _extra(deposit, _DEPOSIT_FIELDS))
+
+
+class SqliteWorkingDays(MutableMapping):
+    """
+    Dias trabalhados do banco, carregados sob demanda
+
+    Enquanto nada exige o conjunto completo, len/in/[]/get consultam a
+    tabela pela chave primária. A primeira mutação ou leitura integral
+    (iteração, to_frame, to_dict...) monta o WorkingDaysStore a partir das
+    tabelas, que já refletem todos os eventos gravados, e a partir daí ele
+    atende todas as operações.
+    """
+
+    def __init__(self, storage: 'SqliteStorage'):
+        self._storage = storage
+        self._store = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._store is not None
+
+    def materialize(self) -> WorkingDaysStore:
+        """Armazenamento colunar completo (lido do banco na primeira chamada)"""
+        if self._store is None:
+            with self._load_lock:
+                # Uma única carga mesmo com leitores concorrentes
+                if self._store is None:
+                    self._store = self._storage.load_days()
+        return self._store
+
+    def __len__(self) -> int:
+        return len(self._store) if self._store is not None else self._storage.day_count()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.materialize())
+
+    def __contains__(self, date_str) -> bool:
+        if self._store is not None:
+            return date_str in self._store
+        return self._storage.day(date_str) is not None
+
+    def __getitem__(self, date_str: str) -> Dict[str, Any]:
+        if self._store is not None:
+            return self._store[date_str]
+        day = self._storage.day(date_str)
+        if day is None:
+            raise KeyError(date_str)
+        return day
+
+    def __setitem__(self, date_str: str, day: Dict[str, Any]):
+        self.materialize()[date_str] = day
+
+    def __delitem__(self, date_str: str):
+        del self.materialize()[date_str]
+
+    def __eq__(self, other):
+        return self.materialize() == other
+
+    def compact_notes(self) -> int:
+        # Sem carga, não há pool em memória para compactar
+        return self._store.compact_notes() if self._store is not None else 0
+
+    def __getattr__(self, name: str):
+        # Demais métodos do WorkingDaysStore (to_frame, to_dict, set_status, dates...)
+        return getattr(self.materialize(), name)
+
+
+class SqliteStorage:
+    """
+    Persistência em SQLite com a mesma interface do EventJournal
+
+    load/append/append_many/compact/is_own_snapshot/close funcionam como no
+    journal JSON; compact() apenas reexporta o snapshot (as tabelas já estão
+    atualizadas) e replace() regrava as tabelas quando o estado vem de fora
+    (documento da web).
+    """
+
+    def __init__(self, db_file, snapshot_file, compact_every: int = 500):
+        """
+        Args:
+            db_file: Arquivo do banco SQLite
+            snapshot_file: diarias_data.json exportado para a interface web
+                (também é a origem da migração na primeira execução)
+            compact_every: Mutações entre duas exportações do snapshot
+        """
+        self.db_file = Path(db_file)
+        self.compact_every = compact_every
+        self._snapshot = EventJournal(snapshot_file, compact_every=compact_every)
+
+        self.seq = 0
+        self.snapshot_seq = 0       # Última mutação incluída no snapshot exportado
+        self.pending_events = 0
+        self._recent = []           # Eventos desde a última exportação (ver events_since)
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._readers = []
+
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self.seq = int(self._meta('seq', 0))
+        self.snapshot_seq = int(self._meta('snapshotSeq', self.seq))
+        self.pending_events = self.seq - self.snapshot_seq
+
+    # === LEITURA ===
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Estado atual (workingDays como SqliteWorkingDays, sem ler os dias) ou None se vazio
+
+        Na primeira execução importa o snapshot + journal JSON existentes.
+        """
+        with self._lock:
+            if self._meta('schema') is None:
+                state = self._snapshot.load()
+                if state is not None:
+                    self.replace(state)
+                    logger.info("🗄️ Dados importados do JSON para %s", self.db_file)
+                self._set_meta(schema=SCHEMA_VERSION)
+                if state is None:
+                    return None
+            elif not self._has_data():
+                return None
+
+            # Hash do snapshot atual (distingue gravações próprias das da web)
+            self._snapshot.track_snapshot()
+
+            return {
+                'workingDays': SqliteWorkingDays(self),
+                'deposits': self.deposits(),
+                'creditBalance': float(self._meta('creditBalance', 0.0))
+            }
+
+    def load_days(self) -> WorkingDaysStore:
+        """Todos os dias em armazenamento colunar (leitura ordenada pela chave primária)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT date, status, notes, added_at, project, extra FROM working_days ORDER BY date'
+            ).fetchall()
+        return WorkingDaysStore.from_columns(*self._day_columns(rows))
+
+    def day(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """Um dia pela chave primária (mesmo formato do WorkingDaysStore) ou None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT date, status, notes, added_at, project, extra FROM working_days WHERE date = ?',
+                (date_str,)
+            ).fetchone()
+        if row is None:
+            return None
+        return WorkingDaysStore.from_columns(*self._day_columns([row]))[row[0]]
+
+    def day_count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM working_days').fetchone()[0]
+
+    def deposits(self) -> List[Dict[str, Any]]:
+        """Depósitos na ordem de inserção"""
+        rows = self._reader().execute(
+            'SELECT date, amount, description, balance_after, extra FROM deposits ORDER BY id'
+        ).fetchall()
+        deposits = []
+        for date, amount, description, balance_after, extra in rows:
+            deposit = {'date': date, 'amount': amount, 'description': description}
+            if balance_after is not None:
+                deposit['balanceAfter'] = balance_after
+            if extra:
+                deposit.update(json.loads(extra))
+            deposits.append(deposit)
+        return deposits
+
+    # === CONSULTAS INDEXADAS ===
+
+    def aggregates(self, daily_rate: float) -> DiariasAggregates:
+        """Agregados incrementais calculados por GROUP BY (sem percorrer linhas em Python)"""
+        db = self._reader()
+        aggregates = DiariasAggregates(daily_rate)
+        for status, count in db.execute('SELECT status, COUNT(*) FROM working_days GROUP BY status'):
+            aggregates.days_by_status[status] = count
+            aggregates.total_days += count
+        for month, count in db.execute(
+                'SELECT substr(date, 1, 7) AS month, COUNT(*) FROM working_days GROUP BY month'):
+            aggregates.days_by_month[month] = count
+        count, total = db.execute('SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM deposits').fetchone()
+        aggregates.deposit_count = count
+        aggregates.total_deposited = float(total)
+        return aggregates
+
+    def monthly_counts(self) -> Tuple[List[str], List[int], List[int]]:
+        """(meses 'AAAA-MM', dias, dias pagos) em ordem cronológica, percorrendo o índice de status"""
+        rows = self._reader().execute(
+            "SELECT substr(date, 1, 7) AS month, COUNT(*), SUM(status = 'paid') "
+            "FROM working_days GROUP BY month ORDER BY month"
+        ).fetchall()
+        months, days, paid = zip(*rows) if rows else ((), (), ())
+        return list(months), list(days), list(paid)
+
+    def days(self, status: Optional[str] = None, start: Optional[str] = None,
+             end: Optional[str] = None, project: Optional[str] = None) -> List[str]:
+        """Datas dos dias que atendem aos filtros (intervalo inclusivo), em ordem"""
+        clauses, params = [], []
+        for column, op, value in (('status', '=', status), ('project', '=', project),
+                                  ('date', '>=', start), ('date', '<=', end)):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._reader().execute(f'SELECT date FROM working_days{where} ORDER BY date', params)
+        return [row[0] for row in rows]
+
+    # === ESCRITA ===
+
+    def append(self, event: Dict[str, Any]) -> int:
+        """Aplica um evento como upsert/delete de uma linha"""
+        return self.append_many([event])
+
+    def append_many(self, events: List[Dict[str, Any]]) -> int:
+        """Aplica vários eventos em uma única transação"""
+        with self._lock:
+            if not events:
+                return self.seq
+            with self._transaction() as db:
+                for event in events:
+                    self._apply(db, event)
+                for event in events:
+                    self.seq += 1
+                    self._recent.append(dict(event, seq=self.seq))
+                balance = events[-1].get('creditBalance')
+                self._set_meta(db, seq=self.seq, **({} if balance is None else {'creditBalance': balance}))
+            self.pending_events += len(events)
+            return self.seq
+
+    def replace(self, state: Dict[str, Any]):
+        """Substitui todo o conteúdo das tabelas pelo estado informado e exporta o snapshot"""
+        with self._lock:
+            with self._transaction() as db:
+                db.execute('DELETE FROM working_days')
+                db.execute('DELETE FROM deposits')
+                db.executemany(_UPSERT_DAY, (_day_row(date_str, day)
+                                             for date_str, day in state.get('workingDays', {}).items()))
+                db.executemany(_INSERT_DEPOSIT, (_deposit_row(d) for d in state.get('deposits', [])))
+                self._set_meta(db, seq=self.seq, creditBalance=state.get('creditBalance', 0.0))
+            self.compact(state)
+
+    def flush(self):
+        """As transações já são confirmadas a cada escrita"""
+
+    def needs_compaction(self) -> bool:
+        """Indica se o snapshot exportado para a web deve ser atualizado"""
+        return self.pending_events >= self.compact_every
+
+    def compact(self, state: Dict[str, Any]):
+        """Exporta o snapshot diarias_data.json (as tabelas já estão atualizadas)"""
+        with self._lock:
+            # journalSeq do snapshot = última mutação gravada no banco
+            self._snapshot.seq = self.seq
+            self._snapshot.compact(state)
+            self.snapshot_seq = self.seq
+            self._set_meta(snapshotSeq=self.seq)
+            self.pending_events = 0
+            self._recent = []
+
+    def events_since(self, seq: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Mutações posteriores a seq (para reaplicar sobre um documento exportado
+        naquela sequência) ou None se não estão mais disponíveis
+        """
+        with self._lock:
+            if seq >= self.seq:
+                return []
+            if seq < self.seq - len(self._recent):
+                return None
+            return [event for event in self._recent if event['seq'] > seq]
+
+    def is_own_snapshot(self, content: bytes) -> bool:
+        return self._snapshot.is_own_snapshot(content)
+
+    def close(self):
+        with self._lock:
+            self._snapshot.close()
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+            self._local = threading.local()
+            self._conn.close()
+
+    # === AUXILIARES ===
+
+    def _apply(self, db: sqlite3.Connection, event: Dict[str, Any]):
+        event_type = event.get('type')
+        if event_type == DAY_ADDED:
+            db.execute(_UPSERT_DAY, _day_row(event['date'], event['day']))
+        elif event_type == DAY_REMOVED:
+            db.execute('DELETE FROM working_days WHERE date = ?', (event['date'],))
+        elif event_type == DAY_STATUS_CHANGED:
+            db.execute('UPDATE working_days SET status = ? WHERE date = ?', (event['status'], event['date']))
+        elif event_type == DEPOSIT_ADDED:
+            db.execute(_INSERT_DEPOSIT, _deposit_row(event['deposit']))
+        elif event_type == DEPOSIT_UPDATED:
+            db.execute(_UPDATE_DEPOSIT, _deposit_row(event['deposit']) + (event['index'],))
+        elif event_type == DEPOSIT_REMOVED:
+            db.execute(_DELETE_DEPOSIT, (event['index'],))
+        else:
+            raise ValueError(f"Tipo de evento desconhecido: {event_type}")
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def _reader(self) -> sqlite3.Connection:
+        """Conexão de leitura da thread atual (WAL: não bloqueia nem é bloqueada pelo escritor)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def _has_data(self) -> bool:
+        return (self._conn.execute('SELECT EXISTS (SELECT 1 FROM working_days)').fetchone()[0] or
+                self._conn.execute('SELECT EXISTS (SELECT 1 FROM deposits)').fetchone()[0])
+
+    def _meta(self, key: str, default: Any = None) -> Any:
+        row = self._conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def _set_meta(self, db: Optional[sqlite3.Connection] = None, **values):
+        (db or self._conn).executemany(
+            'INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value',
+            [(key, str(value)) for key, value in values.items()]
+        )
+
+    @staticmethod
+    def _day_columns(rows) -> tuple:
+        """Colunas para WorkingDaysStore.from_columns (projeto e extras voltam como campos do dia)"""
+        dates, statuses, notes, added_at, extras = [], [], [], [], {}
+        for date, status, note, added, project, extra in rows:
+            dates.append(date)
+            statuses.append(status)
+            notes.append(note)
+            added_at.append(added)
+            if project is not None or extra:
+                fields = json.loads(extra) if extra else {}
+                if project is not None:
+                    fields['project'] = project
+                extras[date] = fields
+        return dates, statuses, notes, added_at, extras
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazenamento Colunar de Dias Trabalhados
+Mantém os dias em arrays numpy ordenados por data (datetime64), com status
+categórico e pool de observações internadas, expondo a mesma interface de
+dicionário usada pelo restante do sistema
+"""
+
+import numpy as np
+import pandas as pd
+from collections.abc import MutableMapping
+from typing import Dict, List, Optional, Any, Iterator
+
+from diarias_constants import DEFAULT_STATUSES
+
+# Colunas do DataFrame de dias trabalhados
+WORKING_DAYS_COLUMNS = ['Data', 'Status', 'Valor', 'Observacoes', 'Mes', 'Dia_Semana', 'Valor_Acumulado']
+
+_DAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+_NAT = np.datetime64('NaT', 'us')
+
+
+def _parse_date(date_str: str) -> np.datetime64:
+    """Converte 'AAAA-MM-DD' em datetime64[ns] (ValueError se inválida)"""
+    value = np.datetime64(date_str, 'D')
+    if np.isnat(value):
+        raise ValueError(f"Data inválida: {date_str!r}")
+    return value.astype('datetime64[ns]')
+
+
+def _parse_timestamp(value: Optional[str]) -> np.datetime64:
+    if not value:
+        return _NAT
+    try:
+        return np.datetime64(value, 'us')
+    except ValueError:
+        return _NAT
+
+
+class WorkingDaysStore(MutableMapping):
+    """Dias trabalhados em formato colunar, ordenados por data"""
+
+    _GROWTH = 2
+    _MIN_CAPACITY = 64
+
+    def __init__(self, capacity: int = 0):
+        capacity = max(capacity, self._MIN_CAPACITY)
+        self._n = 0
+        self._dates = np.empty(capacity, dtype='datetime64[ns]')
+        self._status = np.empty(capacity, dtype=np.int8)
+        self._notes = np.empty(capacity, dtype=np.int32)
+        self._added_at = np.empty(capacity, dtype='datetime64[us]')
+
+        self._statuses = list(DEFAULT_STATUSES)
+        self._status_codes = {s: i for i, s in enumerate(self._statuses)}
+        self._notes_pool = ['']
+        self._notes_codes = {'': 0}
+        self._extra = {}           # Campos adicionais raros: data -> dict
+        self._exported = False     # Há DataFrames compartilhando os buffers
+
+    # === CONSTRUÇÃO EM LOTE ===
+
+    @classmethod
+    def from_dict(cls, working_days: Dict[str, Dict[str, Any]]) -> 'WorkingDaysStore':
+        """Constrói o armazenamento a partir do formato {data: {status, notes, ...}}"""
+        store = cls(capacity=len(working_days))
+        n = len(working_days)
+        if n == 0:
+            return store
+
+        keys = list(working_days.keys())
+        dates = np.array(keys, dtype='datetime64[D]').astype('datetime64[ns]')
+        if np.isnat(dates).any():
+            raise ValueError("Datas inválidas em workingDays")
+
+        status = np.empty(n, dtype=np.int8)
+        notes = np.empty(n, dtype=np.int32)
+        added_at = np.empty(n, dtype='datetime64[us]')
+        for i, (key, day) in enumerate(working_days.items()):
+            status[i] = store._status_code(day.get('status', 'pending'))
+            notes[i] = store._note_code(day.get('notes', ''))
+            added_at[i] = _parse_timestamp(day.get('added_at'))
+            extra = {k: v for k, v in day.items() if k not in ('status', 'notes', 'added_at')}
+            if extra:
+                store._extra[dates[i]] = extra
+
+        # Ordenar por data mantendo a última ocorrência de datas repetidas
+        order = np.argsort(dates, kind='stable')
+        dates = dates[order]
+        keep = np.ones(n, dtype=bool)
+        keep[:-1] = dates[1:] != dates[:-1]
+        order = order[keep]
+        n = len(order)
+
+        store._dates[:n] = dates[keep]
+        store._status[:n] = status[order]
+        store._notes[:n] = notes[order]
+        store._added_at[:n] = added_at[order]
+        store._n = n
+        return store
+
+    @classmethod
+    def from_columns(cls, dates: List[str], statuses: List[str], notes: List[str],
+                     added_at: List[Optional[str]],
+                     extras: Optional[Dict[str, Dict[str, Any]]] = None) -> 'WorkingDaysStore':
+        """
+        Constrói o armazenamento a partir de colunas ordenadas por data, sem repetições
+
+        Usado pelo backend SQLite (ORDER BY na chave primária): os códigos de
+        status e observações são calculados uma vez por valor distinto.
+        """
+        n = len(dates)
+        store = cls(capacity=n)
+        if n == 0:
+            return store
+
+        values = np.array(dates, dtype='datetime64[D]').astype('datetime64[ns]')
+        if np.isnat(values).any():
+            raise ValueError("Datas inválidas em workingDays")
+
+        for column, target, code in ((statuses, store._status, store._status_code),
+                                     (notes, store._notes, store._note_code)):
+            uniques, inverse = np.unique(np.array(column, dtype=object), return_inverse=True)
+            codes = np.array([code(value) for value in uniques], dtype=target.dtype)
+            target[:n] = codes[inverse]
+
+        store._dates[:n] = values
+        store._added_at[:n] = np.array(['NaT' if not value else value for value in added_at],
+                                       dtype='datetime64[us]')
+        for date_str, extra in (extras or {}).items():
+            store._extra[_parse_date(date_str)] = extra
+        store._n = n
+        return store
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna o formato {data: {status, notes, added_at}} usado no JSON"""
+        return {key: self._row(i, key) for i, key in enumerate(self._keys())}
+
+    # === INTERFACE DE DICIONÁRIO ===
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __contains__(self, date_str) -> bool:
+        return self._find(date_str) >= 0
+
+    def __getitem__(self, date_str: str) -> Dict[str, Any]:
+        index = self._find(date_str)
+        if index < 0:
+            raise KeyError(date_str)
+        return self._row(index, date_str)
+
+    def __setitem__(self, date_str: str, day: Dict[str, Any]):
+        value = _parse_date(date_str)
+        self._prepare_write()
+
+        pos = int(np.searchsorted(self._dates[:self._n], value))
+        if pos >= self._n or self._dates[pos] != value:
+            self._insert_slot(pos)
+            self._dates[pos] = value
+
+        self._status[pos] = self._status_code(day.get('status', 'pending'))
+        self._notes[pos] = self._note_code(day.get('notes', ''))
+        self._added_at[pos] = _parse_timestamp(day.get('added_at'))
+
+        extra = {k: v for k, v in day.items() if k not in ('status', 'notes', 'added_at')}
+        if extra:
+            self._extra[value] = extra
+        else:
+            self._extra.pop(value, None)
+
+    def __delitem__(self, date_str: str):
+        index = self._find(date_str)
+        if index < 0:
+            raise KeyError(date_str)
+        self._prepare_write()
+        self._extra.pop(self._dates[index], None)
+
+        n = self._n
+        for array in (self._dates, self._status, self._notes, self._added_at):
+            array[index:n - 1] = array[index + 1:n]
+        self._n -= 1
+
+    def __eq__(self, other):
+        if isinstance(other, WorkingDaysStore):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return len(self) == len(other) and self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def set_status(self, date_str: str, status: str):
+        """Atualiza o status de um dia existente"""
+        index = self._find(date_str)
+        if index < 0:
+            raise KeyError(date_str)
+        self._prepare_write()
+        self._status[index] = self._status_code(status)
+
+    def compact_notes(self) -> int:
+        """
+        Remove do pool de observações os textos que nenhum dia usa mais
+
+        Edições e remoções deixam entradas órfãs no pool (e como categorias
+        vazias na coluna Observacoes); chamado na compactação do snapshot.
+
+        Returns:
+            Número de entradas removidas
+        """
+        used = np.unique(self._notes[:self._n])
+        unused = len(self._notes_pool) - len(used) - (0 if used.size and used[0] == 0 else 1)
+        if unused <= 0:
+            return 0
+
+        # '' continua com o código 0; os demais mantêm a ordem de inserção
+        keep = used[used != 0]
+        remap = np.zeros(len(self._notes_pool), dtype=self._notes.dtype)
+        remap[keep] = np.arange(1, len(keep) + 1)
+        self._prepare_write()
+        self._notes[:self._n] = remap[self._notes[:self._n]]
+        self._notes_pool = [''] + [self._notes_pool[code] for code in keep.tolist()]
+        self._notes_codes = {notes: code for code, notes in enumerate(self._notes_pool)}
+        return unused
+
+    # === VISÕES ANALÍTICAS ===
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Visão das datas ordenadas (datetime64[ns]), válida até a próxima mutação"""
+        return self._dates[:self._n]
+
+    def to_frame(self, daily_rate: float) -> pd.DataFrame:
+        """
+        DataFrame de dias trabalhados montado a partir das colunas
+
+        As colunas podem compartilhar os buffers do armazenamento; a próxima
+        mutação realoca os buffers (copy-on-write), de modo que DataFrames
+        já entregues nunca mudam.
+        """
+        n = self._n
+        if n == 0:
+            return pd.DataFrame(columns=WORKING_DAYS_COLUMNS)
+
+        dates = self._dates[:n]
+        self._exported = True
+
+        # Mês e dia da semana calculados por código, não por linha
+        months = dates.astype('datetime64[M]')
+        unique_months, month_codes = np.unique(months, return_inverse=True)
+        month_labels = [str(m) for m in unique_months]   # 'AAAA-MM'
+        weekday = (dates.astype('datetime64[D]').astype(np.int64) + 3) % 7
+
+        values = np.full(n, daily_rate, dtype=float)
+
+        return pd.DataFrame({
+            'Data': dates,
+            'Status': pd.Categorical.from_codes(self._status[:n], categories=self._statuses),
+            'Valor': values,
+            'Observacoes': pd.Categorical.from_codes(self._notes[:n], categories=self._notes_pool),
+            'Mes': pd.Categorical.from_codes(month_codes.astype(np.int32), categories=month_labels),
+            'Dia_Semana': pd.Categorical.from_codes(weekday.astype(np.int8), categories=list(_DAY_NAMES)),
+            'Valor_Acumulado': daily_rate * np.arange(1, n + 1, dtype=float)
+        }, copy=False)
+
+    # === AUXILIARES ===
+
+    def _keys(self) -> List[str]:
+        return np.datetime_as_string(self._dates[:self._n], unit='D').tolist()
+
+    def _row(self, index: int, key: str) -> Dict[str, Any]:
+        row = {
+            'status': self._statuses[self._status[index]],
+            'notes': self._notes_pool[self._notes[index]],
+        }
+        added_at = self._added_at[index]
+        if not np.isnat(added_at):
+            row['added_at'] = str(added_at)
+        extra = self._extra.get(self._dates[index])
+        if extra:
+            row.update(extra)
+        return row
+
+    def _find(self, date_str: str) -> int:
+        """Posição da data ou -1 (datas inválidas nunca estão no armazenamento)"""
+        try:
+            value = _parse_date(date_str)
+        except (ValueError, TypeError):
+            return -1
+        pos = int(np.searchsorted(self._dates[:self._n], value))
+        if pos < self._n and self._dates[pos] == value:
+            return pos
+        return -1
+
+    def _status_code(self, status: str) -> int:
+        code = self._status_codes.get(status)
+        if code is None:
+            code = len(self._statuses)
+            self._statuses.append(status)
+            self._status_codes[status] = code
+        return code
+
+    def _note_code(self, notes: str) -> int:
+        notes = notes or ''
+        code = self._notes_codes.get(notes)
+        if code is None:
+            code = len(self._notes_pool)
+            self._notes_pool.append(notes)
+            self._notes_codes[notes] = code
+        return code
+
+    def _prepare_write(self):
+        """Realoca os buffers se algum DataFrame ainda os referencia"""
+        if self._exported:
+            self._reallocate(len(self._dates))
+            self._exported = False
+
+    def _reallocate(self, capacity: int):
+        n = self._n
+        for attr in ('_dates', '_status', '_notes', '_added_at'):
+            old = getattr(self, attr)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:n] = old[:n]
+            setattr(self, attr, new)
+
+    def _insert_slot(self, pos: int):
+        n = self._n
+        if n == len(self._dates):
+            self._reallocate(max(self._MIN_CAPACITY, n * self._GROWTH))
+        if pos < n:
+            for array in (self._dates, self._status, self._notes, self._added_at):
+                array[pos + 1:n + 1] = array[pos:n]
+        self._n += 1
@@ -9,47 +9,172 @@ Interface Python como principal + sincronização automática com Excel
 import pandas as pd
 import numpy as np
 import json
+import logging
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
 import webbrowser
 import time
 import threading
-from typing import Dict, List, Optional, Any
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Callable, Iterable, Iterator, Set
 
 # Importar framework de sincronização
 from excel_sync_framework import create_sync_manager, auto_sync, sync_dataframe
 from excel_templates import get_template
 
+# Journal de eventos (persistência incremental)
+from diarias_journal import (
+    EventJournal, apply_event, DAY_ADDED, DAY_REMOVED, DAY_STATUS_CHANGED,
+    DEPOSIT_ADDED, DEPOSIT_UPDATED, DEPOSIT_REMOVED
+)
+from diarias_sync_worker import ExcelSyncWorker
+from diarias_watcher import FileWatcher
+from diarias_diff import DataDelta, compute_delta
+from diarias_store import WorkingDaysStore
+from diarias_sqlite import SqliteStorage
+from diarias_cache import AnalyticsCache
+from diarias_constants import DAILY_RATE, DEFAULT_STATUSES
+from diarias_counters import DiariasAggregates
+from diarias_aggregations import monthly_metrics
+from diarias_calendar import CalendarIndex
+from diarias_metrics import METRICS
+from diarias_incremental_sync import IncrementalSyncManager, SHEET_DEPENDENCIES, sheets_for_sources
+
+# Fontes de dados alteradas por cada tipo de evento
+EVENT_SOURCES = {
+    DAY_ADDED: ('days',),
+    DAY_REMOVED: ('days',),
+    DAY_STATUS_CHANGED: ('days',),
+    DEPOSIT_ADDED: ('deposits',),
+    DEPOSIT_UPDATED: ('deposits',),
+    DEPOSIT_REMOVED: ('deposits',),
+}
+
+logger = logging.getLogger(__name__)
+
+CASH_FLOW_COLUMNS = ['Data', 'Tipo', 'Valor', 'Descricao', 'Saldo_Impacto', 'Saldo_Acumulado']
+
+def build_cash_flow(df_days: pd.DataFrame, df_deposits: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monta o fluxo de caixa: depósitos como entradas e diárias como saídas
+    
+    Operações apenas por coluna: dois blocos concatenados, ordenação
+    estável por data (depósitos antes das diárias do mesmo instante) e
+    saldo acumulado por cumsum.
+    """
+    if df_days.empty and df_deposits.empty:
+        return pd.DataFrame(columns=CASH_FLOW_COLUMNS)
+    
+    parts = []
+    
+    # Entradas (depósitos)
+    if not df_deposits.empty:
+        deposit_values = df_deposits['Valor'].to_numpy(dtype=float)
+        parts.append(pd.DataFrame({
+            'Data': df_deposits['Data'].to_numpy(),
+            'Tipo': 'Entrada',
+            'Valor': deposit_values,
+            'Descricao': ('Depósito: ' + df_deposits['Descricao'].astype(str)).to_numpy(),
+            'Saldo_Impacto': deposit_values
+        }))
+    
+    # Saídas (dias trabalhados): descrição calculada uma vez por status
+    if not df_days.empty:
+        status = df_days['Status']
+        if not isinstance(status.dtype, pd.CategoricalDtype):
+            status = status.astype('category')
+        descricao = status.cat.rename_categories(
+            [f"Diária trabalhada ({s})" for s in status.cat.categories]
+        ).astype(object)
+        day_values = -df_days['Valor'].to_numpy(dtype=float)
+        parts.append(pd.DataFrame({
+            'Data': df_days['Data'].to_numpy(),
+            'Tipo': 'Saída',
+            'Valor': day_values,
+            'Descricao': descricao.to_numpy(),
+            'Saldo_Impacto': day_values
+        }))
+    
+    df_flow = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    df_flow = df_flow.sort_values('Data', kind='mergesort')
+    df_flow['Saldo_Acumulado'] = df_flow['Saldo_Impacto'].cumsum()
+    
+    return df_flow
+
 class DiariasSystem:
     """Sistema principal de controle de diárias com sincronização automática"""
     
-    def __init__(self, auto_start_web=True, auto_sync_interval=30):
+    def __init__(self, auto_start_web=True, auto_sync_interval=30, sync_debounce=1.0,
+                 metrics_port: Optional[int] = None, storage: str = 'json'):
         """
         Inicializa o sistema de diárias
         
         Args:
             auto_start_web: Se deve abrir automaticamente a interface web
-            auto_sync_interval: Intervalo de sincronização em segundos
+            auto_sync_interval: Intervalo de sincronização em segundos (também é o
+                atraso máximo de uma sincronização adiada pelo debounce)
+            sync_debounce: Janela de silêncio em segundos antes de sincronizar o Excel
+            metrics_port: Porta local do endpoint /metrics (Prometheus); ativa as métricas
+            storage: 'json' (snapshot + journal de eventos) ou 'sqlite' (excel_report/diarias.db,
+                com consultas indexadas; importa os dados JSON na primeira execução)
         """
+        if storage not in ('json', 'sqlite'):
+            raise ValueError(f"Armazenamento desconhecido: {storage}")
+        
         self.data_dir = Path("excel_report")
         self.excel_file = "outputs/controle_diarias_sync.xlsx"
         
-        # Criar gerenciador de sincronização
-        self.sync_manager = create_sync_manager(
+        # Criar gerenciador de sincronização (incremental: só sincroniza quando algum dataset muda)
+        self.sync_manager = IncrementalSyncManager(create_sync_manager(
             self.excel_file, 
             "operations"  # Template operacional para controle de diárias
-        )
+        ))
+        
+        # Fontes alteradas desde a última preparação dos dados Excel
+        self._dirty_sources = {'days', 'deposits'}
+        
+        # Versão de cada fonte de dados + cache das análises derivadas
+        self._versions = {'days': 0, 'deposits': 0}
+        self._cache = AnalyticsCache()
+        
+        # Ouvintes de alterações (ver add_change_listener) e fontes ainda não notificadas
+        self._listeners = []
+        self._unnotified_sources = set()
         
         # Configurar sincronização automática
         self.auto_sync_interval = auto_sync_interval
         self.sync_manager.start_auto_sync()
         
-        # Dados do sistema
-        self.working_days = {}
+        # Worker dedicado: agrupa rajadas de mutações em uma única sincronização
+        self._state_lock = threading.RLock()
+        self._excel_lock = threading.Lock()
+        self.sync_worker = ExcelSyncWorker(
+            self._run_excel_sync,
+            debounce=sync_debounce,
+            max_delay=auto_sync_interval
+        )
+        self.sync_worker.start()
+        
+        # Dados do sistema (dias em armazenamento colunar ordenado por data)
+        self.working_days = WorkingDaysStore()
         self.deposits = []
-        self.daily_rate = 250.0
-        self.credit_balance = 0.0
+        self.daily_rate = DAILY_RATE
+        
+        # Agregados mantidos em O(1) a cada mutação (saldo, contagens)
+        self.aggregates = DiariasAggregates(self.daily_rate)
+        
+        # Journal append-only + snapshot em diarias_data.json (ou banco SQLite que exporta o snapshot)
+        self.storage = storage
+        if storage == 'sqlite':
+            self.journal = SqliteStorage(self.data_dir / "diarias.db", self.data_dir / "diarias_data.json")
+        else:
+            self.journal = EventJournal(self.data_dir / "diarias_data.json")
+        
+        # Estado de lote (ver batch())
+        self._batch_depth = 0
+        self._batch_events = []
+        self._batch_dirty = False
         
         # Carregar dados existentes
         self._load_existing_data()
@@ -61,115 +186,295 @@ class DiariasSystem:
         if auto_start_web:
             self._start_web_interface()
         
-        print("🚀 Sistema de Diárias inicializado com sincronização automática")
-        print(f"💰 Saldo atual de créditos: R$ {self.credit_balance:.2f}")
-        print(f"🔄 Sincronização automática: a cada {auto_sync_interval}s")
-        print(f"📊 Arquivo Excel: {self.excel_file}")
+        # Endpoint de métricas (opcional)
+        self._metrics_server = METRICS.serve(metrics_port) if metrics_port is not None else None
+        
+        logger.info("🚀 Sistema de Diárias inicializado com sincronização automática")
+        logger.info("💰 Saldo atual de créditos: R$ %.2f", self.credit_balance)
+        logger.info("🔄 Sincronização automática: a cada %ss", auto_sync_interval)
+        logger.info("📊 Arquivo Excel: %s", self.excel_file)
     
     def _load_existing_data(self):
         """Carrega dados existentes do sistema web"""
         try:
-            # Tentar carregar dados do localStorage simulado (arquivo JSON)
-            data_file = self.data_dir / "diarias_data.json"
-            if data_file.exists():
-                with open(data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                self.working_days = data.get('workingDays', {})
+            # Carregar snapshot (diarias_data.json) + eventos do journal
+            with METRICS.timer('json_load_seconds'):
+                data = self.journal.load()
+            if data is not None:
+                days = data.get('workingDays', {})
+                # SQLite: SqliteWorkingDays, que só lê os dias quando necessário
+                self.working_days = WorkingDaysStore.from_dict(days) if isinstance(days, dict) else days
                 self.deposits = data.get('deposits', [])
-                self.credit_balance = data.get('creditBalance', 0.0)
+                if self.storage == 'sqlite':
+                    # Agregados por consultas GROUP BY, sem percorrer os dias
+                    self.aggregates = self.journal.aggregates(self.daily_rate)
+                else:
+                    self.aggregates = DiariasAggregates.from_state(self.working_days, self.deposits, self.daily_rate)
                 
-                print(f"📂 Dados carregados: {len(self.working_days)} dias, {len(self.deposits)} depósitos")
+                logger.info("📂 Dados carregados: %d dias, %d depósitos (%d eventos do journal)",
+                            len(self.working_days), len(self.deposits), self.journal.pending_events)
+                
+                # Journal de uma execução anterior já no limite: compactar antes de crescer mais
+                if self.journal.needs_compaction():
+                    self._compact_snapshot()
             else:
-                print("📂 Nenhum dado anterior encontrado, iniciando sistema limpo")
+                logger.info("📂 Nenhum dado anterior encontrado, iniciando sistema limpo")
                 
         except Exception as e:
-            print(f"⚠️ Erro ao carregar dados: {e}")
+            logger.warning("⚠️ Erro ao carregar dados: %s", e)
             self._initialize_sample_data()
     
     def _initialize_sample_data(self):
         """Inicializa dados de exemplo para demonstração"""
-        print("🎯 Inicializando dados de exemplo...")
-        
-        # Adicionar alguns depósitos de exemplo
-        self.add_deposit(5000.0, "Depósito inicial")
-        self.add_deposit(3000.0, "Depósito adicional")
+        logger.info("🎯 Inicializando dados de exemplo...")
         
-        # Adicionar alguns dias trabalhados no mês atual
-        today = datetime.now()
-        for i in range(1, 15):  # Primeiros 14 dias do mês
-            work_date = today.replace(day=i)
-            if work_date.weekday() < 5:  # Segunda a sexta
-                self.add_working_day(work_date.strftime('%Y-%m-%d'))
+        with self.batch():
+            # Adicionar alguns depósitos de exemplo
+            self.add_deposits([
+                (5000.0, "Depósito inicial"),
+                (3000.0, "Depósito adicional")
+            ])
+            
+            # Adicionar os dias úteis entre os 14 primeiros dias do mês atual
+            month_start = np.datetime64(datetime.now().strftime('%Y-%m'), 'M').astype('datetime64[D]')
+            calendar_index = CalendarIndex(int(str(month_start)[:4]))
+            work_dates = calendar_index.business_dates(month_start, month_start + 13)
+            self.add_working_days(np.datetime_as_string(work_dates).tolist())
         
-        print("✅ Dados de exemplo criados")
+        logger.info("✅ Dados de exemplo criados")
     
     def _setup_monitoring(self):
         """Configura monitoramento de mudanças para sincronização automática"""
-        
-        # Thread para monitorar mudanças no arquivo de dados web
-        def monitor_web_data():
-            data_file = self.data_dir / "diarias_data.json"
-            last_modified = 0
-            
-            while True:
-                try:
-                    if data_file.exists():
-                        current_modified = data_file.stat().st_mtime
-                        if current_modified > last_modified:
-                            last_modified = current_modified
-                            self._sync_from_web_data()
-                    
-                    time.sleep(5)  # Verificar a cada 5 segundos
-                    
-                except Exception as e:
-                    print(f"⚠️ Erro no monitoramento: {e}")
-                    time.sleep(10)
-        
-        # Iniciar thread de monitoramento
-        monitor_thread = threading.Thread(target=monitor_web_data, daemon=True)
-        monitor_thread.start()
+        # inotify no Linux (sem custo ocioso); polling a cada 5s nas demais plataformas
+        self.watcher = FileWatcher(
+            self.data_dir / "diarias_data.json",
+            self._sync_from_web_data,
+            poll_interval=5.0,
+            name="web-data-watcher"
+        )
+        self.watcher.start()
     
     def _sync_from_web_data(self):
         """Sincroniza dados da interface web para o sistema Python"""
+        METRICS.inc('watcher_events_total')
         try:
             data_file = self.data_dir / "diarias_data.json"
-            if data_file.exists():
-                with open(data_file, 'r', encoding='utf-8') as f:
-                    web_data = json.load(f)
+            if not data_file.exists():
+                return
+            
+            with self._state_lock:
+                # Ler sob o bloqueio: um evento do monitor que chega durante a
+                # sincronização anterior já encontra o snapshot regravado
+                content = data_file.read_bytes()
+                
+                # Ignorar gravações próprias (mesmo hash do último snapshot)
+                if self.journal.is_own_snapshot(content):
+                    METRICS.inc('watcher_own_writes_total')
+                    return
                 
-                # Atualizar dados locais
-                old_days_count = len(self.working_days)
-                old_deposits_count = len(self.deposits)
+                with METRICS.timer('web_json_load_seconds'):
+                    web_data = json.loads(content.decode('utf-8'))
                 
-                self.working_days = web_data.get('workingDays', {})
-                self.deposits = web_data.get('deposits', [])
-                self.credit_balance = web_data.get('creditBalance', 0.0)
+                # Documento gravado antes de mutações ainda fora do snapshot:
+                # reaplicar essas mutações sobre ele em vez de descartá-las
+                # (os eventos vindos do próprio documento já estão nele)
+                document_seq = web_data.get('journalSeq', 0)
+                base_known = True
+                if document_seq < self.journal.seq:
+                    events = self.journal.events_since(document_seq)
+                    if events is None:
+                        # Base anterior à última compactação (ou documento legado)
+                        base_known = False
+                    else:
+                        for event in events:
+                            if event.get('origin') != 'web':
+                                apply_event(web_data, event)
                 
-                # Verificar se houve mudanças
-                new_days_count = len(self.working_days)
-                new_deposits_count = len(self.deposits)
+                # Calcular somente o que mudou em relação ao estado em memória
+                # (o saldo é derivado dos agregados, não do valor gravado pela web)
+                delta = compute_delta(
+                    self.working_days, self.deposits,
+                    web_data.get('workingDays', {}), web_data.get('deposits', [])
+                )
+                if not base_known:
+                    # Sem a base não há como distinguir uma remoção externa de um
+                    # item criado depois: mesclar adições e edições e reportar as
+                    # ausências como conflito, sem regravar o arquivo externo
+                    METRICS.inc('watcher_stale_documents_total')
+                    removed_days, removed_deposits = delta.discard_removals()
+                    if removed_days or removed_deposits:
+                        METRICS.inc('watcher_conflicts_total')
+                        logger.warning(
+                            "⚠️ Documento da web sem base conhecida (journalSeq %s < %s): "
+                            "%d dia(s) e %d depósito(s) ausentes não foram removidos",
+                            document_seq, self.journal.seq, len(removed_days), len(removed_deposits)
+                        )
+                if delta.is_empty():
+                    return
                 
-                if new_days_count != old_days_count or new_deposits_count != old_deposits_count:
-                    print(f"🔄 Dados sincronizados da web: {new_days_count} dias, {new_deposits_count} depósitos")
-                    self._trigger_excel_sync()
+                # O delta vira eventos do journal (depósitos por posição na lista)
+                events = self._delta_events(delta)
+                self._apply_delta(delta, events)
+                
+                logger.info("🔄 Dados sincronizados da web: %s", delta.summary())
+                self._mark_changed(delta.sources())
+                self._persist([dict(event, origin='web', creditBalance=self.credit_balance) for event in events])
                 
         except Exception as e:
-            print(f"⚠️ Erro na sincronização web: {e}")
+            logger.warning("⚠️ Erro na sincronização web: %s", e)
+    
+    def _delta_events(self, delta: DataDelta) -> List[Dict[str, Any]]:
+        """Eventos do journal equivalentes a um delta (calculados antes de aplicá-lo)"""
+        events = [{'type': DAY_REMOVED, 'date': date_str} for date_str in delta.days_removed]
+        events.extend({'type': DAY_ADDED, 'date': date_str, 'day': day}
+                      for date_str, day in delta.days_added.items())
+        for date_str, day in delta.days_modified.items():
+            old = self.working_days[date_str]
+            if {**old, 'status': day.get('status', 'pending')} == day:
+                events.append({'type': DAY_STATUS_CHANGED, 'date': date_str, 'status': day.get('status', 'pending')})
+            else:
+                # DAY_ADDED sobrescreve o dia inteiro (upsert no replay)
+                events.append({'type': DAY_ADDED, 'date': date_str, 'day': day})
+        
+        # Depósitos por posição: edições, remoções da última para a primeira
+        # posição (as anteriores não se deslocam) e adições no fim da lista
+        positions = {id(deposit): index for index, deposit in enumerate(self.deposits)}
+        events.extend({'type': DEPOSIT_UPDATED, 'index': positions[id(old)], 'deposit': new}
+                      for old, new in delta.deposits_modified)
+        removed = sorted((positions[id(deposit)] for deposit in delta.deposits_removed), reverse=True)
+        events.extend({'type': DEPOSIT_REMOVED, 'index': index} for index in removed)
+        events.extend({'type': DEPOSIT_ADDED, 'deposit': deposit} for deposit in delta.deposits_added)
+        return events
+    
+    def _apply_delta(self, delta: DataDelta, events: List[Dict[str, Any]]):
+        """Aplica um delta ao estado e aos agregados; a lista de depósitos segue os eventos do journal"""
+        for date_str in delta.days_removed:
+            old = self.working_days.pop(date_str, None)
+            if old is not None:
+                self.aggregates.day_removed(date_str, old.get('status', 'pending'))
+        for date_str, day in delta.days_added.items():
+            self.working_days[date_str] = day
+            self.aggregates.day_added(date_str, day.get('status', 'pending'))
+        for date_str, day in delta.days_modified.items():
+            old_status = self.working_days[date_str].get('status', 'pending')
+            self.working_days[date_str] = day
+            self.aggregates.status_changed(old_status, day.get('status', 'pending'))
+        
+        for deposit in delta.deposits_removed:
+            self.aggregates.deposit_removed(deposit.get('amount', 0))
+        for old, new in delta.deposits_modified:
+            self.aggregates.deposit_removed(old.get('amount', 0))
+            self.aggregates.deposit_added(new.get('amount', 0))
+        for deposit in delta.deposits_added:
+            self.aggregates.deposit_added(deposit.get('amount', 0))
+        
+        # Mesmos eventos do replay: memória e journal não divergem nas posições
+        state = {'deposits': self.deposits}
+        for event in events:
+            if EVENT_SOURCES[event['type']] == ('deposits',):
+                apply_event(state, event)
+    
+    def _mark_changed(self, sources: Iterable[str]):
+        """Registra fontes alteradas: invalida o cache e marca as abas para sincronização"""
+        for source in sources:
+            self._versions[source] += 1
+            self._dirty_sources.add(source)
+            self._unnotified_sources.add(source)
+    
+    @property
+    def data_version(self) -> int:
+        """Contador crescente de alterações dos dados (dias + depósitos)"""
+        return sum(self._versions.values())
+    
+    def add_change_listener(self, callback: Callable[[Set[str]], None]):
+        """
+        Registra callback(fontes) chamado após cada alteração persistida
+        
+        Uma chamada por mutação, por lote (batch) ou por sincronização da web,
+        com as fontes alteradas ('days', 'deposits'). O callback roda na thread
+        que fez a alteração, ainda com o estado bloqueado: deve apenas agendar
+        o trabalho (ex.: loop.call_soon_threadsafe).
+        """
+        self._listeners.append(callback)
+    
+    def remove_change_listener(self, callback: Callable[[Set[str]], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def _notify_listeners(self):
+        sources, self._unnotified_sources = self._unnotified_sources, set()
+        if not sources:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(sources)
+            except Exception as e:
+                logger.error("❌ Erro em ouvinte de alterações: %s", e)
+    
+    def _cache_key(self, *sources: str) -> tuple:
+        """Chave de cache: versões das fontes usadas + valor da diária"""
+        return tuple(self._versions[source] for source in sources) + (self.daily_rate,)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Acertos/faltas do cache de análises"""
+        return self._cache.stats()
+    
+    def export_metrics(self, path=None) -> Path:
+        """
+        Grava as métricas do processo em JSON (padrão: excel_report/diarias_metrics.json)
+        
+        Inclui as estatísticas do cache de análises e do worker Excel, que são
+        mantidas mesmo com as métricas desativadas.
+        """
+        path = Path(path) if path is not None else self.data_dir / "diarias_metrics.json"
+        return METRICS.write_json(path, extra={
+            'cache': self.cache_stats(),
+            'worker': self.sync_worker.stats()
+        })
     
     def _trigger_excel_sync(self):
-        """Força sincronização com Excel"""
+        """Agenda sincronização com Excel no worker (retorna imediatamente)"""
+        METRICS.inc('sync_requests_total')
+        self.sync_worker.request_sync()
+    
+    def _run_excel_sync(self):
+        """Executa a sincronização com Excel (chamado pelo worker)"""
         try:
-            # Preparar dados para Excel
-            self._prepare_excel_data()
-            
-            # Sincronizar
-            self.sync_manager.sync_to_excel()
+            with self._excel_lock, METRICS.timer('sync_seconds'):
+                # Preparar dados para Excel (o snapshot só é compactado no limite do journal)
+                with self._state_lock:
+                    self._prepare_excel_data()
+                
+                # Sincronizar (pulado se nenhum dataset mudou; o workbook é regravado inteiro)
+                changed = self.sync_manager.sync_to_excel()
             
-            print(f"📊 Dados sincronizados com Excel: {self.excel_file}")
+            if changed:
+                METRICS.inc('datasets_changed_total', len(changed))
+                logger.info("📊 Dados sincronizados com Excel: %s (datasets alterados: %s)",
+                            self.excel_file, ', '.join(changed))
             
         except Exception as e:
-            print(f"❌ Erro na sincronização Excel: {e}")
+            METRICS.inc('sync_errors_total')
+            logger.error("❌ Erro na sincronização Excel: %s", e)
+    
+    def _compact_snapshot(self, force: bool = False):
+        """
+        Grava em diarias_data.json os eventos ainda só no journal
+        
+        Chamado quando o journal atinge compact_every eventos e no
+        encerramento: entre compactações cada mutação custa um append, e a
+        interface web lê o estado atual por /api/state (documentos gravados
+        por ela são rebaseados sobre os eventos ainda no journal).
+        """
+        if not (force or self.journal.pending_events):
+            return
+        try:
+            with METRICS.timer('compact_seconds'):
+                self.working_days.compact_notes()
+                self.journal.compact(self._snapshot())
+        except Exception as e:
+            METRICS.inc('save_errors_total')
+            logger.error("❌ Erro ao atualizar o snapshot: %s", e)
     
     def _start_web_interface(self):
         """Inicia a interface web em thread separada"""
@@ -178,82 +483,97 @@ class DiariasSystem:
             web_file = self.data_dir / "index.html"
             if web_file.exists():
                 webbrowser.open(f"file://{web_file.absolute()}")
-                print("🌐 Interface web aberta no navegador")
+                logger.info("🌐 Interface web aberta no navegador")
         
         # Abrir navegador em thread separada
         browser_thread = threading.Thread(target=open_browser, daemon=True)
         browser_thread.start()
     
     def get_working_days_dataframe(self) -> pd.DataFrame:
-        """Retorna DataFrame com dias trabalhados"""
+        """Retorna DataFrame com dias trabalhados (memorizado por versão dos dados)"""
+        return self._cache.get('dias_trabalhados', self._cache_key('days'), self._build_working_days_dataframe)
+    
+    @METRICS.timed('build_working_days_seconds')
+    def _build_working_days_dataframe(self) -> pd.DataFrame:
+        """Retorna DataFrame com dias trabalhados (montado das colunas, já ordenado)"""
         if not self.working_days:
             return pd.DataFrame(columns=['Data', 'Status', 'Valor', 'Observacoes'])
         
-        data = []
-        for date_str, info in self.working_days.items():
-            data.append({
-                'Data': pd.to_datetime(date_str),
-                'Status': info.get('status', 'pending'),
-                'Valor': self.daily_rate,
-                'Observacoes': info.get('notes', '')
-            })
-        
-        df = pd.DataFrame(data)
-        df = df.sort_values('Data')
-        df['Mes'] = df['Data'].dt.strftime('%Y-%m')
-        df['Dia_Semana'] = df['Data'].dt.day_name()
-        df['Valor_Acumulado'] = df['Valor'].cumsum()
-        
-        return df
+        return self.working_days.to_frame(self.daily_rate)
     
     def get_deposits_dataframe(self) -> pd.DataFrame:
-        """Retorna DataFrame com depósitos"""
+        """Retorna DataFrame com depósitos (memorizado por versão dos dados)"""
+        return self._cache.get('depositos', self._cache_key('deposits'), self._build_deposits_dataframe)
+    
+    @METRICS.timed('build_deposits_seconds')
+    def _build_deposits_dataframe(self) -> pd.DataFrame:
+        """Retorna DataFrame com depósitos (montado por coluna, datas convertidas de uma vez)"""
         if not self.deposits:
             return pd.DataFrame(columns=['Data', 'Valor', 'Descricao', 'Saldo_Apos'])
         
-        data = []
-        for deposit in self.deposits:
-            data.append({
-                'Data': pd.to_datetime(deposit['date']),
-                'Valor': deposit['amount'],
-                'Descricao': deposit.get('description', ''),
-                'Saldo_Apos': deposit.get('balanceAfter', 0)
-            })
-        
-        df = pd.DataFrame(data)
-        df = df.sort_values('Data')
+        raw = pd.DataFrame.from_records(self.deposits, columns=['date', 'amount', 'description', 'balanceAfter'])
+        df = pd.DataFrame({
+            'Data': pd.to_datetime(raw['date'], format='ISO8601'),
+            'Valor': raw['amount'],
+            'Descricao': raw['description'].fillna(''),
+            'Saldo_Apos': raw['balanceAfter'].fillna(0)
+        })
+        df = df.sort_values('Data', kind='mergesort')
         df['Valor_Acumulado'] = df['Valor'].cumsum()
         
         return df
     
+    @property
+    def credit_balance(self) -> float:
+        """Saldo de créditos (total depositado - total ganho), sempre consistente"""
+        return self.aggregates.balance
+    
+    def get_days(self, status: Optional[str] = None, start: Optional[str] = None,
+                 end: Optional[str] = None) -> List[str]:
+        """
+        Datas ('AAAA-MM-DD') dos dias trabalhados por status e/ou intervalo inclusivo, em ordem
+
+        Com storage='sqlite' a consulta usa os índices de status e data.
+        """
+        with self._state_lock:
+            if not self.working_days:
+                return []
+            if self.storage == 'sqlite' and not self._batch_depth:
+                return self.journal.days(status=status, start=start, end=end)
+
+            df_days = self.get_working_days_dataframe()
+            dates = df_days['Data'].to_numpy()
+            mask = np.ones(len(dates), dtype=bool)
+            if status is not None:
+                mask &= (df_days['Status'] == status).to_numpy()
+            if start is not None:
+                mask &= dates >= np.datetime64(start, 'D')
+            if end is not None:
+                mask &= dates <= np.datetime64(end, 'D')
+            return np.datetime_as_string(dates[mask], unit='D').tolist()
+
     def get_kpis(self) -> Dict[str, Any]:
-        """Calcula KPIs do sistema de diárias"""
-        df_days = self.get_working_days_dataframe()
-        df_deposits = self.get_deposits_dataframe()
+        """Calcula KPIs do sistema de diárias (leitura O(1) dos agregados)"""
+        agg = self.aggregates
         
         # KPIs básicos
-        total_days = len(df_days)
-        total_earned = total_days * self.daily_rate
-        total_deposited = df_deposits['Valor'].sum() if not df_deposits.empty else 0
-        current_balance = total_deposited - total_earned
+        total_days = agg.total_days
+        total_earned = agg.total_earned
+        total_deposited = agg.total_deposited
+        current_balance = agg.balance
         
         # KPIs por status
-        paid_days = len(df_days[df_days['Status'] == 'paid']) if not df_days.empty else 0
-        pending_days = len(df_days[df_days['Status'] == 'pending']) if not df_days.empty else 0
+        paid_days = agg.days_by_status.get('paid', 0)
+        pending_days = agg.days_by_status.get('pending', 0)
         
         # KPIs temporais
         today = datetime.now()
         current_month = today.strftime('%Y-%m')
-        
-        if not df_days.empty:
-            current_month_days = len(df_days[df_days['Mes'] == current_month])
-            current_month_earned = current_month_days * self.daily_rate
-        else:
-            current_month_days = 0
-            current_month_earned = 0
+        current_month_days = agg.days_in_month(current_month)
+        current_month_earned = current_month_days * self.daily_rate
         
         # Projeções
-        avg_days_per_month = total_days / max(1, len(df_days['Mes'].unique())) if not df_days.empty else 0
+        avg_days_per_month = agg.average_days_per_month()
         projected_monthly_cost = avg_days_per_month * self.daily_rate
         
         return {
@@ -273,22 +593,65 @@ class DiariasSystem:
             'status_saldo': 'positivo' if current_balance >= 0 else 'negativo'
         }
     
+    def get_dashboard_view(self) -> Dict[str, Any]:
+        """
+        KPIs e totais mensais lidos de forma consistente (painéis em tempo real)
+        
+        Returns:
+            {'kpis': get_kpis() sem o carimbo de horário,
+             'months': {'AAAA-MM': [dias trabalhados, dias pagos]}}
+        """
+        with self._state_lock:
+            kpis = self.get_kpis()
+            monthly = self.get_monthly_analysis()
+        
+        kpis.pop('ultima_atualizacao', None)
+        months = {
+            month: [int(days), int(paid)]
+            for month, days, paid in zip(monthly.index, monthly['Dias_Trabalhados'], monthly['Dias_Pagos'])
+        }
+        return {'kpis': kpis, 'months': months}
+    
+    def verify_aggregates(self, reconcile: bool = True) -> List[str]:
+        """Confere os agregados incrementais contra um recálculo completo"""
+        with self._state_lock:
+            mismatches = self.aggregates.verify(self.working_days, self.deposits, reconcile)
+        
+        if mismatches:
+            logger.warning("⚠️ Agregados divergentes (%d): %s", len(mismatches), '; '.join(mismatches))
+        else:
+            logger.info("✅ Agregados conferidos com o recálculo completo")
+        return mismatches
+    
     def get_monthly_analysis(self) -> pd.DataFrame:
+        """Análise mensal detalhada (memorizado por versão dos dados)"""
+        return self._cache.get('analise_mensal', self._cache_key('days'), self._build_monthly_analysis)
+    
+    @METRICS.timed('build_monthly_analysis_seconds')
+    def _build_monthly_analysis(self) -> pd.DataFrame:
         """Análise mensal detalhada"""
-        df_days = self.get_working_days_dataframe()
-        
-        if df_days.empty:
+        if not self.working_days:
             return pd.DataFrame(columns=['Mes', 'Dias_Trabalhados', 'Valor_Total', 'Dias_Pagos', 'Dias_Pendentes'])
         
-        monthly = df_days.groupby('Mes').agg({
-            'Data': 'count',
-            'Valor': 'sum',
-            'Status': lambda x: (x == 'paid').sum()
-        }).rename(columns={
-            'Data': 'Dias_Trabalhados',
-            'Valor': 'Valor_Total',
-            'Status': 'Dias_Pagos'
-        })
+        if self.storage == 'sqlite' and not self._batch_depth:
+            # Contagens por GROUP BY no banco (fora de um lote as tabelas estão atualizadas)
+            months, dias, dias_pagos = self.journal.monthly_counts()
+            dias = np.asarray(dias, dtype=np.int64)
+            dias_pagos = np.asarray(dias_pagos, dtype=np.int64)
+            valor = dias * float(self.daily_rate)
+        else:
+            # Motor mensal compartilhado com as planilhas (períodos ano-mês reais)
+            df_days = self.get_working_days_dataframe()
+            metrics = monthly_metrics(df_days['Data'], df_days['Status'] == 'paid',
+                                      df_days['Status'] == 'pending', df_days['Valor'])
+            months = metrics.index.astype(str)
+            dias, valor, dias_pagos = metrics['Dias'].to_numpy(), metrics['Valor'].to_numpy(), metrics['Dias_Pagos'].to_numpy()
+        
+        monthly = pd.DataFrame({
+            'Dias_Trabalhados': dias,
+            'Valor_Total': valor,
+            'Dias_Pagos': dias_pagos
+        }, index=pd.Index(months, name='Mes'))   # 'AAAA-MM'
         
         monthly['Dias_Pendentes'] = monthly['Dias_Trabalhados'] - monthly['Dias_Pagos']
         monthly['Taxa_Pagamento'] = (monthly['Dias_Pagos'] / monthly['Dias_Trabalhados']) * 100
@@ -297,55 +660,48 @@ class DiariasSystem:
         return monthly.round(2)
     
     def get_cash_flow(self) -> pd.DataFrame:
+        """Análise de fluxo de caixa (memorizado por versão dos dados)"""
+        return self._cache.get('fluxo_caixa', self._cache_key('days', 'deposits'), self._build_cash_flow)
+    
+    @METRICS.timed('build_cash_flow_seconds')
+    def _build_cash_flow(self) -> pd.DataFrame:
         """Análise de fluxo de caixa"""
-        df_days = self.get_working_days_dataframe()
-        df_deposits = self.get_deposits_dataframe()
-        
-        # Combinar entradas (depósitos) e saídas (dias trabalhados)
-        cash_flow_data = []
-        
-        # Adicionar depósitos como entradas
-        for _, deposit in df_deposits.iterrows():
-            cash_flow_data.append({
-                'Data': deposit['Data'],
-                'Tipo': 'Entrada',
-                'Valor': deposit['Valor'],
-                'Descricao': f"Depósito: {deposit['Descricao']}",
-                'Saldo_Impacto': deposit['Valor']
-            })
-        
-        # Adicionar dias trabalhados como saídas
-        for _, day in df_days.iterrows():
-            cash_flow_data.append({
-                'Data': day['Data'],
-                'Tipo': 'Saída',
-                'Valor': -day['Valor'],
-                'Descricao': f"Diária trabalhada ({day['Status']})",
-                'Saldo_Impacto': -day['Valor']
-            })
-        
-        if not cash_flow_data:
-            return pd.DataFrame(columns=['Data', 'Tipo', 'Valor', 'Descricao', 'Saldo_Impacto', 'Saldo_Acumulado'])
-        
-        df_flow = pd.DataFrame(cash_flow_data)
-        df_flow = df_flow.sort_values('Data')
-        df_flow['Saldo_Acumulado'] = df_flow['Saldo_Impacto'].cumsum()
-        
-        return df_flow
-    
-    def _prepare_excel_data(self):
-        """Prepara todos os dados para sincronização com Excel"""
-        # Registrar todos os DataFrames
-        self.sync_manager.register_data('dias_trabalhados', self.get_working_days_dataframe())
-        self.sync_manager.register_data('depositos', self.get_deposits_dataframe())
-        self.sync_manager.register_data('analise_mensal', self.get_monthly_analysis())
-        self.sync_manager.register_data('fluxo_caixa', self.get_cash_flow())
-        
-        # Registrar KPIs
-        self.sync_manager.register_data('kpis_diarias', self.get_kpis())
-        
-        # Dados de configuração
-        config_data = {
+        return build_cash_flow(self.get_working_days_dataframe(), self.get_deposits_dataframe())
+    
+    def _prepare_excel_data(self, force: bool = False) -> List[str]:
+        """
+        Prepara os dados para sincronização com Excel
+        
+        Apenas os datasets que dependem de fontes alteradas desde a última
+        preparação são recalculados; o gerenciador incremental ainda descarta
+        os que, recalculados, mantêm o mesmo conteúdo.
+        
+        Args:
+            force: Recalcula todos os datasets
+        
+        Returns:
+            Lista dos datasets recalculados
+        """
+        datasets = list(SHEET_DEPENDENCIES) if force else sheets_for_sources(self._dirty_sources)
+        self._dirty_sources = set()
+        
+        builders = {
+            'dias_trabalhados': self.get_working_days_dataframe,
+            'depositos': self.get_deposits_dataframe,
+            'analise_mensal': self.get_monthly_analysis,
+            'fluxo_caixa': self.get_cash_flow,
+            'kpis_diarias': self.get_kpis,
+            'configuracao': self._get_config_data
+        }
+        
+        for name in datasets:
+            self.sync_manager.register_data(name, builders[name]())
+        
+        return datasets
+    
+    def _get_config_data(self) -> Dict[str, Any]:
+        """Dados de configuração sincronizados com o Excel"""
+        return {
             'valor_diaria': self.daily_rate,
             'total_dias': len(self.working_days),
             'total_depositos': len(self.deposits),
@@ -353,107 +709,258 @@ class DiariasSystem:
             'ultima_sincronizacao': datetime.now().isoformat(),
             'versao_sistema': '2.0.0'
         }
-        
-        self.sync_manager.register_data('configuracao', config_data)
     
     # Métodos para manipulação de dados
-    def add_working_day(self, date_str: str, status: str = 'pending', notes: str = '') -> bool:
-        """Adiciona um dia trabalhado"""
-        try:
-            self.working_days[date_str] = {
-                'status': status,
-                'notes': notes,
-                'added_at': datetime.now().isoformat()
-            }
-            
-            # Atualizar saldo
-            self.credit_balance -= self.daily_rate
-            
-            # Salvar dados
-            self._save_data()
-            
-            print(f"✅ Dia adicionado: {date_str} (Status: {status})")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erro ao adicionar dia: {e}")
+    def add_working_day(self, date_str: str, status: str = 'pending', notes: str = '',
+                        project: Optional[str] = None) -> bool:
+        """Adiciona um dia trabalhado (project: local/projeto exibido pela interface web)"""
+        if status not in DEFAULT_STATUSES:
+            logger.warning("⚠️ Status inválido: %s", status)
             return False
-    
-    def remove_working_day(self, date_str: str) -> bool:
-        """Remove um dia trabalhado"""
-        try:
-            if date_str in self.working_days:
-                del self.working_days[date_str]
+        with self._state_lock:
+            try:
+                day = {
+                    'status': status,
+                    'notes': notes,
+                    'added_at': datetime.now().isoformat()
+                }
+                if project:
+                    day['project'] = project
+                previous = self.working_days.get(date_str)
+                self.working_days[date_str] = day
                 
-                # Atualizar saldo
-                self.credit_balance += self.daily_rate
+                # Atualizar agregados (e com eles o saldo)
+                self.aggregates.day_added(
+                    date_str, status,
+                    previous.get('status', 'pending') if previous is not None else None
+                )
                 
                 # Salvar dados
-                self._save_data()
+                self._save_data({'type': DAY_ADDED, 'date': date_str, 'day': day})
                 
-                print(f"🗑️ Dia removido: {date_str}")
+                logger.info("✅ Dia adicionado: %s (Status: %s)", date_str, status)
                 return True
-            else:
-                print(f"⚠️ Dia não encontrado: {date_str}")
+                
+            except Exception as e:
+                logger.error("❌ Erro ao adicionar dia: %s", e)
                 return False
+    
+    def remove_working_day(self, date_str: str) -> bool:
+        """Remove um dia trabalhado"""
+        with self._state_lock:
+            try:
+                if date_str in self.working_days:
+                    old_status = self.working_days[date_str].get('status', 'pending')
+                    del self.working_days[date_str]
+                    
+                    # Atualizar agregados (e com eles o saldo)
+                    self.aggregates.day_removed(date_str, old_status)
+                    
+                    # Salvar dados
+                    self._save_data({'type': DAY_REMOVED, 'date': date_str})
+                    
+                    logger.info("🗑️ Dia removido: %s", date_str)
+                    return True
+                else:
+                    logger.warning("⚠️ Dia não encontrado: %s", date_str)
+                    return False
                 
-        except Exception as e:
-            print(f"❌ Erro ao remover dia: {e}")
-            return False
+            except Exception as e:
+                logger.error("❌ Erro ao remover dia: %s", e)
+                return False
     
     def add_deposit(self, amount: float, description: str = '') -> bool:
         """Adiciona um depósito"""
-        try:
-            deposit = {
-                'date': datetime.now().isoformat(),
-                'amount': amount,
-                'description': description,
-                'balanceAfter': self.credit_balance + amount
-            }
-            
-            self.deposits.append(deposit)
-            self.credit_balance += amount
-            
-            # Salvar dados
-            self._save_data()
-            
-            print(f"💰 Depósito adicionado: R$ {amount:.2f} - {description}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erro ao adicionar depósito: {e}")
+        with self._state_lock:
+            try:
+                deposit = {
+                    'date': datetime.now().isoformat(),
+                    'amount': amount,
+                    'description': description,
+                    'balanceAfter': self.credit_balance + amount
+                }
+                
+                self.deposits.append(deposit)
+                self.aggregates.deposit_added(amount)
+                
+                # Salvar dados
+                self._save_data({'type': DEPOSIT_ADDED, 'deposit': deposit})
+                
+                logger.info("💰 Depósito adicionado: R$ %.2f - %s", amount, description)
+                return True
+                
+            except Exception as e:
+                logger.error("❌ Erro ao adicionar depósito: %s", e)
+                return False
+    
+    def update_day_status(self, date_str: str, status: str) -> bool:
+        """Atualiza o status de pagamento de um dia trabalhado"""
+        if status not in DEFAULT_STATUSES:
+            logger.warning("⚠️ Status inválido: %s", status)
             return False
+        with self._state_lock:
+            try:
+                if date_str not in self.working_days:
+                    logger.warning("⚠️ Dia não encontrado: %s", date_str)
+                    return False
+                
+                old_status = self.working_days[date_str].get('status', 'pending')
+                self.working_days.set_status(date_str, status)
+                self.aggregates.status_changed(old_status, status)
+                
+                # Salvar dados
+                self._save_data({'type': DAY_STATUS_CHANGED, 'date': date_str, 'status': status})
+                
+                logger.info("🔁 Status atualizado: %s -> %s", date_str, status)
+                return True
+                
+            except Exception as e:
+                logger.error("❌ Erro ao atualizar status: %s", e)
+                return False
+    
+    def add_working_days(self, dates: Iterable[str], status: str = 'pending', notes: str = '') -> int:
+        """Adiciona vários dias trabalhados com uma única gravação e sincronização"""
+        added = 0
+        with self.batch():
+            for date_str in dates:
+                if self.add_working_day(date_str, status, notes):
+                    added += 1
+        return added
+    
+    def add_deposits(self, rows: Iterable) -> int:
+        """
+        Adiciona vários depósitos com uma única gravação e sincronização
+        
+        Args:
+            rows: Tuplas (valor, descrição) ou dicionários com 'amount' e 'description'
+        """
+        added = 0
+        with self.batch():
+            for row in rows:
+                if isinstance(row, dict):
+                    amount, description = row['amount'], row.get('description', '')
+                else:
+                    amount, description = row[0], (row[1] if len(row) > 1 else '')
+                if self.add_deposit(amount, description):
+                    added += 1
+        return added
     
-    def _save_data(self):
-        """Salva dados no arquivo JSON para sincronização com web"""
+    @contextmanager
+    def batch(self) -> Iterator['DiariasSystem']:
+        """
+        Agrupa mutações: aplica tudo em memória e persiste/sincroniza uma única vez
+        
+        O bloqueio do estado é mantido durante todo o lote: mutações de outras
+        threads e a sincronização da web aguardam o fim do lote, de modo que
+        os eventos acumulados não se misturam com gravações alheias.
+        
+        Exemplo:
+            with sistema.batch():
+                sistema.add_working_day('2025-01-02')
+                sistema.add_deposit(1000.0, 'Depósito')
+        """
+        with self._state_lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._batch_dirty:
+                    events, self._batch_events = self._batch_events, []
+                    self._batch_dirty = False
+                    self._persist(events)
+    
+    def get_state(self) -> Dict[str, Any]:
+        """Cópia consistente do estado completo no formato de diarias_data.json"""
+        with self._state_lock:
+            state = self._snapshot()
+            state['deposits'] = list(state['deposits'])
+            return state
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Retorna o estado completo no formato de diarias_data.json"""
+        return {
+            'workingDays': self.working_days.to_dict(),
+            'deposits': self.deposits,
+            'creditBalance': self.credit_balance
+        }
+    
+    def _save_data(self, event: Optional[Dict[str, Any]] = None):
+        """
+        Persiste uma mutação para sincronização com web
+        
+        Com um evento, grava apenas uma linha no journal (tamanho constante);
+        o snapshot completo é regravado pelo worker após o debounce, na
+        compactação periódica ou quando nenhum evento é informado. Dentro de batch() a gravação e a
+        sincronização Excel são adiadas para o fim do lote.
+        """
+        METRICS.inc('mutations_total')
+        if event is not None:
+            event = dict(event, creditBalance=self.credit_balance)
+            self._mark_changed(EVENT_SOURCES[event['type']])
+        else:
+            self._mark_changed(('days', 'deposits'))
+        
+        if self._batch_depth:
+            if event is not None:
+                self._batch_events.append(event)
+            self._batch_dirty = True
+            return
+        
+        self._persist([event] if event is not None else None)
+    
+    def _persist(self, events: Optional[List[Dict[str, Any]]]):
+        """Grava eventos no journal (ou o snapshot completo) e sincroniza o Excel"""
         try:
-            data = {
-                'workingDays': self.working_days,
-                'deposits': self.deposits,
-                'creditBalance': self.credit_balance,
-                'lastUpdate': datetime.now().isoformat()
-            }
-            
-            data_file = self.data_dir / "diarias_data.json"
-            with open(data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with METRICS.timer('save_seconds'):
+                if events:
+                    if len(events) == 1:
+                        self.journal.append(events[0])
+                    else:
+                        self.journal.append_many(events)
+                
+                if not events:
+                    self.journal.replace(self._snapshot())
+                elif self.journal.needs_compaction():
+                    self.journal.compact(self._snapshot())
             
-            # Trigger sincronização Excel
+            # Notificar ouvintes e agendar sincronização Excel
+            self._notify_listeners()
             self._trigger_excel_sync()
             
         except Exception as e:
-            print(f"❌ Erro ao salvar dados: {e}")
+            METRICS.inc('save_errors_total')
+            logger.error("❌ Erro ao salvar dados: %s", e)
     
-    def generate_report(self, export_excel: bool = True) -> str:
-        """Gera relatório completo"""
-        print("📋 Gerando relatório completo...")
+    def generate_report(self, export_excel: bool = True, profile: Optional[bool] = None) -> str:
+        """
+        Gera relatório completo
         
-        # Preparar dados
-        self._prepare_excel_data()
+        Args:
+            export_excel: Se deve sincronizar o Excel antes do resumo
+            profile: Captura cProfile/tracemalloc em excel_report/profiles
+                (padrão: variável de ambiente DIARIAS_PROFILE)
+        """
+        if profile is None:
+            profile = os.environ.get('DIARIAS_PROFILE', '') not in ('', '0')
         
-        # Sincronizar com Excel se solicitado
-        if export_excel:
-            self.sync_manager.sync_to_excel()
+        with METRICS.profile('generate_report', self.data_dir / "profiles", enabled=profile), \
+                METRICS.timer('report_seconds'):
+            return self._generate_report(export_excel)
+    
+    def _generate_report(self, export_excel: bool) -> str:
+        """Gera relatório completo"""
+        logger.info("📋 Gerando relatório completo...")
+        
+        with self._excel_lock:
+            # Preparar dados
+            with self._state_lock:
+                self._prepare_excel_data(force=True)
+            
+            # Sincronizar com Excel se solicitado (mesmo sem datasets alterados:
+            # o relatório garante que a planilha exista e esteja completa)
+            if export_excel:
+                self.sync_manager.sync_to_excel(force=True)
         
         # Gerar resumo textual
         kpis = self.get_kpis()
@@ -489,10 +996,10 @@ class DiariasSystem:
    • Interface Web: {self.data_dir}/index.html
 """
         
-        print(report)
+        logger.info("%s", report)
         
         if export_excel:
-            print(f"✅ Relatório Excel gerado: {self.excel_file}")
+            logger.info("✅ Relatório Excel gerado: %s", self.excel_file)
         
         return report
     
@@ -506,18 +1013,45 @@ class DiariasSystem:
         print(f"📅 Dias trabalhados: {kpis['total_dias_trabalhados']}")
         print(f"💳 Depósitos: {len(self.deposits)}")
         print(f"🔄 Sincronização: Ativa (a cada {self.auto_sync_interval}s)")
+        worker = self.sync_worker.stats()
+        latency = worker['last_sync_latency']
+        latency_text = f"{latency * 1000:.0f} ms" if latency is not None else "-"
+        print(f"⏱️ Worker Excel: {worker['queue_depth']} pendentes, "
+              f"{worker['sync_count']} sincronizações (última: {latency_text})")
         print(f"📊 Excel: {self.excel_file}")
         print(f"🌐 Web: {self.data_dir}/index.html")
     
-    def __del__(self):
-        """Cleanup ao finalizar"""
+    def close(self):
+        """Executa a sincronização pendente e libera journal e worker"""
+        if getattr(self, '_closed', False):
+            return
+        self._closed = True
+        if hasattr(self, 'watcher'):
+            self.watcher.stop()
+        if hasattr(self, 'sync_worker'):
+            self.sync_worker.stop(flush=True)
+        if hasattr(self, 'journal'):
+            with self._state_lock:
+                self._compact_snapshot()
+            self.journal.close()
+        if getattr(self, '_metrics_server', None) is not None:
+            METRICS.stop_server()
         if hasattr(self, 'sync_manager'):
             self.sync_manager.stop_auto_sync()
-            print("🔄 Sincronização automática finalizada")
+            logger.info("🔄 Sincronização automática finalizada")
+    
+    def __del__(self):
+        """Cleanup ao finalizar"""
+        self.close()
 
 # Funções de conveniência para uso interativo
+def configurar_log(level: int = logging.INFO):
+    """Exibe as mensagens do sistema no console (uso interativo)"""
+    logging.basicConfig(level=level, format='%(message)s')
+
 def criar_sistema_diarias(auto_sync_interval: int = 30) -> DiariasSystem:
-    """Cria e retorna uma instância do sistema de diárias"""
+    """Cria e retorna uma instância do sistema de diárias (com mensagens no console)"""
+    configurar_log()
     return DiariasSystem(auto_sync_interval=auto_sync_interval)
 
 def exemplo_uso_completo():
@@ -534,14 +1068,14 @@ def exemplo_uso_completo():
     # Adicionar alguns dados de exemplo
     print("\n📝 Adicionando dados de exemplo...")
     
-    # Adicionar depósito
-    sistema.add_deposit(2000.0, "Depósito de teste")
-    
-    # Adicionar dias trabalhados
+    # Adicionar depósito e dias trabalhados em lote (uma gravação, uma sincronização)
     hoje = datetime.now()
-    for i in range(5):
-        data = (hoje - timedelta(days=i)).strftime('%Y-%m-%d')
-        sistema.add_working_day(data, 'paid' if i < 3 else 'pending')
+    with sistema.batch():
+        sistema.add_deposit(2000.0, "Depósito de teste")
+        
+        for i in range(5):
+            data = (hoje - timedelta(days=i)).strftime('%Y-%m-%d')
+            sistema.add_working_day(data, 'paid' if i < 3 else 'pending')
     
     # Gerar relatório
     print("\n📊 Gerando relatório...")
@@ -555,6 +1089,7 @@ def exemplo_uso_completo():
 
 if __name__ == "__main__":
     # Executar exemplo se rodado diretamente
+    configurar_log()
     sistema = exemplo_uso_completo()
     
     print("\n" + "="*60)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Worker de Sincronização Excel
+Executa a sincronização em uma thread dedicada, agrupando rajadas de
+mutações em uma única chamada (debounce com flag de dados sujos)
+"""
+
+import logging
+import time
+import threading
+from typing import Callable, Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+class ExcelSyncWorker:
+    """Thread de sincronização com debounce e coalescência de pedidos"""
+
+    def __init__(self, sync_fn: Callable[[], None], debounce: float = 1.0,
+                 max_delay: float = 30.0, name: str = "excel-sync-worker"):
+        """
+        Inicializa o worker
+
+        Args:
+            sync_fn: Função que executa a sincronização completa
+            debounce: Janela de silêncio (s) aguardada após o último pedido
+            max_delay: Atraso máximo (s) desde o primeiro pedido pendente,
+                mesmo que as mutações continuem chegando
+            name: Nome da thread
+        """
+        self.sync_fn = sync_fn
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._dirty = False
+        self._syncing = False
+        self._first_request = 0.0
+        self._last_request = 0.0
+
+        # Métricas
+        self.queue_depth = 0          # Pedidos pendentes que serão agrupados
+        self.sync_count = 0
+        self.coalesced_requests = 0   # Pedidos absorvidos por outra sincronização
+        self.last_sync_latency = None  # Duração da última sincronização (s)
+        self.last_sync_at = None
+        self.last_error = None
+
+    # === CICLO DE VIDA ===
+
+    def start(self):
+        """Inicia a thread do worker"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, flush: bool = True, timeout: Optional[float] = None):
+        """Para o worker, executando antes a sincronização pendente se solicitado"""
+        if flush:
+            self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    # === PEDIDOS ===
+
+    def request_sync(self):
+        """Marca os dados como sujos; retorna imediatamente"""
+        with self._cond:
+            now = time.monotonic()
+            if not self._dirty:
+                self._dirty = True
+                self._first_request = now
+            else:
+                self.coalesced_requests += 1
+            self._last_request = now
+            self.queue_depth += 1
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Executa imediatamente a sincronização pendente e aguarda o término
+
+        Returns:
+            True se não houver mais sincronização pendente
+        """
+        with self._cond:
+            if self._running and self._thread is not threading.current_thread():
+                # Antecipar o prazo e aguardar o worker
+                self._first_request = self._last_request = float('-inf')
+                self._cond.notify_all()
+                return self._cond.wait_for(lambda: not self._dirty and not self._syncing, timeout)
+            pending = self._dirty
+            self._dirty = False
+            self.queue_depth = 0
+
+        if pending:
+            self._execute()
+        return True
+
+    # === LOOP ===
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._dirty:
+                    self._cond.wait()
+                if not self._running:
+                    return
+
+                # Debounce: aguardar silêncio ou o atraso máximo
+                while self._running and self._dirty:
+                    now = time.monotonic()
+                    quiet_at = self._last_request + self.debounce
+                    deadline = self._first_request + self.max_delay
+                    wake_at = min(quiet_at, deadline)
+                    if now >= wake_at:
+                        break
+                    self._cond.wait(wake_at - now)
+                if not self._running:
+                    return
+
+                self._dirty = False
+                self._syncing = True
+                self.queue_depth = 0
+
+            try:
+                self._execute()
+            finally:
+                with self._cond:
+                    self._syncing = False
+                    self._cond.notify_all()
+
+    def _execute(self):
+        started = time.perf_counter()
+        try:
+            self.sync_fn()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error("❌ Erro no worker de sincronização: %s", e)
+        finally:
+            self.last_sync_latency = time.perf_counter() - started
+            self.last_sync_at = time.time()
+            self.sync_count += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas do worker"""
+        with self._cond:
+            return {
+                'queue_depth': self.queue_depth,
+                'dirty': self._dirty,
+                'syncing': self._syncing,
+                'sync_count': self.sync_count,
+                'coalesced_requests': self.coalesced_requests,
+                'last_sync_latency': self.last_sync_latency,
+                'last_sync_at': self.last_sync_at,
+                'last_error': self.last_error,
+                'debounce': self.debounce,
+                'max_delay': self.max_delay
+            }
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Monitor de Alterações de Arquivo
+Observa um arquivo via inotify (Linux) e recorre a polling de mtime nas
+demais plataformas; em ambos os casos o encerramento é imediato
+"""
+
+import os
+import sys
+import errno
+import logging
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Constantes de inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+    """Carrega a libc com suporte a inotify (somente Linux)"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FileWatcher:
+    """Chama um callback quando o arquivo observado é gravado ou substituído"""
+
+    def __init__(self, path, callback: Callable[[], None], poll_interval: float = 5.0,
+                 use_inotify: Optional[bool] = None, name: str = "file-watcher"):
+        """
+        Args:
+            path: Arquivo observado
+            callback: Função chamada (sem argumentos) a cada alteração
+            poll_interval: Intervalo do polling de fallback em segundos
+            use_inotify: Força (True) ou desativa (False) inotify; None detecta
+            name: Nome da thread
+        """
+        self.path = Path(path)
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.name = name
+
+        self._libc = _load_libc() if use_inotify is not False else None
+        if use_inotify and self._libc is None:
+            raise OSError("inotify não disponível nesta plataforma")
+        self.backend = 'inotify' if self._libc is not None else 'polling'
+
+        self.events = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake_r = self._wake_w = None
+        self._inotify_fd = None
+
+    # === CICLO DE VIDA ===
+
+    def start(self):
+        """Inicia a thread de monitoramento"""
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        if self.backend == 'inotify':
+            try:
+                self._open_inotify()
+            except OSError as e:
+                logger.warning("⚠️ inotify indisponível (%s), usando polling", e)
+                self.backend = 'polling'
+
+        target = self._run_inotify if self.backend == 'inotify' else self._run_polling
+        self._thread = threading.Thread(target=target, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Encerra o monitoramento e libera os descritores"""
+        self._stop.set()
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b'x')
+            except OSError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        self._close_fds()
+
+    # === INOTIFY ===
+
+    def _open_inotify(self):
+        # Observar o diretório: substituições atômicas trocam o inode do arquivo
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        wd = self._libc.inotify_add_watch(fd, os.fsencode(str(self.path.parent)), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, os.strerror(err))
+
+        self._inotify_fd = fd
+        self._wake_r, self._wake_w = os.pipe()
+
+    def _run_inotify(self):
+        target = os.fsencode(self.path.name)
+
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([self._inotify_fd, self._wake_r], [], [])
+            except (OSError, ValueError):
+                return
+            if self._stop.is_set() or self._wake_r in readable:
+                return
+
+            try:
+                buffer = os.read(self._inotify_fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                logger.warning("⚠️ Erro no monitoramento: %s", e)
+                return
+
+            changed = False
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buffer):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                name = buffer[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b'\0')
+                offset += _EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW or name == target:
+                    changed = True
+
+            # Um único callback por lote de eventos
+            if changed:
+                self._notify()
+
+    # === POLLING ===
+
+    def _stat_token(self):
+        try:
+            stat = self.path.stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _run_polling(self):
+        last_token = self._stat_token()
+
+        while not self._stop.wait(self.poll_interval):
+            token = self._stat_token()
+            if token is not None and token != last_token:
+                last_token = token
+                self._notify()
+
+    # === AUXILIARES ===
+
+    def _notify(self):
+        self.events += 1
+        try:
+            self.callback()
+        except Exception as e:
+            logger.warning("⚠️ Erro no monitoramento: %s", e)
+
+    def _close_fds(self):
+        for attr in ('_inotify_fd', '_wake_r', '_wake_w'):
+            fd = getattr(self, attr)
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+                setattr(self, attr, None)
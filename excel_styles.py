@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registro de Estilos das Planilhas
+Estilos declarativos por nome semântico (com herança via 'extends'),
+resolvidos uma vez por processo e convertidos em Format do xlsxwriter uma
+vez por workbook, sob demanda. As cores de status são aplicadas com
+formatação condicional sobre intervalos inteiros em vez de um formato por
+célula
+"""
+
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Tuple
+
+# Base comum das células de dados da planilha simplificada
+_CELL = {'border': 1, 'align': 'center', 'valign': 'vcenter', 'font_size': 10}
+
+STYLE_SETS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    # generate_excel.ExcelGenerator
+    'completo': {
+        'header': {'bold': True, 'font_size': 12, 'bg_color': '#4299e1', 'font_color': 'white',
+                   'align': 'center', 'valign': 'vcenter', 'border': 1},
+        'title': {'bold': True, 'font_size': 16, 'font_color': '#2d3748', 'align': 'center'},
+        'subtitle': {'font_size': 12, 'font_color': '#4a5568', 'align': 'center'},
+        'currency': {'num_format': '$#,##0', 'align': 'right'},
+        'date': {'num_format': 'dd/mm/yyyy', 'align': 'center'},
+        'center': {'align': 'center', 'valign': 'vcenter'},
+        'status': {'align': 'center'},
+        'pago': {'extends': 'status', 'bg_color': '#c6f6d5', 'font_color': '#22543d', 'bold': True},
+        'a_pagar': {'extends': 'status', 'bg_color': '#fed7aa', 'font_color': '#9c4221', 'bold': True},
+        'kpi_value': {'bold': True, 'font_size': 14, 'font_color': '#2d3748', 'align': 'center'},
+        'kpi_label': {'font_size': 10, 'font_color': '#4a5568', 'align': 'center'}
+    },
+    # create_excel.create_daily_allowance_excel
+    'simplificado': {
+        'header': {'bold': True, 'font_color': '#FFF6F0', 'bg_color': '#692927', 'border': 1,
+                   'align': 'center', 'valign': 'vcenter', 'font_size': 11},
+        'title': {'bold': True, 'font_size': 16, 'font_color': '#411B38', 'align': 'center', 'valign': 'vcenter'},
+        'subtitle': {'bold': True, 'font_size': 12, 'font_color': '#411B38', 'align': 'left', 'valign': 'vcenter'},
+        'data': dict(_CELL),
+        'currency': {'extends': 'data', 'num_format': '$#,##0'},
+        'date': {'extends': 'data', 'num_format': 'dd/mm/yyyy'},
+        'status_pago': {'extends': 'data', 'bg_color': '#d4edda', 'font_color': '#155724', 'bold': True},
+        'status_a_pagar': {'extends': 'data', 'bg_color': '#fff3cd', 'font_color': '#856404', 'bold': True},
+        'kpi_value': {'bold': True, 'font_size': 18, 'font_color': '#692927', 'align': 'center', 'valign': 'vcenter'},
+        'kpi_label': {'bold': True, 'font_size': 11, 'font_color': '#411B38', 'align': 'center', 'valign': 'vcenter'},
+        'calendar_day': {'extends': 'data'},
+        'calendar_worked': {'extends': 'status_a_pagar'},
+        'calendar_paid': {'extends': 'status_pago'}
+    }
+}
+
+# Regras de cor por status: (critério, valor, estilo) - o primeiro estilo vale para "Pago",
+# o segundo para qualquer outro status
+STATUS_RULES = {
+    'completo': (('==', '"Pago"', 'pago'), ('!=', '"Pago"', 'a_pagar')),
+    'simplificado': (('==', '"Pago"', 'status_pago'), ('!=', '"Pago"', 'status_a_pagar'))
+}
+
+
+@lru_cache(maxsize=None)
+def resolve_style(style_set: str, name: str) -> Dict[str, Any]:
+    """Propriedades finais de um estilo (herança resolvida e memorizada por processo)"""
+    styles = STYLE_SETS[style_set]
+    if name not in styles:
+        raise KeyError(f"Estilo desconhecido em '{style_set}': {name}")
+
+    spec = dict(styles[name])
+    parent = spec.pop('extends', None)
+    if parent is None:
+        return spec
+    return {**resolve_style(style_set, parent), **spec}
+
+
+class StyleRegistry(Mapping):
+    """
+    Formatos de um workbook por nome semântico
+
+    Cada Format é criado na primeira vez que é pedido, de modo que o arquivo
+    só contém os estilos realmente usados.
+    """
+
+    def __init__(self, workbook, style_set: str):
+        if style_set not in STYLE_SETS:
+            raise KeyError(f"Conjunto de estilos desconhecido: {style_set}")
+        self._workbook = workbook
+        self.style_set = style_set
+        self._formats = {}
+        self._conditional = {}
+
+    def __getitem__(self, name: str):
+        fmt = self._formats.get(name)
+        if fmt is None:
+            fmt = self._workbook.add_format(resolve_style(self.style_set, name))
+            self._formats[name] = fmt
+        return fmt
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(STYLE_SETS[self.style_set])
+
+    def __len__(self) -> int:
+        return len(STYLE_SETS[self.style_set])
+
+    def conditional(self, name: str):
+        """Formato diferencial (dxf) para formatação condicional: cores, fonte e borda do estilo"""
+        fmt = self._conditional.get(name)
+        if fmt is None:
+            fmt = self._workbook.add_format(resolve_style(self.style_set, name))
+            self._conditional[name] = fmt
+        return fmt
+
+    def apply_status_rules(self, worksheet, first_row: int, first_col: int,
+                           last_row: int, last_col: int):
+        """Colore um intervalo de status ("Pago" / demais) com formatação condicional"""
+        if last_row < first_row:
+            return
+        for criteria, value, name in STATUS_RULES[self.style_set]:
+            worksheet.conditional_format(first_row, first_col, last_row, last_col, {
+                'type': 'cell',
+                'criteria': criteria,
+                'value': value,
+                'format': self.conditional(name)
+            })
+
+    def used(self) -> Tuple[str, ...]:
+        """Estilos já convertidos em Format neste workbook"""
+        return tuple(self._formats)
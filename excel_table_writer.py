@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gravação em Lote de Tabelas no Excel
+Escritor comum às planilhas de diárias: recebe um DataFrame (ou blocos de
+DataFrames, ou tuplas/dicionários) e uma especificação de colunas, converte
+cada coluna uma única vez de forma vetorizada e grava as linhas com os
+métodos tipados do xlsxwriter e formatos pré-resolvidos
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+from diarias_metrics import METRICS
+
+# Época das datas seriais do Excel (sistema 1900 e sistema 1904)
+EXCEL_EPOCH = np.datetime64('1899-12-30', 'D')
+EXCEL_EPOCH_1904 = np.datetime64('1904-01-01', 'D')
+
+DEFAULT_CHUNKSIZE = 10000
+
+
+class Column:
+    """Especificação de uma coluna da tabela"""
+
+    KINDS = ('string', 'number', 'date')
+
+    def __init__(self, key, kind: str = 'string', fmt=None,
+                 value_formats: Optional[Dict[Any, Any]] = None):
+        """
+        Args:
+            key: Nome da coluna no DataFrame (ou chave/posição do registro)
+            kind: 'string', 'number' ou 'date'
+            fmt: Formato da coluna (também o padrão de value_formats)
+            value_formats: Formato por valor da célula, ex.: {'Pago': formato_pago}
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Tipo de coluna inválido: {kind}")
+        self.key = key
+        self.kind = kind
+        self.fmt = fmt
+        self.value_formats = value_formats
+
+
+def excel_serial_dates(values, date_1904: bool = False) -> np.ndarray:
+    """Converte datas (texto ou datetime64) em números seriais do Excel, de uma vez"""
+    dates = values if pd.api.types.is_datetime64_any_dtype(values) else pd.to_datetime(values)
+    epoch = EXCEL_EPOCH_1904 if date_1904 else EXCEL_EPOCH
+    return (np.asarray(dates, dtype='datetime64[ns]') - epoch) / np.timedelta64(1, 'D')
+
+
+def iter_frames(data, columns: List[Column], chunksize: int = DEFAULT_CHUNKSIZE) -> Iterable[pd.DataFrame]:
+    """Normaliza a entrada em uma sequência de DataFrames"""
+    if isinstance(data, pd.DataFrame):
+        yield data
+        return
+
+    iterator = iter(data)
+    first = next(iterator, None)
+    if first is None:
+        return
+
+    if isinstance(first, pd.DataFrame):
+        yield first
+        yield from iterator
+        return
+
+    # Registros (tuplas na ordem das colunas ou dicionários): agrupar em blocos
+    names = [column.key for column in columns]
+    iterator = itertools.chain([first], iterator)
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not chunk:
+            return
+        if isinstance(chunk[0], dict):
+            yield pd.DataFrame.from_records(chunk)
+        else:
+            yield pd.DataFrame.from_records(chunk, columns=names)
+
+
+def _prepare_column(worksheet, series: pd.Series, column: Column):
+    """Converte a coluna e escolhe o método de gravação"""
+    if column.kind == 'date':
+        values = excel_serial_dates(series, getattr(worksheet, 'date_1904', False))
+        method = worksheet.write_number
+    elif column.kind == 'number':
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+        method = worksheet.write_number
+    else:
+        values = series.astype(object).where(series.notna(), '').astype(str).to_numpy()
+        method = worksheet.write_string
+
+    if column.kind != 'string':
+        missing = np.isnan(values)
+        values = values.tolist()
+        if missing.any():
+            for i in np.flatnonzero(missing):
+                values[i] = None
+    else:
+        values = values.tolist()
+
+    if column.value_formats:
+        formats = series.astype(object).map(column.value_formats)
+        formats = formats.where(formats.notna(), column.fmt).tolist()
+    else:
+        formats = None
+
+    return method, values, formats
+
+
+def write_table(worksheet, first_row: int, data, columns: List[Column],
+                first_col: int = 0, chunksize: int = DEFAULT_CHUNKSIZE) -> int:
+    """
+    Grava uma tabela linha a linha (compatível com constant_memory)
+
+    Args:
+        worksheet: Aba do xlsxwriter
+        first_row: Linha (0-based) da primeira linha de dados
+        data: DataFrame, iterável de DataFrames ou iterável de tuplas/dicionários
+        columns: Especificação das colunas, na ordem de gravação
+        first_col: Coluna (0-based) da primeira coluna
+        chunksize: Registros por bloco quando data é um iterável de registros
+
+    Returns:
+        Número de linhas gravadas
+    """
+    row = first_row
+    for frame in iter_frames(data, columns, chunksize):
+        n = len(frame)
+        if n == 0:
+            continue
+
+        specs = []
+        for offset, column in enumerate(columns):
+            method, values, formats = _prepare_column(worksheet, frame[column.key], column)
+            specs.append((first_col + offset, method, values, formats, column.fmt))
+
+        blank = worksheet.write_blank
+        for i in range(n):
+            for col, method, values, formats, fmt in specs:
+                value = values[i]
+                cell_format = formats[i] if formats is not None else fmt
+                if value is None:
+                    blank(row, col, None, cell_format)
+                else:
+                    method(row, col, value, cell_format)
+            row += 1
+
+    METRICS.inc('excel_rows_written_total', row - first_row)
+    return row - first_row
@@ -6,136 +6,154 @@ Gera planilha Excel completa com dados, gráficos e formatação profissional
 """
 
 import pandas as pd
+import argparse
+import contextlib
+import io
 import json
+import multiprocessing
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from operator import itemgetter
 import xlsxwriter
 from xlsxwriter.utility import xl_rowcol_to_cell
+from excel_table_writer import Column, write_table
+from diarias_loaders import build_credit_data, find_default_source, load_diarias, records_from_state
+from diarias_aggregations import compute_aggregates, frame_from_records
+from excel_styles import StyleRegistry
 
 class ExcelGenerator:
-    def __init__(self):
+    # Agregações usadas pelas abas (calculadas em paralelo por compute_aggregates)
+    SHEET_AGGREGATIONS = ['kpis', 'monthly_totals', 'status_totals']
+    
+    def __init__(self, constant_memory=False, parallel=None):
+        """
+        Args:
+            constant_memory: Modo streaming do xlsxwriter - cada linha é gravada em
+                disco quando a próxima começa, mantendo a memória limitada
+            parallel: Calcula as agregações das abas em processos separados
+                (None: automático a partir de PARALLEL_MIN_ROWS registros)
+        """
         self.workbook = None
+        self.constant_memory = constant_memory
+        self.parallel = parallel
         self.data = []
         self.credit_data = {}
+        self.aggregates = None
+        
+    def iter_records(self):
+        """Itera os registros de diárias na ordem de gravação"""
+        return iter(self.data)
+    
+    def load_data_from_js(self, source=None, fmt=None):
+        """
+        Carrega dados do sistema (JSON do DiariasSystem, CSVs ou exportação do localStorage)
         
-    def load_data_from_js(self):
-        """Carrega dados do sistema JavaScript"""
+        Args:
+            source: Arquivo de origem (padrão: primeira fonte padrão encontrada;
+                sem nenhuma, usa os dados de exemplo)
+            fmt: Formato ('json', 'csv', 'localstorage'); detectado se omitido
+        """
         try:
-            # Dados de exemplo (em produção, viria do localStorage ou API)
-            self.data = [
-                {
-                    "data": "2025-01-02",
-                    "diaSemana": "Quinta-feira",
-                    "mes": "Janeiro",
-                    "ano": 2025,
-                    "valorUSD": 250,
-                    "statusPagamento": "A Pagar",
-                    "localProjeto": "Projeto Alpha"
-                },
-                {
-                    "data": "2025-01-03",
-                    "diaSemana": "Sexta-feira",
-                    "mes": "Janeiro",
-                    "ano": 2025,
-                    "valorUSD": 250,
-                    "statusPagamento": "Pago",
-                    "localProjeto": "Projeto Alpha"
-                },
-                {
-                    "data": "2025-01-08",
-                    "diaSemana": "Quarta-feira",
-                    "mes": "Janeiro",
-                    "ano": 2025,
-                    "valorUSD": 250,
-                    "statusPagamento": "A Pagar",
-                    "localProjeto": "Projeto Beta"
-                }
-            ]
-            
-            self.credit_data = {
-                "deposits": [
-                    {
-                        "id": 1,
-                        "date": "2025-01-01",
-                        "amount": 5000,
-                        "description": "Pagamento antecipado Janeiro"
-                    }
-                ],
-                "totalDeposited": 5000,
-                "totalUsed": 750,
-                "currentBalance": 4250
-            }
-            
-            print("✅ Dados carregados com sucesso!")
+            self.aggregates = None
+            source = source or find_default_source()
+            if source is None:
+                self.load_sample_data()
+                print("⚠️ Nenhuma fonte de dados encontrada - usando dados de exemplo")
+                return True
+            
+            # Leitura em streaming com validação de esquema
+            self.data, self.credit_data = load_diarias(source, fmt)
+            self.data.sort(key=itemgetter('data'))
+            
+            print(f"✅ Dados carregados com sucesso! ({len(self.data)} registros de {source})")
             return True
             
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {e}")
             return False
     
+    def load_data_from_state(self, state):
+        """
+        Carrega dados de um estado em memória no formato de diarias_data.json
+        (ex.: DiariasSystem.get_state()), sem passar por arquivo
+        """
+        self.aggregates = None
+        self.data, self.credit_data = records_from_state(state)
+        self.data.sort(key=itemgetter('data'))
+        return True
+    
+    def compute_aggregates(self):
+        """Calcula as agregações de todas as abas antes da montagem serial do workbook"""
+        df = frame_from_records(self.data)
+        self.aggregates = compute_aggregates(df, self.SHEET_AGGREGATIONS, parallel=self.parallel)
+        return self.aggregates
+    
+    def load_sample_data(self):
+        """Dados de exemplo (os mesmos do data.js)"""
+        self.data = [
+            {
+                "data": "2025-01-02",
+                "diaSemana": "Quinta-feira",
+                "mes": "Janeiro",
+                "ano": 2025,
+                "valorUSD": 250,
+                "statusPagamento": "A Pagar",
+                "localProjeto": "Projeto Alpha"
+            },
+            {
+                "data": "2025-01-03",
+                "diaSemana": "Sexta-feira",
+                "mes": "Janeiro",
+                "ano": 2025,
+                "valorUSD": 250,
+                "statusPagamento": "Pago",
+                "localProjeto": "Projeto Alpha"
+            },
+            {
+                "data": "2025-01-08",
+                "diaSemana": "Quarta-feira",
+                "mes": "Janeiro",
+                "ano": 2025,
+                "valorUSD": 250,
+                "statusPagamento": "A Pagar",
+                "localProjeto": "Projeto Beta"
+            }
+        ]
+        
+        self.credit_data = {
+            "deposits": [
+                {
+                    "id": 1,
+                    "date": "2025-01-01",
+                    "amount": 5000,
+                    "description": "Pagamento antecipado Janeiro"
+                }
+            ],
+            "totalDeposited": 5000,
+            "totalUsed": 750,
+            "currentBalance": 4250
+        }
+    
     def create_workbook(self, filename="Controle_Diarias_Completo.xlsx"):
-        """Cria o arquivo Excel com múltiplas abas"""
+        """
+        Cria o arquivo Excel com múltiplas abas
+        
+        filename também pode ser um arquivo binário em memória (ex.: io.BytesIO):
+        nesse caso o xlsxwriter monta tudo em memória (in_memory), sem arquivos
+        temporários em disco, e constant_memory é ignorado.
+        """
         try:
-            self.workbook = xlsxwriter.Workbook(filename)
-            
-            # Definir formatos
-            self.formats = {
-                'header': self.workbook.add_format({
-                    'bold': True,
-                    'font_size': 12,
-                    'bg_color': '#4299e1',
-                    'font_color': 'white',
-                    'align': 'center',
-                    'valign': 'vcenter',
-                    'border': 1
-                }),
-                'title': self.workbook.add_format({
-                    'bold': True,
-                    'font_size': 16,
-                    'font_color': '#2d3748',
-                    'align': 'center'
-                }),
-                'subtitle': self.workbook.add_format({
-                    'font_size': 12,
-                    'font_color': '#4a5568',
-                    'align': 'center'
-                }),
-                'currency': self.workbook.add_format({
-                    'num_format': '$#,##0',
-                    'align': 'right'
-                }),
-                'date': self.workbook.add_format({
-                    'num_format': 'dd/mm/yyyy',
-                    'align': 'center'
-                }),
-                'center': self.workbook.add_format({
-                    'align': 'center',
-                    'valign': 'vcenter'
-                }),
-                'pago': self.workbook.add_format({
-                    'bg_color': '#c6f6d5',
-                    'font_color': '#22543d',
-                    'align': 'center',
-                    'bold': True
-                }),
-                'a_pagar': self.workbook.add_format({
-                    'bg_color': '#fed7aa',
-                    'font_color': '#9c4221',
-                    'align': 'center',
-                    'bold': True
-                }),
-                'kpi_value': self.workbook.add_format({
-                    'bold': True,
-                    'font_size': 14,
-                    'font_color': '#2d3748',
-                    'align': 'center'
-                }),
-                'kpi_label': self.workbook.add_format({
-                    'font_size': 10,
-                    'font_color': '#4a5568',
-                    'align': 'center'
-                })
-            }
+            if isinstance(filename, (str, os.PathLike)):
+                options = {'constant_memory': self.constant_memory}
+            else:
+                options = {'in_memory': True}
+            self.workbook = xlsxwriter.Workbook(filename, options)
+            
+            # Formatos por nome semântico (ver excel_styles.STYLE_SETS), criados sob demanda
+            self.formats = StyleRegistry(self.workbook, 'completo')
             
             print("✅ Workbook criado com sucesso!")
             return True
@@ -158,25 +176,20 @@ class ExcelGenerator:
             worksheet.merge_range('A1:G1', '💰 DASHBOARD - CONTROLE DE DIÁRIAS', self.formats['title'])
             worksheet.merge_range('A2:G2', f'Relatório gerado em {datetime.now().strftime("%d/%m/%Y às %H:%M")}', self.formats['subtitle'])
             
-            # Calcular KPIs
-            total_dias = len(self.data)
-            total_valor = total_dias * 250
-            dias_pagos = len([d for d in self.data if d['statusPagamento'] == 'Pago'])
-            valor_pago = dias_pagos * 250
-            dias_a_pagar = total_dias - dias_pagos
-            valor_a_pagar = dias_a_pagar * 250
-            percentual_pago = (dias_pagos / total_dias * 100) if total_dias > 0 else 0
+            # KPIs calculados
+            aggregates = self.aggregates or self.compute_aggregates()
+            k = aggregates['kpis']
             
             # KPIs principais
             row = 4
             kpis = [
-                ('Total de Dias', total_dias, ''),
-                ('Valor Total', total_valor, '$'),
-                ('Dias Pagos', dias_pagos, ''),
-                ('Valor Pago', valor_pago, '$'),
-                ('Dias A Pagar', dias_a_pagar, ''),
-                ('Valor A Pagar', valor_a_pagar, '$'),
-                ('% Pago', f'{percentual_pago:.1f}%', '')
+                ('Total de Dias', k['total_dias'], ''),
+                ('Valor Total', k['total_valor'], '$'),
+                ('Dias Pagos', k['dias_pagos'], ''),
+                ('Valor Pago', k['valor_pago'], '$'),
+                ('Dias A Pagar', k['total_dias'] - k['dias_pagos'], ''),
+                ('Valor A Pagar', (k['total_dias'] - k['dias_pagos']) * 250, '$'),
+                ('% Pago', f"{k['percentual_pago']:.1f}%", '')
             ]
             
             # Cabeçalho dos KPIs
@@ -220,19 +233,11 @@ class ExcelGenerator:
             worksheet.write(row, 6, 'VALOR', self.formats['header'])
             row += 1
             
-            # Agrupar por mês
-            monthly_data = {}
-            for item in self.data:
-                month = item['mes']
-                if month not in monthly_data:
-                    monthly_data[month] = {'dias': 0, 'valor': 0}
-                monthly_data[month]['dias'] += 1
-                monthly_data[month]['valor'] += item['valorUSD']
-            
-            for month, data in monthly_data.items():
+            # Totais por mês
+            for month, dias, valor in aggregates['monthly_totals']:
                 worksheet.write(row, 4, month, self.formats['center'])
-                worksheet.write(row, 5, data['dias'], self.formats['center'])
-                worksheet.write(row, 6, data['valor'], self.formats['currency'])
+                worksheet.write(row, 5, dias, self.formats['center'])
+                worksheet.write(row, 6, valor, self.formats['currency'])
                 row += 1
             
             print("✅ Aba Dashboard criada!")
@@ -242,8 +247,14 @@ class ExcelGenerator:
             print(f"❌ Erro ao criar aba Dashboard: {e}")
             return False
     
-    def create_data_sheet(self):
-        """Cria aba com dados detalhados"""
+    def create_data_sheet(self, records=None):
+        """
+        Cria aba com dados detalhados
+        
+        Args:
+            records: Iterável de registros (padrão: iter_records()); consumido uma
+                única vez, em ordem, o que permite gravar em modo streaming
+        """
         try:
             worksheet = self.workbook.add_worksheet('Dados Detalhados')
             
@@ -264,25 +275,23 @@ class ExcelGenerator:
             for col, header in enumerate(headers):
                 worksheet.write(2, col, header, self.formats['header'])
             
-            # Dados
-            for row, item in enumerate(self.data, start=3):
-                # Converter data para formato Excel
-                date_obj = datetime.strptime(item['data'], '%Y-%m-%d')
-                
-                worksheet.write_datetime(row, 0, date_obj, self.formats['date'])
-                worksheet.write(row, 1, item['diaSemana'], self.formats['center'])
-                worksheet.write(row, 2, item['mes'], self.formats['center'])
-                worksheet.write(row, 3, item['ano'], self.formats['center'])
-                worksheet.write(row, 4, item['valorUSD'], self.formats['currency'])
-                
-                # Status com formatação condicional
-                status_format = self.formats['pago'] if item['statusPagamento'] == 'Pago' else self.formats['a_pagar']
-                worksheet.write(row, 5, item['statusPagamento'], status_format)
-                
-                worksheet.write(row, 6, item['localProjeto'], self.formats['center'])
+            # Dados: datas convertidas em bloco e gravação com métodos tipados
+            columns = [
+                Column('data', 'date', self.formats['date']),
+                Column('diaSemana', 'string', self.formats['center']),
+                Column('mes', 'string', self.formats['center']),
+                Column('ano', 'number', self.formats['center']),
+                Column('valorUSD', 'number', self.formats['currency']),
+                Column('statusPagamento', 'string', self.formats['status']),
+                Column('localProjeto', 'string', self.formats['center'])
+            ]
+            written = write_table(worksheet, 3, self.iter_records() if records is None else records, columns)
+            
+            # Cores do status por formatação condicional sobre a coluna inteira
+            self.formats.apply_status_rules(worksheet, 3, 5, written + 2, 5)
             
             # Adicionar totais
-            last_row = len(self.data) + 3
+            last_row = written + 3
             worksheet.write(last_row, 3, 'TOTAL:', self.formats['header'])
             worksheet.write_formula(last_row, 4, f'=SUM(E4:E{last_row-1})', self.formats['currency'])
             
@@ -368,13 +377,7 @@ class ExcelGenerator:
             worksheet.merge_range('A1:H1', '📊 GRÁFICOS E ANÁLISES', self.formats['title'])
             
             # Preparar dados para gráficos
-            # Gráfico de status (Pizza)
-            status_data = {}
-            for item in self.data:
-                status = item['statusPagamento']
-                if status not in status_data:
-                    status_data[status] = 0
-                status_data[status] += item['valorUSD']
+            aggregates = self.aggregates or self.compute_aggregates()
             
             # Criar gráfico de pizza
             chart_pie = self.workbook.add_chart({'type': 'pie'})
@@ -386,7 +389,7 @@ class ExcelGenerator:
             row += 1
             
             start_row = row
-            for status, valor in status_data.items():
+            for status, valor in aggregates['status_totals']:
                 worksheet.write(row, 0, status)
                 worksheet.write(row, 1, valor)
                 row += 1
@@ -406,13 +409,6 @@ class ExcelGenerator:
             worksheet.insert_chart('D3', chart_pie, {'x_scale': 1.2, 'y_scale': 1.2})
             
             # Gráfico mensal (Coluna)
-            monthly_data = {}
-            for item in self.data:
-                month = item['mes']
-                if month not in monthly_data:
-                    monthly_data[month] = 0
-                monthly_data[month] += item['valorUSD']
-            
             # Dados para gráfico mensal
             row += 3
             worksheet.write(row, 0, 'Mês', self.formats['header'])
@@ -420,7 +416,7 @@ class ExcelGenerator:
             row += 1
             
             start_row_monthly = row
-            for month, valor in monthly_data.items():
+            for month, dias, valor in aggregates['monthly_totals']:
                 worksheet.write(row, 0, month)
                 worksheet.write(row, 1, valor)
                 row += 1
@@ -450,45 +446,257 @@ class ExcelGenerator:
             print(f"❌ Erro ao criar aba Gráficos: {e}")
             return False
     
-    def generate_excel(self, filename="Controle_Diarias_Completo.xlsx"):
-        """Gera o arquivo Excel completo"""
+    def generate_excel(self, filename="Controle_Diarias_Completo.xlsx", source=None, fmt=None):
+        """Gera o arquivo Excel completo (source/fmt: ver load_data_from_js)"""
         try:
             print("🚀 Iniciando geração do Excel...")
             
             # Carregar dados
-            if not self.load_data_from_js():
+            if not self.load_data_from_js(source, fmt):
                 return False
             
+            return self.write_workbook(filename)
+            
+        except Exception as e:
+            print(f"❌ Erro ao gerar Excel: {e}")
+            return False
+    
+    def write_workbook(self, filename):
+        """
+        Gera o arquivo Excel a partir dos dados já carregados (self.data / self.credit_data)
+        
+        filename: caminho ou arquivo binário em memória (ver create_workbook)
+        """
+        try:
+            # Agregações das abas (em paralelo para volumes grandes)
+            self.compute_aggregates()
+            
             # Criar workbook
             if not self.create_workbook(filename):
                 return False
             
             # Criar abas
-            self.create_dashboard_sheet()
-            self.create_data_sheet()
-            self.create_credits_sheet()
-            self.create_charts_sheet()
+            sheets = [self.create_dashboard_sheet(), self.create_data_sheet(),
+                      self.create_credits_sheet(), self.create_charts_sheet()]
             
             # Fechar workbook
             self.workbook.close()
             
-            print(f"✅ Arquivo Excel gerado com sucesso: {filename}")
-            print(f"📁 Localização: {os.path.abspath(filename)}")
+            if not all(sheets):
+                print(f"❌ Arquivo gerado com abas incompletas: {filename}")
+                return False
+            
+            if isinstance(filename, (str, os.PathLike)):
+                print(f"✅ Arquivo Excel gerado com sucesso: {filename}")
+                print(f"📁 Localização: {os.path.abspath(filename)}")
             return True
             
         except Exception as e:
             print(f"❌ Erro ao gerar Excel: {e}")
             return False
+    
+    def workbook_bytes(self):
+        """Conteúdo .xlsx gerado inteiramente em memória a partir dos dados já carregados (None em caso de erro)"""
+        buffer = io.BytesIO()
+        if not self.write_workbook(buffer):
+            return None
+        return buffer.getvalue()
+
+# === MODO LOTE ===
 
-def main():
-    """Função principal"""
+# Partições compartilhadas com os processos do pool (herdadas via fork)
+_BATCH_PARTITIONS = {}
+
+def load_manifest(path):
+    """
+    Lê o manifesto do modo lote (JSON)
+    
+    Formato:
+        {
+            "output_dir": "relatorios",          (opcional)
+            "max_workers": 4,                    (opcional: workbooks abertos ao mesmo tempo)
+            "jobs": [
+                {"source": "diarias_data.csv", "output": "Controle_{value}.xlsx",
+                 "partition_by": "localProjeto"},
+                {"source": "diarias_data.json", "output": "Controle_Geral.xlsx"}
+            ]
+        }
+    
+    partition_by aceita qualquer campo dos registros (ex.: localProjeto);
+    output aceita os campos {value} (valor da partição) e {timestamp}.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    
+    jobs = manifest.get('jobs')
+    if not isinstance(jobs, list) or not jobs:
+        raise ValueError("Manifesto sem lista 'jobs'")
+    for index, job in enumerate(jobs, start=1):
+        if not isinstance(job, dict) or 'source' not in job or 'output' not in job:
+            raise ValueError(f"Job {index} do manifesto precisa de 'source' e 'output'")
+    
+    # Fontes relativas ao diretório do manifesto
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for job in jobs:
+        job['source'] = os.path.join(base_dir, job['source'])
+    if manifest.get('output_dir'):
+        manifest['output_dir'] = os.path.join(base_dir, manifest['output_dir'])
+    return manifest
+
+def partition_records(records, field):
+    """Divide os registros pelo valor de um campo, em uma única passada"""
+    partitions = {}
+    for record in records:
+        partitions.setdefault(record.get(field), []).append(record)
+    return partitions
+
+def _safe_filename(value):
+    return ''.join(c if c.isalnum() or c in ' -_.' else '_' for c in str(value)).strip() or 'vazio'
+
+def _plan_batch(manifest):
+    """Carrega cada fonte uma vez, particiona e monta a lista de workbooks (e as falhas de carga)"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_dir = manifest.get('output_dir') or '.'
+    os.makedirs(output_dir, exist_ok=True)
+    
+    loaded = {}
+    tasks = []
+    failures = []
+    for job in manifest['jobs']:
+        key = (job['source'], job.get('format'))
+        if key not in loaded:
+            try:
+                records, credit_data = load_diarias(job['source'], job.get('format'))
+                records.sort(key=itemgetter('data'))
+                loaded[key] = (records, credit_data)
+            except Exception as e:
+                loaded[key] = e
+        if isinstance(loaded[key], Exception):
+            failures.append((job['output'], f"falha ao carregar {job['source']}: {loaded[key]}"))
+            continue
+        records, credit_data = loaded[key]
+        
+        field = job.get('partition_by')
+        groups = partition_records(records, field) if field else {None: records}
+        for value, group in groups.items():
+            if field:
+                # Depósitos não pertencem a uma partição: créditos calculados só com os dias do grupo
+                group_credit = build_credit_data([], sum(record['valorUSD'] for record in group))
+            else:
+                group_credit = credit_data
+            output = job['output'].format(value=_safe_filename(value), timestamp=timestamp)
+            task_id = len(tasks)
+            _BATCH_PARTITIONS[task_id] = (group, group_credit)
+            tasks.append((task_id, os.path.join(output_dir, output)))
+    return tasks, failures
+
+def _write_batch_workbook(task_id, filename, payload=None):
+    """Executado no processo trabalhador: gera um workbook e devolve (arquivo, linhas, tempo, erro)"""
+    started = time.perf_counter()
+    records, credit_data = payload if payload is not None else _BATCH_PARTITIONS[task_id]
+    
+    generator = ExcelGenerator(parallel=False)
+    generator.data, generator.credit_data = records, credit_data
+    
+    # Mensagens de cada workbook ficam fora da saída do lote
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            ok = generator.write_workbook(filename)
+        error = None if ok else (log.getvalue().strip().splitlines() or ['erro desconhecido'])[-1]
+    except Exception as e:
+        error = str(e)
+    return filename, len(records), time.perf_counter() - started, error
+
+def run_batch(manifest_path, max_workers=None):
+    """
+    Gera vários workbooks a partir de um manifesto
+    
+    As fontes são carregadas e particionadas uma vez no processo principal;
+    a escrita dos workbooks é distribuída em um pool de processos, com no
+    máximo max_workers workbooks abertos ao mesmo tempo.
+    
+    Returns:
+        Resumo com contagens, tempos, vazão e falhas
+    """
+    started = time.perf_counter()
+    manifest = load_manifest(manifest_path)
+    _BATCH_PARTITIONS.clear()
+    tasks, load_failures = _plan_batch(manifest)
+    planned = time.perf_counter()
+    
+    workers = max_workers or manifest.get('max_workers') or os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks) or 1))
+    
+    # Com fork os trabalhadores herdam as partições; sem fork elas seguem junto com a tarefa
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    inherit = context.get_start_method() == 'fork'
+    
+    results = [(output, 0, 0.0, error) for output, error in load_failures]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [
+            pool.submit(_write_batch_workbook, task_id, filename,
+                        None if inherit else _BATCH_PARTITIONS[task_id])
+            for task_id, filename in tasks
+        ]
+        for future, (task_id, filename) in zip(futures, tasks):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append((filename, 0, 0.0, f"processo falhou: {e}"))
+    _BATCH_PARTITIONS.clear()
+    
+    elapsed = time.perf_counter() - started
+    failures = [(filename, error) for filename, _, _, error in results if error]
+    rows = sum(count for _, count, _, error in results if not error)
+    return {
+        'workbooks': len(results),
+        'succeeded': len(results) - len(failures),
+        'failed': len(failures),
+        'failures': failures,
+        'rows': rows,
+        'workers': workers,
+        'load_seconds': planned - started,
+        'elapsed_seconds': elapsed,
+        'workbooks_per_second': len(results) / elapsed if elapsed else 0.0,
+        'rows_per_second': rows / elapsed if elapsed else 0.0
+    }
+
+def print_batch_summary(summary):
+    """Resumo de vazão e falhas do modo lote"""
+    print(f"\n📦 LOTE CONCLUÍDO: {summary['succeeded']}/{summary['workbooks']} workbooks "
+          f"({summary['workers']} processos)")
+    print(f"  • Linhas gravadas: {summary['rows']:,}")
+    print(f"  • Carga e particionamento: {summary['load_seconds']:.2f}s")
+    print(f"  • Tempo total: {summary['elapsed_seconds']:.2f}s")
+    print(f"  • Vazão: {summary['workbooks_per_second']:.1f} workbooks/s, "
+          f"{summary['rows_per_second']:,.0f} linhas/s")
+    if summary['failures']:
+        print(f"❌ Falhas ({summary['failed']}):")
+        for filename, error in summary['failures']:
+            print(f"  • {filename}: {error}")
+
+def main(argv=None):
+    """Função principal (--manifest ativa o modo lote)"""
+    parser = argparse.ArgumentParser(description='Gera a planilha de controle de diárias')
+    parser.add_argument('--source', help='Fonte de dados (JSON, CSV ou exportação do localStorage)')
+    parser.add_argument('--manifest', help='Manifesto JSON do modo lote')
+    parser.add_argument('--workers', type=int, help='Workbooks gerados ao mesmo tempo no modo lote')
+    args = parser.parse_args(argv)
+    
+    if args.manifest:
+        summary = run_batch(args.manifest, args.workers)
+        print_batch_summary(summary)
+        return summary['failed'] == 0
+    
     generator = ExcelGenerator()
     
     # Gerar arquivo com timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"Controle_Diarias_{timestamp}.xlsx"
     
-    success = generator.generate_excel(filename)
+    success = generator.generate_excel(filename, source=args.source)
     
     if success:
         print("\n🎉 EXCEL GERADO COM SUCESSO!")
@@ -500,6 +708,7 @@ def main():
         print("  • Formatação profissional")
     else:
         print("\n❌ ERRO NA GERAÇÃO DO EXCEL")
+    return success
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(0 if main() else 1)
\ No newline at end of file
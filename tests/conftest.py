@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Configuração dos testes: raiz do repositório no path e stubs dos módulos
+externos (excel_sync_framework, excel_templates) quando não instalados
+"""
+
+import os
+import sys
+
+import pytest
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+if BENCHMARKS not in sys.path:
+    sys.path.insert(0, BENCHMARKS)
+
+import _stubs  # noqa: E402 (coloca a raiz do repositório no path)
+
+_stubs.install()
+
+
+@pytest.fixture
+def make_system(tmp_path, monkeypatch):
+    """Fábrica de DiariasSystem em um diretório temporário (fechados ao final do teste)"""
+    from diarias_sync_system import DiariasSystem
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'excel_report').mkdir(exist_ok=True)
+    systems = []
+
+    def factory(storage='json', **kwargs):
+        kwargs.setdefault('auto_start_web', False)
+        kwargs.setdefault('auto_sync_interval', 120)
+        kwargs.setdefault('sync_debounce', 60)
+        system = DiariasSystem(storage=storage, **kwargs)
+        systems.append(system)
+        # Os testes chamam _sync_from_web_data diretamente
+        system.watcher.stop()
+        return system
+
+    yield factory
+    for system in systems:
+        system.close()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Journal de eventos: replay, compactação e fsync"""
+
+import json
+import time
+
+from diarias_journal import (
+    EventJournal, DAY_ADDED, DAY_STATUS_CHANGED, DEPOSIT_ADDED, DEPOSIT_REMOVED, DEPOSIT_UPDATED
+)
+
+DAY = {'status': 'pending', 'notes': ''}
+
+
+def _journal(tmp_path, **kwargs):
+    return EventJournal(tmp_path / 'diarias_data.json', **kwargs)
+
+
+def test_replay_after_restart(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append({'type': DAY_ADDED, 'date': '2025-01-02', 'day': dict(DAY)})
+    journal.append_many([
+        {'type': DAY_STATUS_CHANGED, 'date': '2025-01-02', 'status': 'paid'},
+        {'type': DEPOSIT_ADDED, 'deposit': {'amount': 100.0}},
+        {'type': DEPOSIT_ADDED, 'deposit': {'amount': 200.0}},
+        {'type': DEPOSIT_UPDATED, 'index': 1, 'deposit': {'amount': 250.0}},
+        {'type': DEPOSIT_REMOVED, 'index': 0, 'creditBalance': 250.0},
+    ])
+    journal.close()
+
+    restarted = _journal(tmp_path)
+    state = restarted.load()
+    assert state['workingDays'] == {'2025-01-02': {'status': 'paid', 'notes': ''}}
+    assert state['deposits'] == [{'amount': 250.0}]
+    assert state['creditBalance'] == 250.0
+    assert (restarted.seq, restarted.pending_events) == (6, 6)
+
+
+def test_compaction_writes_snapshot_and_truncates(tmp_path):
+    journal = _journal(tmp_path, compact_every=2)
+    journal.append({'type': DAY_ADDED, 'date': '2025-01-02', 'day': dict(DAY)})
+    assert not journal.needs_compaction()
+    journal.append({'type': DAY_ADDED, 'date': '2025-01-03', 'day': dict(DAY)})
+    assert journal.needs_compaction()
+
+    state = _journal(tmp_path).load()
+    journal.compact(state)
+    content = (tmp_path / 'diarias_data.json').read_bytes()
+    assert json.loads(content)['journalSeq'] == 2
+    assert journal.is_own_snapshot(content)
+    assert journal.pending_events == 0
+    assert journal.events_since(0) is None
+    assert journal.events_since(2) == []
+
+    journal.append({'type': DAY_ADDED, 'date': '2025-01-06', 'day': dict(DAY)})
+    assert [event['seq'] for event in journal.events_since(2)] == [3]
+    journal.close()
+
+    restarted = _journal(tmp_path)
+    assert sorted(restarted.load()['workingDays']) == ['2025-01-02', '2025-01-03', '2025-01-06']
+    assert (restarted.seq, restarted.snapshot_seq, restarted.pending_events) == (3, 2, 1)
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append({'type': DAY_ADDED, 'date': '2025-01-02', 'day': dict(DAY)})
+    journal.close()
+    with open(journal.journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"type": "day_added", "date": "2025-01')
+
+    assert list(_journal(tmp_path).load()['workingDays']) == ['2025-01-02']
+
+
+def test_web_events_not_replayed_over_web_document(tmp_path):
+    journal = _journal(tmp_path)
+    journal.compact({'workingDays': {}, 'deposits': [], 'creditBalance': 0.0})
+    # A web regrava o documento com o depósito; o sistema registra o evento correspondente
+    web_document = {'workingDays': {}, 'deposits': [{'amount': 50.0}], 'creditBalance': 50.0, 'journalSeq': 0}
+    (tmp_path / 'diarias_data.json').write_text(json.dumps(web_document), encoding='utf-8')
+    journal.append({'type': DEPOSIT_ADDED, 'deposit': {'amount': 50.0}, 'origin': 'web'})
+    journal.append({'type': DEPOSIT_ADDED, 'deposit': {'amount': 10.0}})
+    journal.close()
+
+    state = _journal(tmp_path).load()
+    assert state['deposits'] == [{'amount': 50.0}, {'amount': 10.0}]
+
+
+def test_last_event_of_burst_is_fsynced_within_interval(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr('diarias_journal.os.fsync', lambda fd: synced.append(time.monotonic()))
+    journal = _journal(tmp_path, fsync_batch=1000, fsync_interval=0.2)
+    journal._last_fsync = time.monotonic()
+
+    start = time.monotonic()
+    for day in range(2, 6):
+        journal.append({'type': DAY_ADDED, 'date': f'2025-01-0{day}', 'day': dict(DAY)})
+    assert journal._unsynced == 4 and not synced
+
+    deadline = time.monotonic() + 2.0
+    while journal._unsynced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert journal._unsynced == 0
+    assert synced and synced[0] - start <= 0.2 + 0.1
+    journal.close()
+
+
+def test_system_compacts_only_at_threshold(make_system):
+    system = make_system()
+    system.journal.compact_every = 3
+    system.add_working_day('2025-01-02')
+    system.add_working_day('2025-01-03')
+
+    # A sincronização do Excel não regrava o snapshot
+    system.sync_worker.flush()
+    assert system.journal.pending_events == 2
+
+    system.add_working_day('2025-01-06')
+    assert system.journal.pending_events == 0
+    assert system.journal.snapshot_seq == 3
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Atualizações em tempo real do painel (diarias_live)"""
+
+import asyncio
+
+from diarias_live import LiveUpdates, diff_view
+
+
+def test_diff_view_reports_changed_and_removed_fields():
+    old = {'kpis': {'dias': 2, 'saldo': 10.0}, 'months': {'2025-01': [2, 1], '2025-02': [1, 0]}}
+    new = {'kpis': {'dias': 3, 'saldo': 10.0}, 'months': {'2025-01': [3, 1]}}
+    assert diff_view(old, new) == {'kpis': {'dias': 3}, 'months': {'2025-01': [3, 1], '2025-02': None}}
+    assert diff_view(new, new) == {}
+
+
+def _apply(view, message):
+    for section, changes in message.items():
+        if section in ('v', 'base'):
+            continue
+        for key, value in changes.items():
+            if value is None:
+                view[section].pop(key, None)
+            else:
+                view[section][key] = value
+
+
+def test_stream_sends_snapshot_then_deltas_and_resumes(make_system):
+    system = make_system()
+
+    async def run():
+        live = LiveUpdates(system, coalesce=0.01)
+        await live.start()
+        stream = live.stream(heartbeat=1.0)
+        kind, first_id, snapshot = await stream.__anext__()
+        assert kind == 'snapshot'
+
+        await asyncio.get_running_loop().run_in_executor(None, system.add_working_day, '2025-03-03')
+        kind, delta_id, delta = await asyncio.wait_for(stream.__anext__(), 2.0)
+        assert kind == 'delta' and delta['base'] == snapshot['v']
+
+        # O painel que aplica o delta sobre o snapshot chega à visão atual
+        view = {section: dict(snapshot[section]) for section in ('kpis', 'months')}
+        _apply(view, delta)
+        assert view == {section: system.get_dashboard_view()[section] for section in ('kpis', 'months')}
+        await stream.aclose()
+
+        # Reconexão com Last-Event-ID: só os deltas posteriores
+        resumed = live.stream(last_event_id=first_id, heartbeat=1.0)
+        assert await resumed.__anext__() == ('delta', delta_id, delta)
+        await resumed.aclose()
+        # Id de outro fluxo (servidor reiniciado): novo snapshot
+        other = live.stream(last_event_id='0-1', heartbeat=1.0)
+        assert (await other.__anext__())[0] == 'snapshot'
+        await other.aclose()
+        live.close()
+
+    asyncio.run(run())
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Carregadores de dados (diarias_loaders)"""
+
+import json
+
+import pytest
+
+from diarias_loaders import DiariasLoader, SchemaError, load_diarias, records_from_state
+
+
+def _write_json(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return str(path)
+
+
+def _system_state(deposit_date):
+    return {
+        'workingDays': {'2025-01-02': {'status': 'paid', 'notes': ''}},
+        'deposits': [{'date': deposit_date, 'amount': 500.0, 'description': 'Pix'}],
+        'creditBalance': 250.0
+    }
+
+
+def test_loader_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        DiariasLoader()
+
+    class Incomplete(DiariasLoader):
+        name = 'incompleto'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_system_json_deposit_dates_are_normalized(tmp_path):
+    path = _write_json(tmp_path, 'diarias_data.json', _system_state('2025-01-10T10:30:00.000Z'))
+    records, credit = load_diarias(path)
+    assert [record['data'] for record in records] == ['2025-01-02']
+    assert credit['deposits'] == [{'id': 1, 'date': '2025-01-10', 'amount': 500.0, 'description': 'Pix'}]
+    assert credit['totalDeposited'] == 500.0
+
+
+@pytest.mark.parametrize('deposit_date', ['', '10/01/2025', '2025-13-10', None, 20250110])
+def test_invalid_deposit_dates_raise_schema_error(tmp_path, deposit_date):
+    path = _write_json(tmp_path, 'diarias_data.json', _system_state(deposit_date))
+    with pytest.raises(SchemaError, match='depósito 1: data inválida'):
+        load_diarias(path)
+    with pytest.raises(SchemaError):
+        records_from_state(_system_state(deposit_date))
+
+
+def test_local_storage_deposits_are_validated(tmp_path):
+    credit = {'deposits': [{'id': 7, 'date': '2025-02-01T08:00:00.000Z', 'amount': 100, 'description': 'A'}],
+              'totalDeposited': 100, 'totalUsed': 0, 'currentBalance': 100}
+    data = {'diarias_working_data': [], 'diarias_credit_system': json.dumps(credit)}
+    records, loaded = load_diarias(_write_json(tmp_path, 'export.json', data))
+    assert records == []
+    assert loaded['deposits'] == [{'id': 7, 'date': '2025-02-01', 'amount': 100, 'description': 'A'}]
+
+    credit['deposits'][0]['date'] = 'ontem'
+    data['diarias_credit_system'] = json.dumps(credit)
+    with pytest.raises(SchemaError):
+        load_diarias(_write_json(tmp_path, 'export.json', data))
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Relatório completo e sincronização incremental do Excel"""
+
+
+def test_report_always_exports_the_workbook(make_system, monkeypatch):
+    system = make_system()
+    system.add_working_day('2025-01-02')
+    system.sync_worker.flush()
+
+    exports = []
+    monkeypatch.setattr(system.sync_manager.manager, 'sync_to_excel', lambda: exports.append(True))
+
+    # Sem datasets alterados a sincronização incremental é pulada...
+    assert system.sync_manager.sync_to_excel() == []
+    assert exports == []
+
+    # ...mas o relatório regrava o workbook mesmo assim
+    report = system.generate_report()
+    assert exports == [True]
+    assert report
+    assert system.generate_report(export_excel=False)
+    assert exports == [True]
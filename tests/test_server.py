@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Validação dos endpoints do servidor HTTP (diarias_server)"""
+
+import asyncio
+import json
+
+import pytest
+
+
+async def _request(port, method, path, payload=None):
+    """Envia uma requisição e devolve (status, corpo JSON)"""
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode('ascii') + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    return status, json.loads(content.decode('utf-8')) if content else None
+
+
+def _exchange(system, requests):
+    """Sobe o servidor em uma porta livre, executa as requisições e o encerra"""
+    from diarias_server import DiariasServer
+
+    async def run():
+        server = DiariasServer(system, port=0)
+        port = await server.start()
+        try:
+            return [await _request(port, *request) for request in requests]
+        finally:
+            await server.shutdown()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('payload', [
+    {'date': '2025-01-02', 'status': 'pago'},
+    {'date': '2025-01-02', 'status': None},
+    {'date': 20250102},
+])
+def test_add_day_rejects_invalid_fields(make_system, payload):
+    system = make_system()
+    [(status, body)] = _exchange(system, [('POST', '/api/days', payload)])
+    assert status == 400
+    assert 'error' in body
+    assert len(system.working_days) == 0
+
+
+def test_add_and_update_day(make_system):
+    system = make_system()
+    responses = _exchange(system, [
+        ('POST', '/api/days', {'date': '2025-01-02'}),
+        ('PATCH', '/api/days/2025-01-02', {'status': 'paid'}),
+        ('PATCH', '/api/days/2025-01-02', {'status': 'cancelled'}),
+        ('PATCH', '/api/days/2025-01-03', {'status': 'paid'}),
+    ])
+    assert [status for status, _ in responses] == [201, 200, 400, 404]
+    assert system.working_days['2025-01-02']['status'] == 'paid'
+
+
+def test_add_deposit_requires_positive_amount(make_system):
+    system = make_system()
+    responses = _exchange(system, [
+        ('POST', '/api/deposits', {'amount': -10}),
+        ('POST', '/api/deposits', {'amount': True}),
+        ('POST', '/api/deposits', {'amount': 150.5, 'description': 'Pix'}),
+    ])
+    assert [status for status, _ in responses] == [400, 400, 201]
+    assert system.credit_balance == pytest.approx(150.5)
+
+
+def test_system_rejects_unknown_status(make_system):
+    system = make_system()
+    assert not system.add_working_day('2025-01-02', 'pago')
+    assert system.add_working_day('2025-01-02')
+    assert not system.update_day_status('2025-01-02', 'cancelled')
+    assert system.working_days['2025-01-02']['status'] == 'pending'
+    assert system.journal.seq == 1
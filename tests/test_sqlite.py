@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Backend SQLite: ida e volta dos dados e carga sob demanda dos dias"""
+
+import pytest
+
+
+def _populate(system):
+    system.add_working_day('2025-01-02', 'paid', 'obra', project='Centro')
+    system.add_working_day('2025-01-03')
+    system.add_working_day('2025-02-03', notes='viagem')
+    system.add_deposit(1000.0, 'Pix')
+    system.remove_working_day('2025-01-03')
+
+
+def test_round_trip(make_system):
+    system = make_system('sqlite')
+    _populate(system)
+    expected_days = system.working_days.to_dict()
+    expected_deposits = list(system.deposits)
+    balance = system.credit_balance
+    system.close()
+
+    restarted = make_system('sqlite')
+    assert restarted.working_days.to_dict() == expected_days
+    assert restarted.deposits == expected_deposits
+    assert restarted.credit_balance == pytest.approx(balance)
+    assert restarted.working_days['2025-01-02']['project'] == 'Centro'
+
+
+def test_days_are_loaded_on_demand(make_system):
+    system = make_system('sqlite')
+    _populate(system)
+    system.close()
+
+    restarted = make_system('sqlite')
+    days = restarted.working_days
+    assert not days.loaded
+
+    # Consultas pontuais, contagens e filtros vão ao banco
+    assert len(days) == 2
+    assert '2025-01-02' in days and '2025-01-03' not in days
+    assert days['2025-02-03']['notes'] == 'viagem'
+    assert days.get('2025-01-03') is None
+    assert restarted.get_days(status='paid') == ['2025-01-02']
+    assert restarted.get_kpis() is not None
+    assert not days.loaded
+
+    # A primeira mutação carrega o armazenamento completo
+    assert restarted.update_day_status('2025-02-03', 'paid')
+    assert days.loaded
+    assert restarted.aggregates.verify(restarted.working_days, restarted.deposits, False) == []
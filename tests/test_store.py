@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Armazenamento colunar de dias trabalhados (WorkingDaysStore)"""
+
+import pytest
+
+from diarias_store import WorkingDaysStore
+
+INVALID_DATES = ['2025-13-01', 'amanhã', '', None, 20250102]
+
+
+def _store():
+    return WorkingDaysStore.from_dict({
+        '2025-01-06': {'status': 'paid', 'notes': 'obra'},
+        '2025-01-02': {'status': 'pending', 'notes': '', 'project': 'Centro'},
+    })
+
+
+def test_get_set_delete_keep_dates_sorted():
+    store = _store()
+    store['2025-01-03'] = {'status': 'pending', 'notes': 'viagem'}
+    assert list(store) == ['2025-01-02', '2025-01-03', '2025-01-06']
+    assert store['2025-01-02'] == {'status': 'pending', 'notes': '', 'project': 'Centro'}
+
+    store.set_status('2025-01-03', 'paid')
+    assert store['2025-01-03']['status'] == 'paid'
+
+    del store['2025-01-02']
+    assert list(store) == ['2025-01-03', '2025-01-06']
+    assert store.pop('2025-01-06')['notes'] == 'obra'
+    assert store.to_dict() == {'2025-01-03': {'status': 'paid', 'notes': 'viagem'}}
+
+
+@pytest.mark.parametrize('date_str', INVALID_DATES)
+def test_invalid_dates_behave_as_missing_keys(date_str):
+    store = _store()
+    assert date_str not in store
+    assert store.get(date_str) is None
+    assert store.pop(date_str, 'ausente') == 'ausente'
+    with pytest.raises(KeyError):
+        store[date_str]
+    with pytest.raises(KeyError):
+        del store[date_str]
+    with pytest.raises(KeyError):
+        store.set_status(date_str, 'paid')
+    assert len(store) == 2
+
+
+def test_setting_an_invalid_date_is_rejected():
+    store = _store()
+    with pytest.raises(ValueError):
+        store['2025-02-30'] = {'status': 'pending'}
+    assert len(store) == 2
+
+
+def test_frames_are_not_changed_by_later_mutations():
+    store = _store()
+    frame = store.to_frame(250.0)
+    store['2025-01-01'] = {'status': 'paid', 'notes': ''}
+    store.set_status('2025-01-02', 'paid')
+
+    assert len(frame) == 2
+    assert list(frame['Status']) == ['pending', 'paid']
+    assert list(store.to_frame(250.0)['Valor_Acumulado']) == [250.0, 500.0, 750.0]
+
+
+def test_compact_notes_drops_unused_pool_entries():
+    store = _store()
+    store['2025-01-03'] = {'status': 'pending', 'notes': 'viagem'}
+    store['2025-01-06'] = {'status': 'paid', 'notes': 'obra revisada'}
+    del store['2025-01-03']
+    frame = store.to_frame(250.0)
+    assert set(frame['Observacoes'].cat.categories) == {'', 'obra', 'viagem', 'obra revisada'}
+
+    assert store.compact_notes() == 2
+    assert store.compact_notes() == 0
+    assert list(store.to_frame(250.0)['Observacoes'].cat.categories) == ['', 'obra revisada']
+    assert store.to_dict() == {
+        '2025-01-02': {'status': 'pending', 'notes': '', 'project': 'Centro'},
+        '2025-01-06': {'status': 'paid', 'notes': 'obra revisada'},
+    }
+    # Frames anteriores não mudam e novos textos recebem códigos válidos
+    assert list(frame['Observacoes']) == ['', 'obra revisada']
+    store['2025-01-07'] = {'status': 'pending', 'notes': 'viagem'}
+    assert store['2025-01-07']['notes'] == 'viagem'
+
+
+def test_compact_notes_without_empty_notes_in_use():
+    store = WorkingDaysStore.from_dict({'2025-01-02': {'status': 'paid', 'notes': 'a'}})
+    store['2025-01-02'] = {'status': 'paid', 'notes': 'b'}
+    assert store.compact_notes() == 1
+    assert store['2025-01-02']['notes'] == 'b'
+    assert WorkingDaysStore().compact_notes() == 0
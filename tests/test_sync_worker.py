@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Worker de sincronização Excel: debounce, coalescência e atraso máximo"""
+
+import threading
+import time
+
+from diarias_sync_worker import ExcelSyncWorker
+
+
+def _wait(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def _worker(calls, **kwargs):
+    worker = ExcelSyncWorker(lambda: calls.append(time.monotonic()), **kwargs)
+    worker.start()
+    return worker
+
+
+def test_burst_is_coalesced_into_one_sync():
+    calls = []
+    worker = _worker(calls, debounce=0.1, max_delay=5.0)
+    for _ in range(20):
+        worker.request_sync()
+    assert _wait(lambda: calls)
+    time.sleep(0.2)
+    worker.stop()
+
+    assert len(calls) == 1
+    assert worker.coalesced_requests == 19
+    assert worker.stats()['queue_depth'] == 0
+
+
+def test_max_delay_bounds_a_continuous_stream():
+    calls = []
+    worker = _worker(calls, debounce=0.2, max_delay=0.3)
+    start = time.monotonic()
+    while time.monotonic() - start < 0.6 and not calls:
+        worker.request_sync()
+        time.sleep(0.02)
+    worker.stop(flush=False)
+
+    assert calls and calls[0] - start < 0.3 + 0.2
+
+
+def test_flush_runs_pending_sync_and_waits():
+    calls = []
+    worker = _worker(calls, debounce=60, max_delay=120)
+    worker.request_sync()
+    assert worker.flush(timeout=2.0)
+    assert len(calls) == 1
+    assert worker.flush(timeout=2.0)   # nada pendente
+    assert len(calls) == 1
+    worker.stop()
+
+
+def test_errors_are_recorded_and_worker_keeps_running():
+    calls = []
+
+    def sync():
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            raise RuntimeError('falha')
+
+    worker = ExcelSyncWorker(sync, debounce=0.01, max_delay=1.0)
+    worker.start()
+    worker.request_sync()
+    assert _wait(lambda: worker.last_error == 'falha')
+    worker.request_sync()
+    assert _wait(lambda: len(calls) == 2 and worker.last_error is None)
+    worker.stop()
+    assert calls == ['excel-sync-worker', 'excel-sync-worker']
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Sincronização do documento da web (diarias_data.json) com o estado do sistema"""
+
+import json
+
+import pytest
+
+BACKENDS = ['json', 'sqlite']
+
+
+def _data_file():
+    from pathlib import Path
+    return Path('excel_report') / 'diarias_data.json'
+
+
+def _statuses(system):
+    return {date: day['status'] for date, day in system.working_days.to_dict().items()}
+
+
+def _write(document):
+    _data_file().write_text(json.dumps(document), encoding='utf-8')
+
+
+@pytest.mark.parametrize('storage', BACKENDS)
+def test_legacy_document_without_journal_seq_is_merged(make_system, storage):
+    system = make_system(storage)
+    for date_str in ('2025-01-03', '2025-01-06'):
+        system.add_working_day(date_str)
+    system._compact_snapshot(force=True)
+    system.add_working_day('2025-01-07')
+
+    # Documento legado: sem journalSeq, edita um dia, adiciona outro e não traz os demais
+    legacy = {
+        'workingDays': {'2025-01-03': {'status': 'paid', 'notes': 'pago'},
+                        '2025-02-03': {'status': 'pending', 'notes': ''}},
+        'deposits': [{'date': '2025-01-10T10:00:00', 'amount': 500.0, 'description': 'Pix'}],
+        'creditBalance': 0
+    }
+    _write(legacy)
+    system._sync_from_web_data()
+
+    expected = {'2025-01-03': 'paid', '2025-01-06': 'pending', '2025-01-07': 'pending', '2025-02-03': 'pending'}
+    assert _statuses(system) == expected
+    assert [deposit['amount'] for deposit in system.deposits] == [500.0]
+    # O arquivo externo não é regravado
+    assert json.loads(_data_file().read_text(encoding='utf-8')) == legacy
+
+    system.close()
+    assert _statuses(make_system(storage)) == expected
+
+
+@pytest.mark.parametrize('storage', BACKENDS)
+def test_stale_document_keeps_missing_items(make_system, storage):
+    system = make_system(storage)
+    system.add_working_day('2025-01-03')
+    system._compact_snapshot(force=True)
+    stale = json.loads(_data_file().read_text(encoding='utf-8'))
+
+    system.add_working_day('2025-01-06')
+    system._compact_snapshot(force=True)
+
+    # Documento anterior à última compactação: o dia 06 não aparece nele
+    stale['workingDays']['2025-01-03']['status'] = 'paid'
+    _write(stale)
+    system._sync_from_web_data()
+
+    assert _statuses(system) == {'2025-01-03': 'paid', '2025-01-06': 'pending'}
+    assert json.loads(_data_file().read_text(encoding='utf-8')) == stale
+
+
+@pytest.mark.parametrize('storage', BACKENDS)
+def test_document_rebased_on_pending_events(make_system, storage):
+    system = make_system(storage)
+    system.add_working_day('2025-01-03')
+    system._compact_snapshot(force=True)
+    document = json.loads(_data_file().read_text(encoding='utf-8'))
+
+    # Mutação do sistema ainda fora do snapshot quando a web grava
+    system.add_working_day('2025-01-06')
+    document['workingDays']['2025-01-03']['status'] = 'paid'
+    _write(document)
+    system._sync_from_web_data()
+
+    assert _statuses(system) == {'2025-01-03': 'paid', '2025-01-06': 'pending'}
+
+
+@pytest.mark.parametrize('storage', BACKENDS)
+def test_deposit_edits_and_removals_are_journaled(make_system, storage):
+    system = make_system(storage)
+    for amount in (100.0, 200.0, 300.0):
+        system.add_deposit(amount, f"Depósito {amount:.0f}")
+    system._compact_snapshot(force=True)
+    document = json.loads(_data_file().read_text(encoding='utf-8'))
+
+    # Web remove o primeiro depósito, edita o último e adiciona um novo
+    deposits = document['deposits']
+    deposits[2] = dict(deposits[2], amount=350.0)
+    del deposits[0]
+    deposits.append({'date': '2025-03-01T10:00:00', 'amount': 50.0, 'description': 'Novo'})
+    _write(document)
+    system._sync_from_web_data()
+
+    expected = [200.0, 350.0, 50.0]
+    assert [deposit['amount'] for deposit in system.deposits] == expected
+    assert system.journal.pending_events > 0
+    balance = system.credit_balance
+
+    # Encerramento sem compactar: o replay do journal reconstrói a mesma lista
+    system._closed = True
+    system.sync_worker.stop(flush=False)
+    system.journal.close()
+    restarted = make_system(storage)
+    assert [deposit['amount'] for deposit in restarted.deposits] == expected
+    assert restarted.credit_balance == pytest.approx(balance)